@@ -0,0 +1,39 @@
+"""add lead_change_log table
+
+Revision ID: 010e310141b6
+Revises: 54d8714a0530
+Create Date: 2026-01-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010e310141b6'
+down_revision = '54d8714a0530'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('lead_change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.Column('field_name', sa.String(length=100), nullable=False),
+    sa.Column('old_value', sa.Text(), nullable=True),
+    sa.Column('new_value', sa.Text(), nullable=True),
+    sa.Column('changed_by_user_id', sa.Integer(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['changed_by_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_lead_change_log_lead_id_id', 'lead_change_log', ['lead_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lead_change_log_lead_id_id', table_name='lead_change_log')
+    op.drop_table('lead_change_log')
@@ -0,0 +1,105 @@
+"""add content-addressed upload store (upload_blobs, documents.pdf_sha256)
+
+Revision ID: 1e7b5f1b849b
+Revises: 2b2569526c73
+Create Date: 2026-01-22 09:00:00.000000
+
+"""
+import hashlib
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e7b5f1b849b'
+down_revision = '2b2569526c73'
+branch_labels = None
+depends_on = None
+
+# Store directory - UPLOAD_STORAGE_DIR's default when this revision was written. Deployments
+# with another directory pass it with `alembic -x upload_storage_dir=PATH upgrade head`.
+DEFAULT_UPLOAD_STORAGE_DIR = 'storage/uploads'
+
+
+def _upload_blob_path(storage_dir: Path, sha256: str) -> Path:
+    """app.services.uploads.upload_blob_path as of this revision."""
+    return storage_dir / sha256[:2] / sha256[2:4] / sha256
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def upgrade() -> None:
+    op.create_table('upload_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('pdf_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_documents_pdf_sha256', 'upload_blobs', ['pdf_sha256'], ['sha256'])
+        batch_op.create_index(batch_op.f('ix_documents_pdf_sha256'), ['pdf_sha256'], unique=False)
+
+    # Move existing uploads into the store. The old files are removed only once every
+    # upload has been linked into the store; missing files are left as they are.
+    storage_dir = Path(context.get_x_argument(as_dictionary=True).get('upload_storage_dir', DEFAULT_UPLOAD_STORAGE_DIR))
+    connection = op.get_bind()
+    ref_counts = Counter()
+    sizes = {}
+    moved = []
+    uploads = connection.execute(sa.text(
+        "SELECT id, pdf_file_path FROM documents WHERE status = 'uploaded' AND pdf_file_path IS NOT NULL ORDER BY id"
+    )).all()
+    for document_id, pdf_file_path in uploads:
+        source = Path(pdf_file_path)
+        if not source.is_file():
+            continue
+        sha256 = _file_sha256(source)
+        target = _upload_blob_path(storage_dir, sha256)
+        if not target.exists():
+            _link_or_copy(source, target)
+        sizes[sha256] = target.stat().st_size
+        ref_counts[sha256] += 1
+        if source.resolve() != target.resolve():  # Already in the store after a downgrade
+            moved.append(source)
+        connection.execute(
+            sa.text("UPDATE documents SET pdf_sha256 = :sha256, pdf_file_path = :path WHERE id = :id"),
+            {'sha256': sha256, 'path': str(target), 'id': document_id}
+        )
+
+    if ref_counts:
+        connection.execute(
+            sa.text("INSERT INTO upload_blobs (sha256, size_bytes, ref_count) VALUES (:sha256, :size_bytes, :ref_count)"),
+            [{'sha256': sha256, 'size_bytes': sizes[sha256], 'ref_count': count} for sha256, count in ref_counts.items()]
+        )
+    for source in moved:
+        source.unlink(missing_ok=True)
+
+
+def downgrade() -> None:
+    # Documents keep pointing at the stored files through pdf_file_path
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_pdf_sha256'))
+        batch_op.drop_constraint('fk_documents_pdf_sha256', type_='foreignkey')
+        batch_op.drop_column('pdf_sha256')
+    op.drop_table('upload_blobs')
@@ -0,0 +1,82 @@
+"""add immutable document_template_versions and pin documents to them
+
+Revision ID: 2b2569526c73
+Revises: e81f95ecb530
+Create Date: 2026-01-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b2569526c73'
+down_revision = 'e81f95ecb530'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_template_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('version_number', sa.Integer(), nullable=False),
+    sa.Column('content_sha256', sa.String(length=64), nullable=False),
+    sa.Column('signature_blocks', sa.Text(), nullable=True),
+    sa.Column('field_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['document_templates.id'], ),
+    sa.ForeignKeyConstraint(['content_sha256'], ['html_blobs.sha256'], ),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('template_id', 'version_number', name='uq_document_template_versions_number')
+    )
+    op.create_index(op.f('ix_document_template_versions_id'), 'document_template_versions', ['id'], unique=False)
+    op.create_index(op.f('ix_document_template_versions_template_id'), 'document_template_versions', ['template_id'], unique=False)
+    op.create_index(op.f('ix_document_template_versions_content_sha256'), 'document_template_versions', ['content_sha256'], unique=False)
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('template_version_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_documents_template_version_id', 'document_template_versions', ['template_version_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_documents_template_version_id'), ['template_version_id'], unique=False)
+
+    # Every template gets its current content as version 1. Only documents still sharing
+    # exactly that content are pinned to it: an older document's blob may be an earlier
+    # template content or HTML edited before blobs existed (83961b6b23a5 moved both into
+    # blobs), and the two cannot be told apart, so those documents stay unpinned.
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "INSERT INTO document_template_versions "
+        "(template_id, version_number, content_sha256, signature_blocks, field_count, created_by_user_id, created_at) "
+        "SELECT id, 1, content_sha256, signature_blocks, field_count, created_by_user_id, "
+        "COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) FROM document_templates"
+    ))
+    connection.execute(sa.text(
+        "UPDATE documents SET template_version_id = "
+        "(SELECT v.id FROM document_template_versions v JOIN document_templates t ON t.id = v.template_id "
+        " WHERE v.template_id = documents.template_id AND t.content_sha256 = documents.content_sha256) "
+        "WHERE template_id IS NOT NULL AND content_sha256 IS NOT NULL"
+    ))
+    connection.execute(sa.text(
+        "UPDATE html_blobs SET ref_count = ref_count + "
+        "(SELECT COUNT(*) FROM document_template_versions v WHERE v.content_sha256 = html_blobs.sha256) "
+        "WHERE sha256 IN (SELECT content_sha256 FROM document_template_versions)"
+    ))
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE html_blobs SET ref_count = ref_count - "
+        "(SELECT COUNT(*) FROM document_template_versions v WHERE v.content_sha256 = html_blobs.sha256)"
+    ))
+    connection.execute(sa.text("DELETE FROM html_blobs WHERE ref_count <= 0"))
+
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_template_version_id'))
+        batch_op.drop_constraint('fk_documents_template_version_id', type_='foreignkey')
+        batch_op.drop_column('template_version_id')
+    op.drop_index(op.f('ix_document_template_versions_content_sha256'), table_name='document_template_versions')
+    op.drop_index(op.f('ix_document_template_versions_template_id'), table_name='document_template_versions')
+    op.drop_index(op.f('ix_document_template_versions_id'), table_name='document_template_versions')
+    op.drop_table('document_template_versions')
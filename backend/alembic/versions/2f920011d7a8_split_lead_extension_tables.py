@@ -0,0 +1,147 @@
+"""split rarely read lead columns into extension tables
+
+Revision ID: 2f920011d7a8
+Revises: 8a592b9bc845
+Create Date: 2026-01-13 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '2f920011d7a8'
+down_revision = '8a592b9bc845'
+branch_labels = None
+depends_on = None
+
+# Extension table -> columns moved out of `leads` (see app/models/lead_extensions.py)
+EXTENSION_TABLES = {
+    'lead_integration': [
+        ('morning_client_id_company', sa.String(length=100)),
+        ('morning_client_id_office', sa.String(length=100)),
+        ('invoice_id', sa.String(length=100)),
+        ('invoice_source', sa.String(length=255)),
+        ('morning_item_id', sa.String(length=100)),
+        ('financial_client_created', sa.Boolean()),
+        ('morning_client_created', sa.Boolean()),
+    ],
+    'lead_triggers': [
+        ('date_trigger', sa.String(length=255)),
+        ('payment_request_date_trigger', sa.String(length=255)),
+        ('payment_request_send_trigger', sa.String(length=255)),
+        ('reminder_message3_trigger', sa.String(length=255)),
+        ('reminder_message4_trigger', sa.String(length=255)),
+        ('reminder_message5_trigger', sa.String(length=255)),
+        ('reminder_message6_trigger', sa.String(length=255)),
+        ('create_financial_client_trigger', sa.String(length=255)),
+    ],
+    'lead_document_links': [
+        ('payment_request_document', sa.String(length=500)),
+        ('payment_request_link', sa.String(length=500)),
+        ('signing_documents_word', sa.String(length=500)),
+        ('signing_documents_pdf', sa.String(length=500)),
+        ('signed_by_client_documents', sa.String(length=500)),
+        ('documents_for_lawyer_verification', sa.String(length=500)),
+        ('verified_client_signed_documents', sa.String(length=500)),
+        ('attachments_link', sa.String(length=500)),
+        ('attachments_and_agreement_link', sa.String(length=500)),
+        ('signed_attachments_and_agreement', sa.String(length=500)),
+        ('company_seller_documents', sa.String(length=500)),
+        ('company_seller_signing_link', sa.String(length=500)),
+        ('signed_by_company_seller_documents', sa.String(length=500)),
+        ('verified_company_seller_signed_documents', sa.String(length=500)),
+        ('client_signing_link', sa.String(length=500)),
+        ('poa_share_agreement', sa.String(length=500)),
+        ('poa_planning', sa.String(length=500)),
+    ],
+    'lead_collection': [
+        ('non_payment_reason', sa.String(length=255)),
+        ('coordinated_call_payment_date', sa.Date()),
+        ('initiated_contact_attempts', sa.Integer()),
+        ('last_contact_date', sa.Date()),
+        ('collection_notes', sa.Text()),
+        ('plot_value', sa.Numeric(precision=15, scale=2)),
+        ('realization_completed_if_error', sa.Boolean()),
+    ],
+    'lead_workflow': [
+        ('is_employee_or_self_employed', sa.Boolean()),
+        ('full_transaction_details', sa.Boolean()),
+        ('whatsapp_sent', sa.Boolean()),
+        ('transfer_to_registration', sa.Boolean()),
+        ('transfer_to_ownership_registration', sa.Boolean()),
+        ('transfer_to_appointments_board', sa.Boolean()),
+        ('group_transactions_after_realization', sa.Boolean()),
+        ('create_levy_board_item', sa.Boolean()),
+        ('preparation_signature_document', sa.Boolean()),
+        ('create_client_signing_link', sa.Boolean()),
+        ('create_attachments_link', sa.Boolean()),
+        ('create_company_seller_link', sa.Boolean()),
+        ('identification_mark', sa.String(length=255)),
+        ('action_confirmation_ea', sa.String(length=255)),
+        ('ea_registration_status', sa.String(length=255)),
+        ('page_spread', sa.String(length=255)),
+    ],
+    'lead_contract_details': [
+        ('search_component', sa.String(length=255)),
+        ('land_component', sa.String(length=255)),
+        ('land_component_text', sa.String(length=500)),
+        ('search_component_text', sa.String(length=500)),
+        ('transaction_amount_text', sa.String(length=500)),
+        ('search_component_percent', sa.Numeric(precision=5, scale=2)),
+        ('additional_buyer_details', sa.Text()),
+        ('membership_request', sa.String(length=255)),
+        ('fee_agreement', sa.String(length=255)),
+        ('client_recognition_form', sa.String(length=255)),
+    ],
+}
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    for table_name, columns in EXTENSION_TABLES.items():
+        op.create_table(table_name,
+            sa.Column('lead_id', sa.Integer(), nullable=False),
+            *[sa.Column(name, column_type, nullable=True) for name, column_type in columns],
+            sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+            sa.PrimaryKeyConstraint('lead_id')
+        )
+
+        # Copy only leads that have at least one value in this group
+        names = [name for name, _ in columns]
+        column_list = ", ".join(names)
+        any_value = " OR ".join(f"{name} IS NOT NULL" for name in names)
+        conn.execute(text(f"""
+            INSERT INTO {table_name} (lead_id, {column_list})
+            SELECT id, {column_list}
+            FROM leads
+            WHERE {any_value}
+        """))
+
+    # SQLite can't drop columns in place - batch mode recreates the table
+    with op.batch_alter_table('leads') as batch_op:
+        for columns in EXTENSION_TABLES.values():
+            for name, _ in columns:
+                batch_op.drop_column(name)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+
+    with op.batch_alter_table('leads') as batch_op:
+        for columns in EXTENSION_TABLES.values():
+            for name, column_type in columns:
+                batch_op.add_column(sa.Column(name, column_type, nullable=True))
+
+    for table_name, columns in EXTENSION_TABLES.items():
+        names = [name for name, _ in columns]
+        assignments = ", ".join(
+            f"{name} = (SELECT {name} FROM {table_name} WHERE {table_name}.lead_id = leads.id)"
+            for name in names
+        )
+        conn.execute(text(f"""
+            UPDATE leads SET {assignments}
+            WHERE id IN (SELECT lead_id FROM {table_name})
+        """))
+        op.drop_table(table_name)
@@ -0,0 +1,82 @@
+"""add lead_reminders table
+
+Revision ID: 3c9d2e7f4a10
+Revises: 0177ec7b554d
+Create Date: 2026-01-12 09:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d2e7f4a10'
+down_revision = '0177ec7b554d'
+branch_labels = None
+depends_on = None
+
+# Reminder kind -> leads column that schedules it (see app/services/reminders.py)
+REMINDER_DATE_FIELDS = {
+    'message3': 'reminder_message3_date',
+    'message4': 'reminder_message4_date',
+    'message5': 'reminder_message5_date',
+    'message6': 'reminder_message6_date',
+    'check_call': 'check_call_reminder',
+}
+
+# Hour (UTC) at which a reminder date becomes due - REMINDER_SEND_HOUR_UTC's default when
+# this revision was written. Deployments with another hour pass it with
+# `alembic -x reminder_send_hour_utc=N upgrade head`.
+DEFAULT_SEND_HOUR_UTC = 6
+
+
+def upgrade() -> None:
+    op.create_table('lead_reminders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('next_due_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('lease_owner', sa.String(length=100), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('lead_id', 'kind', name='uq_lead_reminders_lead_kind')
+    )
+    op.create_index(op.f('ix_lead_reminders_id'), 'lead_reminders', ['id'], unique=False)
+    op.create_index(op.f('ix_lead_reminders_lead_id'), 'lead_reminders', ['lead_id'], unique=False)
+    op.create_index(op.f('ix_lead_reminders_organization_id'), 'lead_reminders', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_lead_reminders_next_due_at'), 'lead_reminders', ['next_due_at'], unique=False)
+
+    # Backfill reminders from existing lead reminder dates. Only dates still ahead are
+    # scheduled; past ones are recorded as already sent, so the first scan does not email
+    # every historical reminder (and saving the lead does not schedule them either).
+    send_hour_utc = int(context.get_x_argument(as_dictionary=True).get('reminder_send_hour_utc', DEFAULT_SEND_HOUR_UTC))
+
+    conn = op.get_bind()
+    for kind, field in REMINDER_DATE_FIELDS.items():
+        conn.execute(text(f"""
+            INSERT INTO lead_reminders (organization_id, lead_id, kind, next_due_at, status, attempts, created_at)
+            SELECT organization_id, id, :kind,
+                   CASE WHEN datetime({field}, :hour_offset) > CURRENT_TIMESTAMP THEN datetime({field}, :hour_offset) END,
+                   CASE WHEN datetime({field}, :hour_offset) > CURRENT_TIMESTAMP THEN 'pending' ELSE 'sent' END,
+                   0, CURRENT_TIMESTAMP
+            FROM leads
+            WHERE {field} IS NOT NULL AND deleted_at IS NULL
+        """), {'kind': kind, 'hour_offset': f'+{send_hour_utc} hours'})
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_lead_reminders_next_due_at'), table_name='lead_reminders')
+    op.drop_index(op.f('ix_lead_reminders_organization_id'), table_name='lead_reminders')
+    op.drop_index(op.f('ix_lead_reminders_lead_id'), table_name='lead_reminders')
+    op.drop_index(op.f('ix_lead_reminders_id'), table_name='lead_reminders')
+    op.drop_table('lead_reminders')
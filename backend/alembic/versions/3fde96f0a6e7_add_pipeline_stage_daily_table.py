@@ -0,0 +1,79 @@
+"""add pipeline_stage_daily rollup table
+
+Revision ID: 3fde96f0a6e7
+Revises: 7b40fe93d8b3
+Create Date: 2026-01-16 15:00:00.000000
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3fde96f0a6e7'
+down_revision = '7b40fe93d8b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pipeline_stage_daily',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('stage_id', sa.Integer(), nullable=False),
+    sa.Column('entered_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('exited_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('time_in_stage_seconds', sa.Float(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['stage_id'], ['lead_stages.id'], ),
+    sa.PrimaryKeyConstraint('organization_id', 'day', 'stage_id')
+    )
+
+    # Backfill from the existing stage history (app.services.pipeline_analytics.rebuild_pipeline_rollup
+    # as of this revision). Rows for the target stage of an active 'record' transition rule are
+    # milestones: they count as entries but do not end the lead's stay in its current stage.
+    connection = op.get_bind()
+    milestone_stage_ids = set(connection.execute(sa.text(
+        "SELECT target_stage_id FROM stage_transition_rules WHERE mode = 'record' AND is_active = 1"
+    )).scalars().all())
+
+    deltas = defaultdict(lambda: [0, 0, 0.0])  # (organization_id, day, stage_id) -> entered, exited, seconds
+    current = {}  # lead_id -> (stage_id, entered_at)
+    history = connection.execute(sa.text(
+        "SELECT h.lead_id, h.stage_id, h.changed_at, l.organization_id "
+        "FROM lead_stage_history h JOIN leads l ON l.id = h.lead_id "
+        "ORDER BY h.lead_id, h.changed_at, h.id"
+    ).columns(changed_at=sa.DateTime()))
+    for lead_id, stage_id, changed_at, organization_id in history:
+        day = changed_at.date()
+        deltas[(organization_id, day, stage_id)][0] += 1
+        stay = current.get(lead_id)
+        if stay is not None and (stage_id in milestone_stage_ids or stage_id == stay[0]):
+            continue
+        if stay is not None:
+            exit_row = deltas[(organization_id, day, stay[0])]
+            exit_row[1] += 1
+            exit_row[2] += max((changed_at - stay[1]).total_seconds(), 0.0)
+        current[lead_id] = (stage_id, changed_at)
+
+    if deltas:
+        connection.execute(
+            sa.text(
+                "INSERT INTO pipeline_stage_daily "
+                "(organization_id, day, stage_id, entered_count, exited_count, time_in_stage_seconds) "
+                "VALUES (:organization_id, :day, :stage_id, :entered_count, :exited_count, :time_in_stage_seconds)"
+            ).bindparams(sa.bindparam('day', type_=sa.Date())),
+            [
+                {
+                    'organization_id': organization_id, 'day': day, 'stage_id': stage_id,
+                    'entered_count': entered, 'exited_count': exited, 'time_in_stage_seconds': seconds,
+                }
+                for (organization_id, day, stage_id), (entered, exited, seconds) in deltas.items()
+            ]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('pipeline_stage_daily')
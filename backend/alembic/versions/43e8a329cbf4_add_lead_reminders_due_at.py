@@ -0,0 +1,55 @@
+"""add lead_reminders.due_at (the scheduled moment, kept apart from retries)
+
+Revision ID: 43e8a329cbf4
+Revises: 1e7b5f1b849b
+Create Date: 2026-01-23 09:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '43e8a329cbf4'
+down_revision = '1e7b5f1b849b'
+branch_labels = None
+depends_on = None
+
+# Reminder kind -> leads column that schedules it (see app/services/reminders.py)
+REMINDER_DATE_FIELDS = {
+    'message3': 'reminder_message3_date',
+    'message4': 'reminder_message4_date',
+    'message5': 'reminder_message5_date',
+    'message6': 'reminder_message6_date',
+    'check_call': 'check_call_reminder',
+}
+
+# REMINDER_SEND_HOUR_UTC's default when this revision was written; pass another one with
+# `alembic -x reminder_send_hour_utc=N upgrade head`
+DEFAULT_SEND_HOUR_UTC = 6
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('lead_reminders') as batch_op:
+        batch_op.add_column(sa.Column('due_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Reminders not retried yet are still at their scheduled moment. The others (retried,
+    # sent or given up on) were last synced against the lead's current date, so that is
+    # their scheduled moment - a NULL would re-arm sent and failed reminders on the next save.
+    op.execute(
+        "UPDATE lead_reminders SET due_at = next_due_at WHERE status = 'pending' AND attempts = 0"
+    )
+    send_hour_utc = int(context.get_x_argument(as_dictionary=True).get('reminder_send_hour_utc', DEFAULT_SEND_HOUR_UTC))
+    conn = op.get_bind()
+    for kind, field in REMINDER_DATE_FIELDS.items():
+        conn.execute(text(f"""
+            UPDATE lead_reminders
+            SET due_at = (SELECT datetime(leads.{field}, :hour_offset) FROM leads WHERE leads.id = lead_reminders.lead_id)
+            WHERE kind = :kind AND due_at IS NULL
+        """), {'kind': kind, 'hour_offset': f'+{send_hour_utc} hours'})
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('lead_reminders') as batch_op:
+        batch_op.drop_column('due_at')
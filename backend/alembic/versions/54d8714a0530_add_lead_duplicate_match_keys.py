@@ -0,0 +1,99 @@
+"""add normalized duplicate-detection keys to leads
+
+Revision ID: 54d8714a0530
+Revises: 2f920011d7a8
+Create Date: 2026-01-14 10:00:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '54d8714a0530'
+down_revision = '2f920011d7a8'
+branch_labels = None
+depends_on = None
+
+COUNTRY_CODE = "972"
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]")
+
+
+# Normalizers of app.core.normalization as of this revision (phone keys are corrected by 74e88657c6bc)
+
+def normalize_phone(value):
+    if not value:
+        return None
+    digits = _NON_DIGITS.sub("", str(value))
+    if str(value).strip().startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = COUNTRY_CODE + digits[1:]
+    elif not digits.startswith(COUNTRY_CODE):
+        digits = COUNTRY_CODE + digits
+    if len(digits) < 8 or len(digits) > 15:
+        return None
+    return digits
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    normalized = str(value).strip().lower()
+    return normalized or None
+
+
+def normalize_client_id(value):
+    if not value:
+        return None
+    raw = str(value).strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if digits and len(digits) == len(_NON_ALNUM.sub("", raw)):
+        return digits.zfill(9) if len(digits) <= 9 else digits
+    alnum = _NON_ALNUM.sub("", raw).upper()
+    return alnum or None
+
+
+MATCH_KEYS = [
+    # (normalized column, raw column, normalizer, column length)
+    ('phone_normalized', 'phone', normalize_phone, 20),
+    ('email_normalized', 'email', normalize_email, 255),
+    ('client_id_normalized', 'client_id', normalize_client_id, 50),
+]
+
+
+def upgrade() -> None:
+    for normalized, _raw, _normalize, length in MATCH_KEYS:
+        op.add_column('leads', sa.Column(normalized, sa.String(length), nullable=True))
+
+    # Backfill existing leads with the normalizers the model used on write
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT id, phone, email, client_id FROM leads "
+        "WHERE phone IS NOT NULL OR email IS NOT NULL OR client_id IS NOT NULL"
+    )).mappings().all()
+    updates = [
+        {'id': row['id'], **{normalized: normalize(row[raw]) for normalized, raw, normalize, _length in MATCH_KEYS}}
+        for row in rows
+    ]
+    if updates:
+        connection.execute(sa.text(
+            "UPDATE leads SET phone_normalized = :phone_normalized, email_normalized = :email_normalized, "
+            "client_id_normalized = :client_id_normalized WHERE id = :id"
+        ), updates)
+
+    for normalized, _raw, _normalize, _length in MATCH_KEYS:
+        op.create_index(f'ix_leads_org_{normalized}', 'leads', ['organization_id', normalized, 'deleted_at'])
+
+
+def downgrade() -> None:
+    for normalized, _raw, _normalize, _length in MATCH_KEYS:
+        op.drop_index(f'ix_leads_org_{normalized}', table_name='leads')
+    with op.batch_alter_table('leads') as batch_op:
+        for normalized, _raw, _normalize, _length in MATCH_KEYS:
+            batch_op.drop_column(normalized)
@@ -0,0 +1,30 @@
+"""add documents.pdf_render_digest and pdf_signatures_key (identity of the published PDF)
+
+Revision ID: 5f0d7c2e9b41
+Revises: 74e88657c6bc
+Create Date: 2026-01-24 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0d7c2e9b41'
+down_revision = '74e88657c6bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left NULL for PDFs published before this revision: they are served with a file-based
+    # ETag and revalidated until they are rendered again
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('pdf_render_digest', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('pdf_signatures_key', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('pdf_signatures_key')
+        batch_op.drop_column('pdf_render_digest')
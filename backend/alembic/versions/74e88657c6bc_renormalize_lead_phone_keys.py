@@ -0,0 +1,61 @@
+"""recompute leads.phone_normalized without prefixing foreign numbers with 972
+
+Revision ID: 74e88657c6bc
+Revises: 43e8a329cbf4
+Create Date: 2026-01-23 10:00:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '74e88657c6bc'
+down_revision = '43e8a329cbf4'
+branch_labels = None
+depends_on = None
+
+COUNTRY_CODE = "972"
+_MOBILE_WITHOUT_TRUNK_PREFIX = re.compile(r"^5\d{8}$")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _normalize_phone(value):
+    """app.core.normalization.normalize_phone as of this revision."""
+    if not value:
+        return None
+    digits = _NON_DIGITS.sub("", str(value))
+    if str(value).strip().startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = COUNTRY_CODE + digits[1:]
+    elif _MOBILE_WITHOUT_TRUNK_PREFIX.match(digits):
+        digits = COUNTRY_CODE + digits
+    if len(digits) < 8 or len(digits) > 15:
+        return None
+    return digits
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT id, phone, phone_normalized FROM leads WHERE phone IS NOT NULL"
+    )).all()
+    updates = []
+    for lead_id, phone, current in rows:
+        normalized = _normalize_phone(phone)
+        if normalized != current:
+            updates.append({'id': lead_id, 'phone_normalized': normalized})
+    if updates:
+        connection.execute(
+            sa.text("UPDATE leads SET phone_normalized = :phone_normalized WHERE id = :id"),
+            updates
+        )
+
+
+def downgrade() -> None:
+    pass  # The corrected keys are valid for the previous revision as well
@@ -0,0 +1,72 @@
+"""add stage_transition_rules table
+
+Revision ID: 7b40fe93d8b3
+Revises: c261a6da7fb3
+Create Date: 2026-01-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision = '7b40fe93d8b3'
+down_revision = 'c261a6da7fb3'
+branch_labels = None
+depends_on = None
+
+
+# (event, contract_type, document_type, target stage name, mode) - the transitions that used
+# to be hard-coded in documents.py and document_signing.py
+SEED_RULES = [
+    ('document_ready', 'buyer', None, 'חוזה לקוח מוכן', 'advance'),  # Buyer Contract Ready
+    ('document_ready', 'seller', None, 'חוזה מוכר מוכן', 'advance'),  # Seller Contract Ready
+    ('document_ready', 'lawyer', None, 'חוזה עורך דין מוכן', 'advance'),  # Lawyer Contract Ready
+    ('document_signed', 'buyer', None, 'חתום על ידי לקוח', 'advance'),  # Buyer Signed
+    ('document_signed', 'seller', None, 'חתום על ידי מוכר', 'advance'),  # Seller Signed
+    ('document_signed', 'lawyer', None, 'חתום על ידי עורך דין', 'advance'),  # Lawyer Signed
+    ('document_uploaded', None, 'lawyer_approved_buyer_contract', 'מסמכי לקוח מאומתים', 'record'),  # Verified Buyer Documents
+    ('document_uploaded', None, 'lawyer_approved_seller_contract', 'מסמכי מוכר מאומתים', 'record'),  # Verified Seller Documents
+]
+
+
+def upgrade() -> None:
+    op.create_table('stage_transition_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(length=50), nullable=False),
+    sa.Column('contract_type', sa.String(length=50), nullable=True),
+    sa.Column('document_type', sa.String(length=100), nullable=True),
+    sa.Column('target_stage_id', sa.Integer(), nullable=False),
+    sa.Column('mode', sa.String(length=20), nullable=False, server_default='advance'),
+    sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['target_stage_id'], ['lead_stages.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event', 'contract_type', 'document_type', name='uq_stage_transition_rules_match')
+    )
+    op.create_index(op.f('ix_stage_transition_rules_id'), 'stage_transition_rules', ['id'], unique=False)
+
+    conn = op.get_bind()
+    for event, contract_type, document_type, stage_name, mode in SEED_RULES:
+        # Stages missing from this database are skipped (same as the old name lookups)
+        conn.execute(text("""
+            INSERT INTO stage_transition_rules
+                (event, contract_type, document_type, target_stage_id, mode, is_active, created_at)
+            SELECT :event, :contract_type, :document_type, id, :mode, 1, :created_at
+            FROM lead_stages WHERE name = :stage_name
+        """), {
+            'event': event,
+            'contract_type': contract_type,
+            'document_type': document_type,
+            'stage_name': stage_name,
+            'mode': mode,
+            'created_at': datetime.utcnow()
+        })
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_stage_transition_rules_id'), table_name='stage_transition_rules')
+    op.drop_table('stage_transition_rules')
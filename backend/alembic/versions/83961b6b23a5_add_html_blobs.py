@@ -0,0 +1,131 @@
+"""add content-addressed html_blobs for template and document HTML
+
+Revision ID: 83961b6b23a5
+Revises: 3fde96f0a6e7
+Create Date: 2026-01-17 10:00:00.000000
+
+"""
+import hashlib
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83961b6b23a5'
+down_revision = '3fde96f0a6e7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+
+def _sha256(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _iter_rows(connection, query):
+    """Rows of an (id, content) query in id order, BATCH_SIZE at a time."""
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(query), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table('html_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+    # Move every template and document HTML into one blob per distinct content
+    connection = op.get_bind()
+    ref_counts = Counter()
+    stored = set()
+
+    def point_at_blob(table, content_column, rows):
+        updates = []
+        new_blobs = []
+        for row_id, content in rows:
+            sha256 = _sha256(content)
+            ref_counts[sha256] += 1
+            if sha256 not in stored:
+                stored.add(sha256)
+                new_blobs.append({'sha256': sha256, 'content': content, 'size_bytes': len(content.encode('utf-8'))})
+            updates.append({'row_id': row_id, 'sha256': sha256})
+        if new_blobs:
+            connection.execute(sa.text(
+                "INSERT INTO html_blobs (sha256, content, size_bytes, ref_count) VALUES (:sha256, :content, :size_bytes, 0)"
+            ), new_blobs)
+        if updates:
+            # Documents keep no inline copy; templates.content is dropped below
+            clear_inline = ", rendered_content = NULL" if table == 'documents' else ""
+            connection.execute(sa.text(
+                f"UPDATE {table} SET content_sha256 = :sha256{clear_inline} WHERE id = :row_id"
+            ), updates)
+
+    for table, content_column in (('document_templates', 'content'), ('documents', 'rendered_content')):
+        batch = []
+        for row in _iter_rows(connection, (
+            f"SELECT id, {content_column} FROM {table} "
+            f"WHERE id > :last_id AND {content_column} IS NOT NULL ORDER BY id LIMIT :limit"
+        )):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                point_at_blob(table, content_column, batch)
+                batch = []
+        point_at_blob(table, content_column, batch)
+
+    if ref_counts:
+        connection.execute(
+            sa.text("UPDATE html_blobs SET ref_count = :ref_count WHERE sha256 = :sha256"),
+            [{'sha256': sha256, 'ref_count': count} for sha256, count in ref_counts.items()]
+        )
+
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.alter_column('content_sha256', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('content')
+        batch_op.create_foreign_key('fk_document_templates_content_sha256', 'html_blobs', ['content_sha256'], ['sha256'])
+        batch_op.create_index(batch_op.f('ix_document_templates_content_sha256'), ['content_sha256'], unique=False)
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.create_foreign_key('fk_documents_content_sha256', 'html_blobs', ['content_sha256'], ['sha256'])
+        batch_op.create_index(batch_op.f('ix_documents_content_sha256'), ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE document_templates SET content = "
+        "(SELECT content FROM html_blobs WHERE html_blobs.sha256 = document_templates.content_sha256)"
+    ))
+    connection.execute(sa.text(
+        "UPDATE documents SET rendered_content = "
+        "(SELECT content FROM html_blobs WHERE html_blobs.sha256 = documents.content_sha256) "
+        "WHERE content_sha256 IS NOT NULL"
+    ))
+
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_content_sha256'))
+        batch_op.drop_constraint('fk_documents_content_sha256', type_='foreignkey')
+        batch_op.drop_column('content_sha256')
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_document_templates_content_sha256'))
+        batch_op.drop_constraint('fk_document_templates_content_sha256', type_='foreignkey')
+        batch_op.drop_column('content_sha256')
+    op.drop_table('html_blobs')
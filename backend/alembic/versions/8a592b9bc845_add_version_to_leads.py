@@ -0,0 +1,25 @@
+"""add version to leads
+
+Revision ID: 8a592b9bc845
+Revises: 3c9d2e7f4a10
+Create Date: 2026-01-12 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a592b9bc845'
+down_revision = '3c9d2e7f4a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Row version for optimistic concurrency control and lead ETags
+    op.add_column('leads', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('leads', 'version')
@@ -0,0 +1,53 @@
+"""add lead_segments and lead_segment_members tables
+
+Revision ID: c261a6da7fb3
+Revises: 010e310141b6
+Create Date: 2026-01-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c261a6da7fb3'
+down_revision = '010e310141b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('lead_segments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('filters', sa.Text(), nullable=False),
+    sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('period_key', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lead_segments_id'), 'lead_segments', ['id'], unique=False)
+    op.create_index(op.f('ix_lead_segments_organization_id'), 'lead_segments', ['organization_id'], unique=False)
+
+    op.create_table('lead_segment_members',
+    sa.Column('segment_id', sa.Integer(), nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    sa.ForeignKeyConstraint(['segment_id'], ['lead_segments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('segment_id', 'lead_id')
+    )
+    op.create_index(op.f('ix_lead_segment_members_lead_id'), 'lead_segment_members', ['lead_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_lead_segment_members_lead_id'), table_name='lead_segment_members')
+    op.drop_table('lead_segment_members')
+    op.drop_index(op.f('ix_lead_segments_organization_id'), table_name='lead_segments')
+    op.drop_index(op.f('ix_lead_segments_id'), table_name='lead_segments')
+    op.drop_table('lead_segments')
@@ -0,0 +1,97 @@
+"""add document_templates.field_count for the template list summary
+
+Revision ID: e81f95ecb530
+Revises: 83961b6b23a5
+Create Date: 2026-01-18 09:00:00.000000
+
+"""
+import re
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:  # Only needed if html_blobs were already compressed with zstd
+    zstandard = None
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81f95ecb530'
+down_revision = '83961b6b23a5'
+branch_labels = None
+depends_on = None
+
+
+# Merge-field syntax and stored-text format as of this revision
+# (app.services.document_generation, app.core.compression)
+TIPTAP_FIELD_OPENER = '<span'
+TIPTAP_FIELD_TOKEN = re.compile(
+    r'<span(?=[^>]*data-merge-field=["\']true["\'])(?=[^>]*data-field-key=["\'](\w+)["\'])[^>]*>.*?</span>',
+    re.DOTALL
+)
+PLAIN_FIELD_OPENER = '{{lead.'
+PLAIN_FIELD_TOKEN = re.compile(r'\{\{lead\.(\w+)\}\}')
+HEADER_ZLIB = 0x01
+HEADER_ZSTD = 0x02
+
+
+def _decompress_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    header, payload = value[0], value[1:]
+    if header == HEADER_ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if header == HEADER_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    raise ValueError(f"Cannot decompress stored value with header {header:#04x}")
+
+
+def _merge_field_keys(content):
+    """Distinct merge-field keys, scanned left to right; a TipTap span swallows any placeholder inside it."""
+    keys = set()
+    next_span = content.find(TIPTAP_FIELD_OPENER)
+    next_plain = content.find(PLAIN_FIELD_OPENER)
+    while next_span != -1 or next_plain != -1:
+        if next_plain == -1 or (next_span != -1 and next_span < next_plain):
+            at, match = next_span, TIPTAP_FIELD_TOKEN.match(content, next_span)
+        else:
+            at, match = next_plain, PLAIN_FIELD_TOKEN.match(content, next_plain)
+        if match:
+            keys.add(match.group(1))
+            end = match.end()
+        else:
+            end = at + 1
+        if next_span != -1 and next_span < end:
+            next_span = content.find(TIPTAP_FIELD_OPENER, end)
+        if next_plain != -1 and next_plain < end:
+            next_plain = content.find(PLAIN_FIELD_OPENER, end)
+    return keys
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.add_column(sa.Column('field_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Count the merge fields of every existing template (one scan per distinct blob)
+    connection = op.get_bind()
+    counts = {}
+    updates = []
+    for template_id, sha256, content in connection.execute(sa.text(
+        "SELECT document_templates.id, html_blobs.sha256, html_blobs.content FROM document_templates "
+        "JOIN html_blobs ON html_blobs.sha256 = document_templates.content_sha256"
+    )):
+        if sha256 not in counts:
+            counts[sha256] = len(_merge_field_keys(_decompress_text(content)))
+        updates.append({'template_id': template_id, 'field_count': counts[sha256]})
+    if updates:
+        connection.execute(
+            sa.text("UPDATE document_templates SET field_count = :field_count WHERE id = :template_id"),
+            updates
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('document_templates') as batch_op:
+        batch_op.drop_column('field_count')
@@ -0,0 +1,78 @@
+"""
+Analytics API endpoints - pipeline funnel and time in stage.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date, timedelta
+from app.core.database import get_db
+from app.core.auth import get_current_user_dependency, get_current_organization_dependency
+from app.models.user import User
+from app.models.organization import Organization
+from app.services.pipeline_analytics import get_pipeline_stats
+
+router = APIRouter()
+
+# Default report range when no dates are given
+DEFAULT_RANGE_DAYS = 30
+
+
+# ========== Pydantic Schemas ==========
+
+class PipelineStageStatsResponse(BaseModel):
+    stage_id: int
+    stage_name: str
+    order: int
+    entered_count: int  # Leads that reached the stage in the range
+    exited_count: int  # Leads that moved on from the stage in the range
+    avg_time_in_stage_seconds: Optional[float] = None  # Over the stays that ended in the range
+    conversion_rate: Optional[float] = None  # Entries of the next stage / entries of this stage
+
+
+class PipelineAnalyticsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    stages: List[PipelineStageStatsResponse]
+
+
+# ========== API Endpoints ==========
+
+@router.get("/pipeline", response_model=PipelineAnalyticsResponse)
+async def get_pipeline_analytics(
+    start_date: Optional[date] = Query(None, description="First day (UTC), defaults to 30 days ago"),
+    end_date: Optional[date] = Query(None, description="Last day (UTC, inclusive), defaults to today"),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Funnel conversion and average time in stage for the organization's pipeline,
+    read from the daily stage rollup.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+
+    stats = get_pipeline_stats(db, current_organization.id, start_date, end_date)
+
+    return PipelineAnalyticsResponse(
+        start_date=start_date,
+        end_date=end_date,
+        stages=[
+            PipelineStageStatsResponse(
+                stage_id=item['stage'].id,
+                stage_name=item['stage'].name,
+                order=item['stage'].order,
+                entered_count=item['entered_count'],
+                exited_count=item['exited_count'],
+                avg_time_in_stage_seconds=item['avg_time_in_stage_seconds'],
+                conversion_rate=item['conversion_rate']
+            )
+            for item in stats
+        ]
+    )
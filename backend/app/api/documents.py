@@ -1,32 +1,38 @@
 """
 Documents API endpoints - document generation and management.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Header, Response
 from fastapi import Request
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, defer, joinedload, load_only, noload, undefer
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, func
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 import os
-from pathlib import Path
-from fastapi.responses import FileResponse
-from app.core.database import get_db
+import json
+import logging
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.database import get_db, SessionLocal
 from app.core.auth import get_current_user_dependency, get_current_organization_dependency
+from app.core.http_cache import make_etag, hash_etag, etag_matches, file_etag, negotiate_encoding, encoded_body_cache
+from app.core.file_serving import file_download_response
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.lead import Lead
-from app.models.lead_stage import LeadStage
-from app.models.lead_stage_history import LeadStageHistory
 from app.models.document_template import DocumentTemplate
 from app.models.document import Document
 from app.models.document_signature import DocumentSignature
 from app.models.signing_link import SigningLink
+from app.models.html_blob import HtmlBlob, share_html, html_sha256
+from app.models.upload_blob import point_at_upload
 from app.services.document_generation import (
     generate_document_content,
-    generate_document_title,
-    validate_merge_fields
+    generate_document_title
 )
+from app.services.html_normalization import normalize_html
+from app.services.template_versions import current_version_for_generation
 from app.services.signing_links import (
     create_signing_link,
     get_signing_link_by_token,
@@ -36,7 +42,27 @@ from app.services.signing_links import (
     get_active_signing_links_for_document
 )
 from app.services.document_signing import submit_signature
-from app.core.config import FRONTEND_BASE_URL
+from app.services.pdf_rendering import enqueue_pdf_render
+from app.services.pdf_stamping import signature_set_key
+from app.services.uploads import (
+    UploadTooLarge, store_pdf_upload, publish_upload, discard_upload, resolve_pdf_path
+)
+from app.services.document_batch import (
+    OUTCOME_CREATED,
+    select_batch_lead_ids,
+    validate_batch_request,
+    iter_documents_batch,
+    generate_documents_batch
+)
+from app.services.lead_segments import SegmentFilter
+from app.services.stage_transitions import (
+    EVENT_DOCUMENT_READY,
+    EVENT_DOCUMENT_UPLOADED,
+    apply_stage_transition
+)
+from app.core.config import FRONTEND_BASE_URL, SIGNED_PDF_MAX_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -95,14 +121,14 @@ class SigningLinkResponse(BaseModel):
         from_attributes = True
 
 
-class DocumentResponse(BaseModel):
+class DocumentSummaryResponse(BaseModel):
+    """Document list entry - no HTML or signature blocks (see GET /documents/{id} and /content)."""
     id: int
     organization_id: int
     lead_id: int
     template_id: Optional[int] = None  # Nullable for uploaded documents
+    template_version_id: Optional[int] = None  # Template version generated from
     title: str
-    rendered_content: Optional[str] = None  # Nullable for uploaded PDFs
-    signature_blocks: Optional[str] = None  # JSON string with signature block metadata
     pdf_file_path: Optional[str] = None
     signing_url: Optional[str] = None
     contract_type: Optional[str] = None  # 'buyer', 'seller', 'lawyer'
@@ -117,13 +143,23 @@ class DocumentResponse(BaseModel):
     created_by_user: Optional[DocumentUserResponse] = None
     template: Optional[DocumentTemplateInfoResponse] = None
     lead: Optional[DocumentLeadInfoResponse] = None
-    signatures: Optional[List[DocumentSignatureResponse]] = None
-    signing_links: Optional[List[SigningLinkResponse]] = None
 
     class Config:
         from_attributes = True
 
 
+class DocumentMetadataResponse(DocumentSummaryResponse):
+    """Document without its HTML - GET /documents/{id}/content serves that."""
+    signature_blocks: Optional[str] = None  # JSON string with signature block metadata
+    signatures: Optional[List[DocumentSignatureResponse]] = None
+    signing_links: Optional[List[SigningLinkResponse]] = None
+
+
+class DocumentResponse(DocumentMetadataResponse):
+    """Document including its HTML (returned when creating or updating a document)."""
+    rendered_content: Optional[str] = None  # Nullable for uploaded PDFs
+
+
 class DocumentCreateRequest(BaseModel):
     """Request schema for creating a document from a template."""
     template_id: int = Field(..., description="ID of the template to use")
@@ -132,6 +168,30 @@ class DocumentCreateRequest(BaseModel):
     title: Optional[str] = Field(None, description="Optional custom title (defaults to template name + lead name)")
 
 
+class DocumentBatchCreateRequest(BaseModel):
+    """Request schema for generating documents from one template for many leads."""
+    template_id: int = Field(..., description="ID of the template to use")
+    lead_ids: Optional[List[int]] = Field(None, description="Leads to generate documents for")
+    filters: Optional[List[SegmentFilter]] = Field(None, description="Or: segment-style lead filters, e.g. project_name eq ...")
+    contract_type: Optional[str] = Field(None, description="Type of contract for all documents: 'buyer', 'seller', or 'lawyer'")
+
+
+class DocumentBatchOutcomeResponse(BaseModel):
+    lead_id: int
+    status: str  # 'created' or 'failed'
+    document_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class DocumentBatchResponse(BaseModel):
+    """Per-lead outcomes of a batch generation."""
+    template_id: int
+    total: int
+    created: int
+    failed: int
+    results: List[DocumentBatchOutcomeResponse]
+
+
 class CreateSigningLinkRequest(BaseModel):
     """Request schema for creating a signing link."""
     # signer_type removed - now determined by contract_type on document
@@ -172,13 +232,59 @@ class SubmitSignatureResponse(BaseModel):
 
 class DocumentListResponse(BaseModel):
     """Paginated list of documents."""
-    items: List[DocumentResponse]
+    items: List[DocumentSummaryResponse]
     total: int
     page: int
     limit: int
     total_pages: int
 
 
+# ========== Helper Functions ==========
+
+def document_batch_response(template_id: int, outcomes: List[dict]) -> DocumentBatchResponse:
+    created = sum(1 for outcome in outcomes if outcome['status'] == OUTCOME_CREATED)
+    return DocumentBatchResponse(
+        template_id=template_id,
+        total=len(outcomes),
+        created=created,
+        failed=len(outcomes) - created,
+        results=[DocumentBatchOutcomeResponse(**outcome) for outcome in outcomes]
+    )
+
+
+def stream_document_batch(
+    template_id: int,
+    organization_id: int,
+    user_id: int,
+    lead_ids: List[int],
+    contract_type: Optional[str]
+):
+    """
+    NDJSON progress stream for a batch: one {"event": "progress"} line per chunk, then
+    {"event": "done", ...DocumentBatchResponse} or {"event": "error", "detail": ...}.
+
+    Uses its own session - the request's session is closed once the response starts.
+    """
+    db = SessionLocal()
+    try:
+        template = db.get(DocumentTemplate, template_id)
+        outcomes = []
+        try:
+            for chunk in iter_documents_batch(db, organization_id, template, lead_ids, user_id, contract_type):
+                outcomes.extend(chunk)
+                yield json.dumps({'event': 'progress', 'processed': len(outcomes), 'total': len(lead_ids)}) + "\n"
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Batch generation from template {template_id} failed: {e}", exc_info=True)
+            yield json.dumps({'event': 'error', 'detail': "Batch generation failed - no documents were created"}) + "\n"
+            return
+        response = document_batch_response(template_id, outcomes)
+        yield json.dumps({'event': 'done', **response.model_dump()}) + "\n"
+    finally:
+        db.close()
+
+
 # ========== API Endpoints ==========
 
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
@@ -223,31 +329,28 @@ async def create_document(
             detail="Lead not found or not accessible"
         )
     
-    # Validate merge fields can be resolved
-    validation = validate_merge_fields(template.content, lead)
-    if not validation['valid']:
+    # Pin the template's current version and validate its merge fields can be resolved
+    try:
+        version = current_version_for_generation(db, template, current_user.id)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid merge fields: {', '.join(validation['missing_fields'])}"
+            detail=str(e)
         )
     
-    # Store template content WITH merge fields - they will be replaced on-the-fly when displaying on signing page
-    # This allows users to edit, remove, or change merge fields in the editor
-    rendered_content = template.content
-    
     # Generate document title
     title = document_data.title or generate_document_title(template, lead)
     
-    # Copy signature blocks from template (can be edited later)
-    signature_blocks = template.signature_blocks
+    # Copy signature blocks from the version (can be edited later)
+    signature_blocks = version.signature_blocks
     
     # Create document record
     new_document = Document(
         organization_id=current_organization.id,
         lead_id=lead.id,
         template_id=template.id,
+        template_version_id=version.id,
         title=title,
-        rendered_content=rendered_content,
         signature_blocks=signature_blocks,  # Copy from template
         contract_type=document_data.contract_type,  # 'buyer', 'seller', or 'lawyer'
         status='draft',  # Initial status: draft (being worked on)
@@ -255,6 +358,11 @@ async def create_document(
         created_at=datetime.utcnow()  # Explicitly set created_at for SQLite compatibility
     )
     
+    # Share the version's content WITH merge fields (copied on first edit) - they will be replaced
+    # on-the-fly when displaying on signing page. This allows users to edit, remove, or change
+    # merge fields in the editor
+    share_html(new_document, version)
+    
     db.add(new_document)
     db.commit()
     db.refresh(new_document)
@@ -267,6 +375,62 @@ async def create_document(
     return new_document
 
 
+@router.post("/batch", response_model=DocumentBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_documents_batch(
+    batch_data: DocumentBatchCreateRequest,
+    stream: bool = Query(False, description="Stream NDJSON progress events (application/x-ndjson) ending with the result"),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate documents from one template for many leads (mail merge) in one transaction.
+    
+    Leads are given as an ID list or as segment-style filters (e.g. all leads of a project).
+    The template is validated once; leads that don't exist or belong to another organization
+    are reported as failed without failing the batch.
+    """
+    template = db.query(DocumentTemplate).filter(
+        DocumentTemplate.id == batch_data.template_id,
+        DocumentTemplate.organization_id == current_organization.id,
+        DocumentTemplate.is_active == True
+    ).first()
+    
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found or not accessible"
+        )
+    
+    try:
+        lead_ids = select_batch_lead_ids(
+            db,
+            current_organization.id,
+            current_user.id,
+            lead_ids=batch_data.lead_ids,
+            filters=[condition.model_dump() for condition in batch_data.filters] if batch_data.filters is not None else None
+        )
+        if stream:
+            # Validate up front so errors are still a plain 400
+            validate_batch_request(db, template, current_user.id, batch_data.contract_type)
+            return StreamingResponse(
+                stream_document_batch(template.id, current_organization.id, current_user.id, lead_ids, batch_data.contract_type),
+                media_type="application/x-ndjson"
+            )
+        outcomes = generate_documents_batch(
+            db, current_organization.id, template, lead_ids, current_user.id, batch_data.contract_type
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    db.commit()
+    
+    return document_batch_response(template.id, outcomes)
+
+
 @router.get("", response_model=DocumentListResponse)
 async def list_documents(
     page: int = Query(1, ge=1, description="Page number"),
@@ -280,6 +444,10 @@ async def list_documents(
 ):
     """
     List documents for the current organization with optional filters.
+    
+    Returns summaries without HTML or signature blocks. Creators, template names and lead
+    names are joined into the page query, so a page takes two statements (count + page)
+    whatever its size.
     """
     # Build query
     query = db.query(Document).filter(
@@ -296,19 +464,36 @@ async def list_documents(
     if status_filter:
         query = query.filter(Document.status == status_filter)
     
-    # Get total count
-    total = query.count()
+    # Get total count (without selecting the document columns)
+    total = query.with_entities(func.count(Document.id)).scalar()
     
-    # Apply pagination
+    # Apply pagination - summary columns only, with the creator, template and lead names joined in
     offset = (page - 1) * limit
-    documents = query.order_by(Document.created_at.desc()).offset(offset).limit(limit).all()
-    
-    # Load basic relationships and fix null created_at values
+    documents = query.options(
+        load_only(
+            Document.organization_id,
+            Document.lead_id,
+            Document.template_id,
+            Document.template_version_id,
+            Document.title,
+            Document.pdf_file_path,
+            Document.signing_url,
+            Document.contract_type,
+            Document.document_type,
+            Document.status,
+            Document.created_by_user_id,
+            Document.created_at,
+            Document.updated_at,
+            Document.completed_at,
+        ),
+        noload(Document.content_blob),
+        joinedload(Document.created_by_user).load_only(User.email, User.full_name),
+        joinedload(Document.template).load_only(DocumentTemplate.name).noload(DocumentTemplate.content_blob),
+        joinedload(Document.lead).load_only(Lead.full_name),
+    ).order_by(Document.created_at.desc()).offset(offset).limit(limit).all()
+    
+    # Fix null created_at for SQLite compatibility (set default for response only)
     for doc in documents:
-        doc.created_by_user = db.query(User).filter(User.id == doc.created_by_user_id).first()
-        doc.template = db.query(DocumentTemplate).filter(DocumentTemplate.id == doc.template_id).first()
-        doc.lead = db.query(Lead).filter(Lead.id == doc.lead_id).first()
-        # Fix null created_at for SQLite compatibility (set default for response only)
         if doc.created_at is None:
             doc.created_at = datetime.utcnow()
     
@@ -324,7 +509,7 @@ async def list_documents(
     )
 
 
-@router.get("/{document_id}", response_model=DocumentResponse)
+@router.get("/{document_id}", response_model=DocumentMetadataResponse)
 async def get_document(
     document_id: int,
     include_signatures: bool = Query(False, description="Include signatures in response"),
@@ -334,9 +519,19 @@ async def get_document(
     db: Session = Depends(get_db)
 ):
     """
-    Get document details by ID.
+    Get document details by ID, without the HTML (GET /documents/{id}/content serves that).
+    
+    The creator, template name and lead name are joined into the document query.
     """
-    document = db.query(Document).filter(
+    document = db.query(Document).options(
+        defer(Document.inline_content),
+        noload(Document.content_blob),
+        noload(Document.signatures),
+        noload(Document.signing_links),
+        joinedload(Document.created_by_user),
+        joinedload(Document.template).load_only(DocumentTemplate.name).noload(DocumentTemplate.content_blob),
+        joinedload(Document.lead).load_only(Lead.full_name),
+    ).filter(
         Document.id == document_id,
         Document.organization_id == current_organization.id
     ).first()
@@ -347,25 +542,92 @@ async def get_document(
             detail="Document not found"
         )
     
-    # Load basic relationships
-    document.created_by_user = db.query(User).filter(User.id == document.created_by_user_id).first()
-    document.template = db.query(DocumentTemplate).filter(DocumentTemplate.id == document.template_id).first()
-    document.lead = db.query(Lead).filter(Lead.id == document.lead_id).first()
-    
-    # Load optional relationships
+    # Load optional relationships (without marking the document modified)
     if include_signatures:
-        document.signatures = db.query(DocumentSignature).filter(
+        set_committed_value(document, 'signatures', db.query(DocumentSignature).options(
+            undefer(DocumentSignature.signature_data)
+        ).filter(
             DocumentSignature.document_id == document_id
-        ).order_by(DocumentSignature.signed_at.asc()).all()
+        ).order_by(DocumentSignature.signed_at.asc()).all())
     
     if include_signing_links:
-        document.signing_links = db.query(SigningLink).filter(
+        set_committed_value(document, 'signing_links', db.query(SigningLink).filter(
             SigningLink.document_id == document_id
-        ).order_by(SigningLink.created_at.desc()).all()
+        ).order_by(SigningLink.created_at.desc()).all())
     
     return document
 
 
+@router.get("/{document_id}/content")
+async def get_document_content(
+    document_id: int,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a document's HTML (with merge fields, as edited).
+    
+    The strong ETag is the content's SHA-256 (plus the content coding); a request with a
+    matching If-None-Match gets 304 Not Modified. For documents still sharing their
+    template version's HTML that takes a single lookup, without reading the content.
+    Bodies are sent br/gzip-encoded when the client accepts it, compressed once per
+    content hash (see EncodedBodyCache).
+    """
+    row = db.query(Document.content_sha256, HtmlBlob.size_bytes).outerjoin(
+        HtmlBlob, HtmlBlob.sha256 == Document.content_sha256
+    ).filter(
+        Document.id == document_id,
+        Document.organization_id == current_organization.id
+    ).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if row.content_sha256 is not None:
+        content_sha256, size = row.content_sha256, row.size_bytes
+        
+        def load_body() -> bytes:
+            content = db.query(HtmlBlob.content).filter(HtmlBlob.sha256 == content_sha256).scalar()
+            return (content or "").encode("utf-8")
+    else:
+        # Edited document - its private copy has to be read to be hashed
+        content = db.query(Document.inline_content).filter(Document.id == document_id).scalar()
+        if content is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document has no HTML content"
+            )
+        body = content.encode("utf-8")
+        content_sha256, size = html_sha256(content), len(body)
+        
+        def load_body() -> bytes:
+            return body
+    
+    encoding = negotiate_encoding(accept_encoding, size)
+    etag = make_etag(content_sha256, encoding) if encoding else make_etag(content_sha256)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=encoded_body_cache.encode(content_sha256, encoding, load_body),
+        media_type="text/html; charset=utf-8",
+        headers=headers
+    )
+
+
 class DocumentUpdateRequest(BaseModel):
     """Request schema for updating a document."""
     status: Optional[str] = Field(None, description="New status: 'draft', 'ready', 'sent', 'signed'")
@@ -404,8 +666,9 @@ async def update_document(
     # Update rendered_content if provided (for editing contracts)
     # IMPORTANT: Save content WITH merge fields - they will be replaced on-the-fly when displaying on signing page
     # This allows users to edit, remove, or change merge fields in the editor
+    # Normalized first, so re-saving unchanged content keeps sharing the template version's HTML
     if update_data.rendered_content is not None:
-        document.rendered_content = update_data.rendered_content
+        document.rendered_content = normalize_html(update_data.rendered_content)
     
     # Update title if provided
     if update_data.title:
@@ -449,31 +712,15 @@ async def update_document(
         
         document.status = update_data.status
         
-        # If marking as ready, advance lead stage based on contract_type
-        if update_data.status == 'ready' and document.contract_type:
-            from app.api.leads import create_stage_history_entry
-            
-            # Map contract_type to stage name (Hebrew)
-            stage_name_map = {
-                'buyer': 'חוזה לקוח מוכן',    # Buyer Contract Ready
-                'seller': 'חוזה מוכר מוכן',   # Seller Contract Ready
-                'lawyer': 'חוזה עורך דין מוכן',  # Lawyer Contract Ready
-            }
-            
-            target_stage_name = stage_name_map.get(document.contract_type)
-            if target_stage_name:
-                # Get the target stage by name (more reliable than order due to potential duplicates)
-                target_stage = db.query(LeadStage).filter(LeadStage.name == target_stage_name).first()
-                if target_stage:
-                    lead = db.query(Lead).filter(Lead.id == document.lead_id).first()
-                    if lead and lead.stage_id != target_stage.id:
-                        # Only advance if not already at or past this stage
-                        current_stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-                        if current_stage and current_stage.order < target_stage.order:
-                            lead.stage_id = target_stage.id
-                            create_stage_history_entry(db, lead.id, target_stage.id, current_user.id)
-                            db.add(lead)
-                            db.flush()
+        # If marking as ready, advance lead stage based on contract_type (see stage_transition_rules)
+        if update_data.status == 'ready':
+            apply_stage_transition(
+                db,
+                EVENT_DOCUMENT_READY,
+                [document.lead_id],
+                current_user.id,
+                contract_type=document.contract_type
+            )
     
     document.updated_at = datetime.utcnow()
     db.commit()
@@ -784,7 +1031,7 @@ async def upload_document(
     This endpoint:
     1. Validates the lead exists and belongs to the organization
     2. Validates document_type is provided
-    3. Saves the uploaded PDF file
+    3. Streams the uploaded PDF to storage (size limit and PDF header checked while streaming)
     4. Creates a Document record with status='uploaded'
     5. Advances lead stage based on document_type configuration
     """
@@ -815,78 +1062,72 @@ async def upload_document(
             detail="Only PDF files are allowed"
         )
     
-    # Create storage directory if it doesn't exist
-    storage_dir = Path("storage") / "uploads" / str(current_organization.id)
-    storage_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{lead_id}_{timestamp}_{file.filename}"
-    file_path = storage_dir / filename
-    
-    # Save file
+    # Stream the file into the upload store (hashed and size-checked on the way; stored once per content)
     try:
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-    except Exception as e:
+        stored = await store_pdf_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(e)}"
+        )
+    logger.info(f"Staged upload {stored.sha256} ({stored.size_bytes} bytes)")
+
+    # The file goes into the store only once the document is committed, so a concurrent
+    # delete of the last document with the same file cannot remove it from under this one
+    try:
+        # Create document record
+        new_document = Document(
+            organization_id=current_organization.id,
+            lead_id=lead.id,
+            template_id=None,  # Uploaded documents don't have templates
+            title=f"{file.filename} - {lead.full_name or 'ליד'}",
+            rendered_content=None,  # Uploaded PDFs don't have HTML content
+            signature_blocks=None,  # Uploaded documents don't have signature blocks
+            pdf_file_path=str(stored.path),
+            document_type=document_type,  # Store document type ID
+            status='uploaded',  # Special status for uploaded documents
+            created_by_user_id=current_user.id,
+            created_at=datetime.utcnow()  # Explicitly set created_at for SQLite compatibility
+        )
+        point_at_upload(new_document, stored.sha256, stored.size_bytes)
+
+        db.add(new_document)
+        db.flush()
+
+        # Mark stage as complete based on document_type (see stage_transition_rules)
+        # For document uploads, we mark the stage as complete in history without changing the lead's current stage
+        # because document verification can happen at any point in the workflow
+        apply_stage_transition(
+            db,
+            EVENT_DOCUMENT_UPLOADED,
+            [lead.id],
+            current_user.id,
+            document_type=document_type
+        )
+
+        db.commit()
+    except BaseException:
+        discard_upload(stored)
+        raise
+
+    try:
+        await run_in_threadpool(publish_upload, stored)
+    except OSError as e:
+        logger.error(f"Failed to publish upload {stored.sha256} for document {new_document.id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save file: {str(e)}"
         )
-    
-    # Document type configuration - maps document_type IDs to stage names they trigger
-    # This should match the frontend DOCUMENT_TYPES configuration
-    DOCUMENT_TYPE_STAGE_MAP = {
-        'lawyer_approved_buyer_contract': 'מסמכי לקוח מאומתים',
-        'lawyer_approved_seller_contract': 'מסמכי מוכר מאומתים',
-    }
-    
-    # Create document record
-    new_document = Document(
-        organization_id=current_organization.id,
-        lead_id=lead.id,
-        template_id=None,  # Uploaded documents don't have templates
-        title=f"{file.filename} - {lead.full_name or 'ליד'}",
-        rendered_content=None,  # Uploaded PDFs don't have HTML content
-        signature_blocks=None,  # Uploaded documents don't have signature blocks
-        pdf_file_path=str(file_path),
-        document_type=document_type,  # Store document type ID
-        status='uploaded',  # Special status for uploaded documents
-        created_by_user_id=current_user.id,
-        created_at=datetime.utcnow()  # Explicitly set created_at for SQLite compatibility
-    )
-    
-    db.add(new_document)
-    db.flush()
-    
-    # Mark stage as complete based on document_type configuration
-    # For document uploads, we mark the stage as complete in history without changing the lead's current stage
-    # because document verification can happen at any point in the workflow
-    target_stage_name = DOCUMENT_TYPE_STAGE_MAP.get(document_type)
-    if target_stage_name:
-        target_stage = db.query(LeadStage).filter(
-            LeadStage.name == target_stage_name
-        ).first()
-        
-        if target_stage:
-            # Check if this stage is already marked as complete in history
-            existing_history = db.query(LeadStageHistory).filter(
-                LeadStageHistory.lead_id == lead.id,
-                LeadStageHistory.stage_id == target_stage.id
-            ).first()
-            
-            # Only create history entry if it doesn't already exist
-            if not existing_history:
-                # Create stage history entry to mark this stage as complete
-                history_entry = LeadStageHistory(
-                    lead_id=lead.id,
-                    stage_id=target_stage.id,
-                    changed_by_user_id=current_user.id
-                )
-                db.add(history_entry)
-    
-    db.commit()
     db.refresh(new_document)
     
     # Load relationships for response
@@ -896,17 +1137,68 @@ async def upload_document(
     return new_document
 
 
+@router.post("/{document_id}/pdf", status_code=status.HTTP_202_ACCEPTED)
+async def render_document_pdf(
+    document_id: int,
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue (re-)rendering of a document's PDF.
+    
+    Signed documents are rendered automatically; pdf_file_path is set once the PDF is ready.
+    """
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.organization_id == current_organization.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not document.rendered_content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document has no content to render (uploaded PDF)"
+        )
+    
+    if not enqueue_pdf_render([document.id]):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF render queue is full, try again later"
+        )
+    
+    return {"document_id": document.id, "status": "queued"}
+
+
 @router.get("/{document_id}/pdf")
 async def download_document_pdf(
     document_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
     db: Session = Depends(get_db)
 ):
     """
     Download PDF file for a document.
+    
+    Supports Range requests (206) and If-None-Match (304). The strong ETag is the stored
+    upload's SHA-256, or the content hash of the render plus the signatures stamped on it.
+    Uploaded PDFs never change and are cached as immutable; a signed document's PDF is
+    cached for SIGNED_PDF_MAX_AGE_SECONDS once the copy stamped with all of its signatures
+    is published (stamping runs in the background, so until then it is revalidated). With
+    FILE_DOWNLOAD_OFFLOAD set, the proxy sends the file (see file_download_response).
     """
-    document = db.query(Document).filter(
+    document = db.query(
+        Document.id, Document.title, Document.status, Document.pdf_sha256, Document.pdf_file_path,
+        Document.pdf_render_digest, Document.pdf_signatures_key
+    ).filter(
         Document.id == document_id,
         Document.organization_id == current_organization.id
     ).first()
@@ -917,21 +1209,48 @@ async def download_document_pdf(
             detail="Document not found"
         )
     
-    if not document.pdf_file_path:
+    file_path = resolve_pdf_path(document)
+    if file_path is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="PDF file not found for this document"
         )
     
-    file_path = Path(document.pdf_file_path)
-    if not file_path.exists():
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="PDF file not found on server"
         )
     
-    return FileResponse(
-        path=str(file_path),
+    if document.pdf_sha256 is not None:
+        etag = make_etag(document.pdf_sha256)
+        cache_control = "private, max-age=31536000, immutable"
+        filename = f"{document.title}.pdf"  # Stored uploads are named by hash
+    else:
+        if document.pdf_render_digest is None:
+            etag = file_etag(stat_result)  # Published before render digests were recorded
+        elif document.pdf_signatures_key is None:
+            etag = make_etag(document.pdf_render_digest)
+        else:
+            etag = hash_etag(document.pdf_render_digest, document.pdf_signatures_key)
+        stamped = (
+            document.status == 'signed'
+            and document.pdf_signatures_key is not None
+            and document.pdf_signatures_key == signature_set_key(db, document.id)
+        )
+        cache_control = f"private, max-age={SIGNED_PDF_MAX_AGE_SECONDS}" if stamped else "private, no-cache"
+        filename = file_path.name
+    
+    return file_download_response(
+        file_path,
+        stat_result,
         media_type='application/pdf',
-        filename=file_path.name
+        filename=filename,
+        etag=etag,
+        cache_control=cache_control,
+        range_header=range_header,
+        if_range=if_range,
+        if_none_match=if_none_match
     )
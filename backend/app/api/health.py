@@ -1,8 +1,14 @@
 """
 Health check endpoint.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 from datetime import datetime
+from app.core.database import get_db
+from app.models.lead_reminder import LeadReminder
+from app.services.reminder_scheduler import get_scheduler_metrics
+from app.services.pdf_rendering import get_pdf_render_metrics
 
 router = APIRouter()
 
@@ -16,3 +22,30 @@ async def health_check():
         "service": "research-flow-api",
     }
 
+
+@router.get("/health/reminders")
+async def reminder_scheduler_health(db: Session = Depends(get_db)):
+    """
+    Reminder scheduler metrics.
+    Run metrics are only populated in the worker that holds the scheduler lock;
+    the backlog figures come from the database and are valid in every worker.
+    """
+    now = datetime.utcnow()
+    oldest_due = db.query(func.min(LeadReminder.next_due_at)).scalar()
+    due_count = db.query(func.count(LeadReminder.id)).filter(LeadReminder.next_due_at <= now).scalar()
+
+    return {
+        **get_scheduler_metrics(),
+        "due_count": due_count,
+        "current_lag_seconds": max(0.0, (now - oldest_due).total_seconds()) if oldest_due and oldest_due <= now else 0.0,
+        "timestamp": now.isoformat(),
+    }
+
+
+@router.get("/health/pdf-rendering")
+async def pdf_rendering_health():
+    """PDF render queue metrics of this worker."""
+    return {
+        **get_pdf_render_metrics(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
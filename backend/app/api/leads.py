@@ -1,8 +1,9 @@
 """
 Leads API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.orm import Session, joinedload, noload
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy import or_, and_
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
@@ -10,11 +11,16 @@ from datetime import datetime, date, timezone
 from decimal import Decimal
 from app.core.database import get_db
 from app.core.auth import get_current_user_dependency, get_current_organization_dependency
+from app.core.http_cache import make_etag, etag_matches, parts_digest
 from app.models.user import User
 from app.models.organization import Organization
-from app.models.lead import Lead
-from app.models.lead_stage import LeadStage
+from app.models.lead import Lead, LEAD_FIELD_NAMES, LEAD_MATCH_KEY_FIELDS
+from app.models.lead_extensions import LEAD_EXTENSION_GROUPS, LEAD_EXTENSION_FIELDS
 from app.models.lead_stage_history import LeadStageHistory
+from app.services.reminders import sync_lead_reminders
+from app.services.lead_duplicates import find_lead_duplicates, find_duplicate_groups
+from app.services.lead_change_log import get_lead_changes
+from app.services.stage_registry import StageInfo, get_stage, get_default_stage as get_registry_default_stage
 
 router = APIRouter()
 
@@ -85,6 +91,7 @@ class LeadResponse(BaseModel):
     deleted_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: Optional[int] = None
     
     # Basic info
     full_name: str
@@ -104,6 +111,60 @@ class LeadResponse(BaseModel):
         extra = "allow"  # Allow additional fields from model
 
 
+class LeadChangeResponse(BaseModel):
+    id: int
+    field_name: str
+    old_value: Optional[str] = None
+    new_value: Optional[str] = None
+    changed_by_user_id: Optional[int] = None
+    changed_at: datetime
+    changed_by_user: Optional[LeadUserResponse] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LeadChangeListResponse(BaseModel):
+    """Page of a lead's field-level change history, newest first."""
+    changes: List[LeadChangeResponse]
+    next_cursor: Optional[str] = None
+
+
+class DuplicateLeadResponse(BaseModel):
+    """Short lead summary used in duplicate warnings and groups."""
+    id: int
+    full_name: str
+    client_id: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    stage_id: int
+    created_at: datetime
+    matched_on: List[str] = []  # Fields that matched: 'phone', 'email', 'client_id'
+
+    class Config:
+        from_attributes = True
+
+
+class LeadCreateResponse(LeadResponse):
+    """Created lead plus existing leads that look like the same client."""
+    possible_duplicates: List[DuplicateLeadResponse] = []
+
+
+class DuplicateGroupResponse(BaseModel):
+    field: str  # 'phone', 'email' or 'client_id'
+    value: str  # Normalized value shared by the group
+    count: int
+    leads: List[DuplicateLeadResponse]
+
+
+class DuplicateGroupListResponse(BaseModel):
+    """Paginated list of duplicate groups."""
+    groups: List[DuplicateGroupResponse]
+    total: int
+    page: int
+    limit: int
+
+
 class LeadListResponse(BaseModel):
     """Paginated lead list response."""
     leads: List[LeadResponse]
@@ -128,16 +189,14 @@ class StageHistoryResponse(BaseModel):
 class LeadDetailResponse(LeadResponse):
     """Lead detail response with stage history."""
     stage_history: List[StageHistoryResponse] = []
+    stage_history_next_cursor: Optional[str] = None  # Set when history_limit cut the timeline short
 
 
 # ========== Helper Functions ==========
 
-def get_default_stage(db: Session) -> LeadStage:
-    """Get the default stage (first stage)."""
-    stage = db.query(LeadStage).filter(LeadStage.is_default == True).first()
-    if not stage:
-        # Fallback to first stage by order
-        stage = db.query(LeadStage).order_by(LeadStage.order).first()
+def get_default_stage(db: Session) -> StageInfo:
+    """Get the default stage (first stage), from the stage registry."""
+    stage = get_registry_default_stage(db)
     if not stage:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,16 +221,116 @@ def create_stage_history_entry(
     db.flush()
 
 
+def load_stage_history(
+    db: Session,
+    lead_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> tuple:
+    """
+    Load a lead's stage history in chronological order, with stages and users joined in.
+    
+    Always a single query regardless of history length. Entries are ordered by id, which
+    follows insertion (changed_at) order and is stable for entries created in the same
+    second. With a limit, returns at most `limit` entries after the `cursor` entry id plus
+    the cursor for the next page (None on the last page).
+    
+    Returns:
+        Tuple of (history entries, next_cursor)
+    """
+    query = db.query(LeadStageHistory).options(
+        joinedload(LeadStageHistory.stage),
+        joinedload(LeadStageHistory.changed_by_user)
+    ).filter(
+        LeadStageHistory.lead_id == lead_id
+    )
+    
+    if cursor:
+        if not cursor.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid history_cursor"
+            )
+        query = query.filter(LeadStageHistory.id > int(cursor))
+    
+    query = query.order_by(LeadStageHistory.id.asc())
+    
+    if limit is None:
+        return query.all(), None
+    
+    # Fetch one extra row to know whether another page exists
+    entries = query.limit(limit + 1).all()
+    if len(entries) > limit:
+        entries = entries[:limit]
+        return entries, str(entries[-1].id)
+    return entries, None
+
+
+def duplicate_summary(lead: Lead, matched_on: List[str]) -> DuplicateLeadResponse:
+    """Build a duplicate warning entry for a lead."""
+    summary = DuplicateLeadResponse.model_validate(lead)
+    summary.matched_on = matched_on
+    return summary
+
+
+def load_lead_for_response(db: Session, lead_id: int) -> Lead:
+    """
+    (Re)load a lead with its users joined in, in one query.
+
+    The stage relationship is not loaded - lead_response() takes it from the stage registry.
+    """
+    return db.query(Lead).options(
+        noload(Lead.stage),
+        joinedload(Lead.assigned_user),
+        joinedload(Lead.created_by_user)
+    ).populate_existing().filter(Lead.id == lead_id).one()
+
+
+def lead_response(db: Session, lead: Lead, response_model=LeadResponse):
+    """Serialize a lead with its stage resolved from the stage registry."""
+    result = response_model.model_validate(lead)
+    stage = get_stage(db, lead.stage_id)
+    result.stage = LeadStageResponse.model_validate(stage) if stage else None
+    return result
+
+
+def lead_etag(lead_id: int, version: int, *variant: object) -> str:
+    """
+    ETag for a lead - changes whenever the lead row is updated.
+
+    variant: request parameters the response body depends on (field groups, history page);
+    they are hashed into the tag so each representation of a version gets its own.
+    """
+    if variant:
+        return make_etag("lead", lead_id, version, parts_digest(*variant)[:16])
+    return make_etag("lead", lead_id, version)
+
+
+def lead_version_matches(if_match: str, lead_id: int, version: int) -> bool:
+    """If-Match check - any ETag issued for this version of the lead matches, whatever its variant."""
+    current = lead_etag(lead_id, version).strip('"')
+    for candidate in if_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate in ("*", current) or candidate.startswith(current + "-"):
+            return True
+    return False
+
+
 # ========== API Endpoints ==========
 
-@router.post("", response_model=LeadResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=LeadCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_lead(
     lead_data: LeadCreate,
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
     db: Session = Depends(get_db)
 ):
-    """Create a new lead."""
+    """
+    Create a new lead.
+    
+    The lead is always created; leads that share its phone, email or ID number are
+    returned in possible_duplicates so the client can warn the user.
+    """
     # Validate required field
     if not lead_data.full_name:
         raise HTTPException(
@@ -181,7 +340,7 @@ async def create_lead(
     
     # Get or set default stage
     if lead_data.stage_id:
-        stage = db.query(LeadStage).filter(LeadStage.id == lead_data.stage_id).first()
+        stage = get_stage(db, lead_data.stage_id)
         if not stage:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -207,25 +366,34 @@ async def create_lead(
         email=lead_dict.get('email'),
         birth_date=lead_dict.get('birth_date'),
         # Add any other fields from lead_dict
-        **{k: v for k, v in lead_dict.items() if k not in ['stage_id', 'source', 'assigned_user_id', 'full_name', 'client_id', 'phone', 'address', 'email', 'birth_date']}
+        **{k: v for k, v in lead_dict.items() if k not in ['stage_id', 'source', 'assigned_user_id', 'full_name', 'client_id', 'phone', 'address', 'email', 'birth_date', *LEAD_MATCH_KEY_FIELDS]}
     )
     
     db.add(new_lead)
     db.flush()
     
+    # Look up likely duplicates through the normalized key indexes
+    duplicates = find_lead_duplicates(
+        db,
+        current_organization.id,
+        phone=new_lead.phone,
+        email=new_lead.email,
+        client_id=new_lead.client_id,
+        exclude_lead_id=new_lead.id
+    )
+    
     # Create initial stage history entry
     create_stage_history_entry(db, new_lead.id, stage.id, current_user.id)
     
-    db.commit()
-    db.refresh(new_lead)
+    # Schedule reminders for any reminder dates provided
+    sync_lead_reminders(db, new_lead)
     
-    # Load relationships
-    new_lead.stage = stage
-    if new_lead.assigned_user_id:
-        new_lead.assigned_user = db.query(User).filter(User.id == new_lead.assigned_user_id).first()
-    new_lead.created_by_user = current_user
+    db.commit()
+    new_lead = load_lead_for_response(db, new_lead.id)
     
-    return new_lead
+    created = lead_response(db, new_lead, LeadCreateResponse)
+    created.possible_duplicates = [duplicate_summary(lead, matched_on) for lead, matched_on in duplicates]
+    return created
 
 
 @router.get("", response_model=LeadListResponse)
@@ -272,18 +440,15 @@ async def list_leads(
     offset = (page - 1) * limit
     total_pages = (total + limit - 1) // limit
     
-    # Order and paginate
-    leads = query.order_by(Lead.created_at.desc()).offset(offset).limit(limit).all()
-    
-    # Load relationships
-    for lead in leads:
-        lead.stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-        if lead.assigned_user_id:
-            lead.assigned_user = db.query(User).filter(User.id == lead.assigned_user_id).first()
-        lead.created_by_user = db.query(User).filter(User.id == lead.created_by_user_id).first()
+    # Order and paginate - users are joined in, stages come from the stage registry
+    leads = query.options(
+        noload(Lead.stage),
+        joinedload(Lead.assigned_user),
+        joinedload(Lead.created_by_user)
+    ).order_by(Lead.created_at.desc()).offset(offset).limit(limit).all()
     
     return LeadListResponse(
-        leads=leads,
+        leads=[lead_response(db, lead) for lead in leads],
         total=total,
         page=page,
         limit=limit,
@@ -291,64 +456,198 @@ async def list_leads(
     )
 
 
+@router.get("/duplicates", response_model=DuplicateGroupListResponse)
+async def list_duplicate_leads(
+    field: Optional[List[str]] = Query(None, description="Match fields: phone, email, client_id (default: all)"),
+    lead_id: Optional[int] = Query(None, description="Only groups containing this lead"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(50, ge=1, le=100, description="Groups per page"),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """List groups of leads sharing a normalized phone, email or ID number, largest first."""
+    lead = None
+    if lead_id is not None:
+        lead = db.query(Lead).filter(
+            Lead.id == lead_id,
+            Lead.organization_id == current_organization.id,
+            Lead.deleted_at.is_(None)
+        ).first()
+        if not lead:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lead not found"
+            )
+    
+    try:
+        total, groups = find_duplicate_groups(
+            db,
+            current_organization.id,
+            fields=field,
+            lead=lead,
+            limit=limit,
+            offset=(page - 1) * limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return DuplicateGroupListResponse(
+        groups=[
+            DuplicateGroupResponse(
+                field=group['field'],
+                value=group['value'],
+                count=group['count'],
+                leads=[duplicate_summary(group_lead, [group['field']]) for group_lead in group['leads']]
+            )
+            for group in groups
+        ],
+        total=total,
+        page=page,
+        limit=limit
+    )
+
+
 @router.get("/{lead_id}", response_model=LeadDetailResponse)
 async def get_lead(
     lead_id: int,
+    response: Response,
+    history_limit: Optional[int] = Query(None, ge=1, le=500, description="Max stage history entries to return"),
+    history_cursor: Optional[str] = Query(None, description="Return history entries after this cursor"),
+    groups: Optional[List[str]] = Query(None, description="Extension field groups to include (default: all)"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
     db: Session = Depends(get_db)
 ):
-    """Get lead details with stage history."""
-    lead = db.query(Lead).filter(
+    """
+    Get lead details with stage history.
+    
+    Returns an ETag (per lead version, field groups and history page); a request with a
+    matching If-None-Match gets 304 Not Modified after a single version lookup, without
+    loading the lead or its history.
+    The lead and its history are loaded in a constant number of queries; pass
+    history_limit (and then history_cursor) to page through very long timelines.
+    Rarely used field groups (see LEAD_EXTENSION_GROUPS) are joined in only when
+    requested via `groups`; all of them are included by default.
+    """
+    requested_groups = list(LEAD_EXTENSION_GROUPS) if groups is None else groups
+    unknown_groups = set(requested_groups) - set(LEAD_EXTENSION_GROUPS)
+    if unknown_groups:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field groups: {', '.join(sorted(unknown_groups))}"
+        )
+    
+    current_version = db.query(Lead.version).filter(
         Lead.id == lead_id,
         Lead.organization_id == current_organization.id,
         Lead.deleted_at.is_(None)
-    ).first()
+    ).scalar()
     
-    if not lead:
+    if current_version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lead not found"
         )
     
-    # Load relationships
-    lead.stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-    if lead.assigned_user_id:
-        lead.assigned_user = db.query(User).filter(User.id == lead.assigned_user_id).first()
-    lead.created_by_user = db.query(User).filter(User.id == lead.created_by_user_id).first()
+    variant = (sorted(requested_groups), history_limit, history_cursor)
+    etag = lead_etag(lead_id, current_version, *variant)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Load lead with its users and requested extension groups in one query (stage comes from the registry)
+    lead = db.query(Lead).options(
+        noload(Lead.stage),
+        joinedload(Lead.assigned_user),
+        joinedload(Lead.created_by_user),
+        *[joinedload(getattr(Lead, group)) for group in requested_groups]
+    ).filter(
+        Lead.id == lead_id,
+        Lead.organization_id == current_organization.id,
+        Lead.deleted_at.is_(None)
+    ).first()
     
-    # Load stage history
-    stage_history = db.query(LeadStageHistory).filter(
-        LeadStageHistory.lead_id == lead_id
-    ).order_by(LeadStageHistory.changed_at.asc()).all()
+    if not lead:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead not found"
+        )
     
-    # Load relationships for history
-    for history in stage_history:
-        history.stage = db.query(LeadStage).filter(LeadStage.id == history.stage_id).first()
-        history.changed_by_user = db.query(User).filter(User.id == history.changed_by_user_id).first()
+    # Load stage history (stages and users joined in, optionally paginated)
+    stage_history, next_cursor = load_stage_history(db, lead_id, history_limit, history_cursor)
     
     # Create response - LeadDetailResponse extends LeadResponse, so it can be constructed from lead
     # Since we have from_attributes=True, Pydantic will automatically extract attributes
     response_dict = {
-        **{col.name: getattr(lead, col.name) for col in Lead.__table__.columns},
-        'stage': lead.stage,
+        **{
+            field: getattr(lead, field)
+            for field in LEAD_FIELD_NAMES
+            if field not in LEAD_EXTENSION_FIELDS or LEAD_EXTENSION_FIELDS[field] in requested_groups
+        },
+        'stage': get_stage(db, lead.stage_id),
         'assigned_user': lead.assigned_user,
         'created_by_user': lead.created_by_user,
-        'stage_history': stage_history
+        'stage_history': stage_history,
+        'stage_history_next_cursor': next_cursor
     }
-    response = LeadDetailResponse(**response_dict)
-    return response
+    response.headers["ETag"] = lead_etag(lead.id, lead.version, *variant)
+    return LeadDetailResponse(**response_dict)
+
+
+@router.get("/{lead_id}/changes", response_model=LeadChangeListResponse)
+async def list_lead_changes(
+    lead_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Max changes to return"),
+    cursor: Optional[str] = Query(None, description="Return changes older than this cursor"),
+    field: Optional[str] = Query(None, description="Only changes to this field"),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Get the field-level change history of a lead (who changed what, and when)."""
+    lead_exists = db.query(Lead.id).filter(
+        Lead.id == lead_id,
+        Lead.organization_id == current_organization.id
+    ).first()
+    
+    if not lead_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead not found"
+        )
+    
+    try:
+        changes, next_cursor = get_lead_changes(db, lead_id, limit=limit, cursor=cursor, field_name=field)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return LeadChangeListResponse(changes=changes, next_cursor=next_cursor)
 
 
 @router.put("/{lead_id}", response_model=LeadResponse)
+@router.patch("/{lead_id}", response_model=LeadResponse)
 async def update_lead(
     lead_id: int,
     lead_data: LeadUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
     db: Session = Depends(get_db)
 ):
-    """Update a lead."""
+    """
+    Update a lead (PUT and PATCH both apply only the provided fields).
+    
+    Honors If-Match: if the lead changed since the client read it, the update is
+    rejected with 412 Precondition Failed instead of overwriting the other change.
+    """
     lead = db.query(Lead).filter(
         Lead.id == lead_id,
         Lead.organization_id == current_organization.id,
@@ -361,6 +660,12 @@ async def update_lead(
             detail="Lead not found"
         )
     
+    if if_match and not lead_version_matches(if_match, lead.id, lead.version):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Lead was modified by someone else. Reload and try again."
+        )
+    
     # Check if stage changed
     stage_changed = False
     old_stage_id = lead.stage_id
@@ -368,37 +673,45 @@ async def update_lead(
     # Convert to dict and update fields
     update_dict = lead_data.model_dump(exclude_none=True)
     
-    # Handle stage_id separately
-    if 'stage_id' in update_dict and update_dict['stage_id'] != lead.stage_id:
-        stage = db.query(LeadStage).filter(LeadStage.id == update_dict['stage_id']).first()
-        if not stage:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Stage not found"
-            )
-        lead.stage_id = update_dict['stage_id']
-        stage_changed = True
-        del update_dict['stage_id']
-    
-    # Update other fields
-    for field, value in update_dict.items():
-        if hasattr(lead, field):
-            setattr(lead, field, value)
-    
-    # Create stage history entry if stage changed
-    if stage_changed:
-        create_stage_history_entry(db, lead_id, lead.stage_id, current_user.id)
-    
-    db.commit()
-    db.refresh(lead)
-    
-    # Load relationships
-    lead.stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-    if lead.assigned_user_id:
-        lead.assigned_user = db.query(User).filter(User.id == lead.assigned_user_id).first()
-    lead.created_by_user = db.query(User).filter(User.id == lead.created_by_user_id).first()
+    # The versioned UPDATE can run at any flush below (stage history and reminder
+    # bookkeeping flush too), so a concurrent write is caught around all of them
+    try:
+        # Handle stage_id separately
+        if 'stage_id' in update_dict and update_dict['stage_id'] != lead.stage_id:
+            stage = get_stage(db, update_dict['stage_id'])
+            if not stage:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Stage not found"
+                )
+            lead.stage_id = update_dict['stage_id']
+            stage_changed = True
+            del update_dict['stage_id']
+        
+        # Update other fields (match keys are derived, never set directly)
+        for field, value in update_dict.items():
+            if hasattr(lead, field) and field not in LEAD_MATCH_KEY_FIELDS:
+                setattr(lead, field, value)
+        
+        # Create stage history entry if stage changed
+        if stage_changed:
+            create_stage_history_entry(db, lead_id, lead.stage_id, current_user.id)
+        
+        # Reschedule reminders if reminder dates changed
+        sync_lead_reminders(db, lead)
+        
+        db.commit()
+    except StaleDataError:
+        # Another request updated the lead between our read and our write
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Lead was modified by someone else. Reload and try again."
+        )
+    lead = load_lead_for_response(db, lead_id)
+    response.headers["ETag"] = lead_etag(lead.id, lead.version)
     
-    return lead
+    return lead_response(db, lead)
 
 
 @router.delete("/{lead_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -423,6 +736,7 @@ async def delete_lead(
 
     # Soft delete
     lead.deleted_at = datetime.now(timezone.utc)
+    sync_lead_reminders(db, lead)  # Drop pending reminders
     db.commit()
     
     return None
@@ -3,7 +3,7 @@ Public signing API endpoints - no authentication required
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi import Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from pydantic import BaseModel, Field
 from typing import Optional
 from app.core.database import get_db
@@ -120,7 +120,9 @@ async def get_public_signing_page(
     import json
     from datetime import datetime
     
-    existing_signatures = db.query(DocumentSignature).filter(
+    existing_signatures = db.query(DocumentSignature).options(
+        undefer(DocumentSignature.signature_data)
+    ).filter(
         DocumentSignature.document_id == document.id,
         DocumentSignature.signer_type == signing_link.signer_type
     ).all()
@@ -158,13 +160,14 @@ async def get_public_signing_page(
     
     # Replace merge fields on-the-fly for signing page display
     # Editor stores content WITH merge fields, but signing page should show replaced values
-    from app.services.document_generation import replace_merge_fields
+    from app.services.document_generation import document_cache_key, replace_merge_fields
     from app.models.lead import Lead
     
     lead = db.query(Lead).filter(Lead.id == document.lead_id).first()
     if lead and document.rendered_content:
         # Replace merge fields with actual lead values for signing page
-        rendered_content_for_signing = replace_merge_fields(document.rendered_content, lead)
+        cache_key, immutable = document_cache_key(document)
+        rendered_content_for_signing = replace_merge_fields(document.rendered_content, lead, cache_key, immutable)
     else:
         # Fallback: use content as-is if lead not found
         rendered_content_for_signing = document.rendered_content or ""
@@ -0,0 +1,219 @@
+"""
+Lead segments API endpoints.
+"""
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from app.core.database import get_db
+from app.core.auth import get_current_user_dependency, get_current_organization_dependency
+from app.models.user import User
+from app.models.organization import Organization
+from app.models.lead_segment import LeadSegment, LeadSegmentMember
+from app.api.leads import LeadListResponse, lead_response
+from app.services.lead_segments import (
+    SegmentFilter,
+    parse_segment_filters,
+    rebuild_segment_membership,
+    ensure_segment_current,
+    get_segment_leads,
+)
+
+router = APIRouter()
+
+
+# ========== Pydantic Schemas ==========
+
+class SegmentCreate(BaseModel):
+    name: str = Field(..., description="Segment name")
+    description: Optional[str] = None
+    filters: List[SegmentFilter] = []
+
+
+class SegmentUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    filters: Optional[List[SegmentFilter]] = None
+
+
+class SegmentResponse(BaseModel):
+    id: int
+    organization_id: int
+    created_by_user_id: int
+    name: str
+    description: Optional[str] = None
+    filters: List[SegmentFilter]
+    member_count: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+# ========== Helper Functions ==========
+
+def segment_to_response(segment: LeadSegment) -> SegmentResponse:
+    """Build a segment response (filters are stored as a JSON string)."""
+    return SegmentResponse(
+        id=segment.id,
+        organization_id=segment.organization_id,
+        created_by_user_id=segment.created_by_user_id,
+        name=segment.name,
+        description=segment.description,
+        filters=json.loads(segment.filters or '[]'),
+        member_count=segment.member_count,
+        created_at=segment.created_at,
+        updated_at=segment.updated_at
+    )
+
+
+def get_segment_or_404(db: Session, segment_id: int, organization_id: int) -> LeadSegment:
+    segment = db.query(LeadSegment).filter(
+        LeadSegment.id == segment_id,
+        LeadSegment.organization_id == organization_id
+    ).first()
+    if not segment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    return segment
+
+
+def validated_filters_json(filters: List[SegmentFilter]) -> str:
+    """Validate filters and serialize them for storage."""
+    raw_filters = [condition.model_dump() for condition in filters]
+    try:
+        parse_segment_filters(raw_filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return json.dumps(raw_filters, ensure_ascii=False)
+
+
+# ========== API Endpoints ==========
+
+@router.get("", response_model=List[SegmentResponse])
+async def list_segments(
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """List the organization's saved segments with their member counts."""
+    segments = db.query(LeadSegment).filter(
+        LeadSegment.organization_id == current_organization.id
+    ).order_by(LeadSegment.name.asc()).all()
+
+    for segment in segments:
+        ensure_segment_current(db, segment)
+
+    return [segment_to_response(segment) for segment in segments]
+
+
+@router.post("", response_model=SegmentResponse, status_code=status.HTTP_201_CREATED)
+async def create_segment(
+    segment_data: SegmentCreate,
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Save a segment and build its membership."""
+    segment = LeadSegment(
+        organization_id=current_organization.id,
+        created_by_user_id=current_user.id,
+        name=segment_data.name,
+        description=segment_data.description,
+        filters=validated_filters_json(segment_data.filters),
+        member_count=0
+    )
+    db.add(segment)
+    db.flush()
+
+    rebuild_segment_membership(db, segment)
+    db.commit()
+    db.refresh(segment)
+
+    return segment_to_response(segment)
+
+
+@router.get("/{segment_id}", response_model=SegmentResponse)
+async def get_segment(
+    segment_id: int,
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Get a segment."""
+    segment = get_segment_or_404(db, segment_id, current_organization.id)
+    ensure_segment_current(db, segment)
+    return segment_to_response(segment)
+
+
+@router.put("/{segment_id}", response_model=SegmentResponse)
+async def update_segment(
+    segment_id: int,
+    segment_data: SegmentUpdate,
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Update a segment. Changing its filters rebuilds the membership."""
+    segment = get_segment_or_404(db, segment_id, current_organization.id)
+
+    if segment_data.name is not None:
+        segment.name = segment_data.name
+    if segment_data.description is not None:
+        segment.description = segment_data.description
+    if segment_data.filters is not None:
+        filters_json = validated_filters_json(segment_data.filters)
+        if filters_json != segment.filters:
+            segment.filters = filters_json
+            rebuild_segment_membership(db, segment)
+
+    db.commit()
+    db.refresh(segment)
+
+    return segment_to_response(segment)
+
+
+@router.delete("/{segment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_segment(
+    segment_id: int,
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Delete a segment and its membership."""
+    segment = get_segment_or_404(db, segment_id, current_organization.id)
+
+    db.query(LeadSegmentMember).filter(LeadSegmentMember.segment_id == segment.id).delete(synchronize_session=False)
+    db.delete(segment)
+    db.commit()
+
+    return None
+
+
+@router.get("/{segment_id}/leads", response_model=LeadListResponse)
+async def list_segment_leads(
+    segment_id: int,
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(50, ge=1, le=100, description="Items per page"),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+    db: Session = Depends(get_db)
+):
+    """Open a segment: its leads come from the maintained membership, not a filter scan."""
+    segment = get_segment_or_404(db, segment_id, current_organization.id)
+
+    leads = get_segment_leads(db, segment, offset=(page - 1) * limit, limit=limit)
+    total = segment.member_count
+
+    return LeadListResponse(
+        leads=[lead_response(db, lead) for lead in leads],
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit
+    )
@@ -3,22 +3,57 @@ Stages API endpoints.
 """
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from typing import List
+from pydantic import BaseModel
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.auth import get_current_user_dependency
 from app.models.user import User
-from app.models.lead_stage import LeadStage
 from app.api.leads import LeadStageResponse
+from app.services.stage_registry import list_stages as list_registry_stages, get_stage
+from app.services.stage_transitions import list_transition_rules
 
 router = APIRouter()
 
 
+# ========== Pydantic Schemas ==========
+
+class StageTransitionRuleResponse(BaseModel):
+    id: int
+    event: str
+    contract_type: Optional[str] = None
+    document_type: Optional[str] = None
+    mode: str
+    target_stage_id: int
+    target_stage_name: Optional[str] = None
+
+
+# ========== API Endpoints ==========
+
 @router.get("", response_model=List[LeadStageResponse])
 async def list_stages(
     current_user: User = Depends(get_current_user_dependency),
     db: Session = Depends(get_db)
 ):
-    """List all global stages (read-only)."""
-    stages = db.query(LeadStage).order_by(LeadStage.order.asc()).all()
-    return stages
+    """List all global stages (read-only), from the stage registry."""
+    return list_registry_stages(db)
 
+
+@router.get("/transition-rules", response_model=List[StageTransitionRuleResponse])
+async def list_stage_transition_rules(
+    current_user: User = Depends(get_current_user_dependency),
+    db: Session = Depends(get_db)
+):
+    """List the active stage transition rules (read-only) - which document events move leads to which stage."""
+    rules = []
+    for rule in list_transition_rules(db):
+        target_stage = get_stage(db, rule.target_stage_id)
+        rules.append(StageTransitionRuleResponse(
+            id=rule.id,
+            event=rule.event,
+            contract_type=rule.contract_type,
+            document_type=rule.document_type,
+            mode=rule.mode,
+            target_stage_id=rule.target_stage_id,
+            target_stage_name=target_stage.name if target_stage else None
+        ))
+    return rules
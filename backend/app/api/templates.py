@@ -1,8 +1,8 @@
 """
 Templates API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.orm import Session, joinedload, load_only
 from sqlalchemy import or_
 from pydantic import BaseModel, Field
 from typing import Optional
@@ -10,9 +10,14 @@ from datetime import datetime
 import json
 from app.core.database import get_db
 from app.core.auth import get_current_user_dependency, get_current_organization_dependency
+from app.core.http_cache import make_etag, hash_etag, etag_matches
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.document_template import DocumentTemplate
+from app.models.html_blob import HtmlBlob
+from app.services.document_generation import validate_merge_fields
+from app.services.html_normalization import normalize_html
+from app.services.template_versions import record_template_version, list_template_versions, get_template_version
 
 router = APIRouter()
 
@@ -68,6 +73,45 @@ class TemplateResponse(BaseModel):
         from_attributes = True
 
 
+class TemplateSummaryResponse(BaseModel):
+    """Template list entry - no content; fetch GET /templates/{id} for that."""
+    id: int
+    organization_id: int
+    name: str
+    description: Optional[str] = None
+    created_by_user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    is_active: bool
+    created_by_user: Optional[TemplateUserResponse] = None
+    field_count: int = Field(..., description="Distinct merge fields in the content")
+    size_bytes: int = Field(..., description="Size of the HTML content in bytes")
+
+    class Config:
+        from_attributes = True
+
+
+class TemplateVersionResponse(BaseModel):
+    """Template version list entry - no content."""
+    id: int
+    template_id: int
+    version_number: int
+    content_sha256: str
+    field_count: int
+    created_by_user_id: Optional[int] = None
+    created_at: datetime
+    created_by_user: Optional[TemplateUserResponse] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TemplateVersionDetailResponse(TemplateVersionResponse):
+    """Template version with its content."""
+    content: str
+    signature_blocks: Optional[str] = None
+
+
 # ========== Helper Functions ==========
 
 def validate_signature_blocks_json(signature_blocks: Optional[str]) -> bool:
@@ -93,12 +137,91 @@ def validate_signature_blocks_json(signature_blocks: Optional[str]) -> bool:
         return False
 
 
+def ensure_known_merge_fields(content: str, template_id: Optional[int] = None) -> int:
+    """
+    Reject content that references fields leads don't have (same scan as document generation).
+    Returns the number of distinct merge fields, stored as the template's field_count.
+    """
+    validation = validate_merge_fields(content, cache_key=('template', template_id) if template_id else None)
+    if not validation['valid']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid merge fields: {', '.join(validation['missing_fields'])}"
+        )
+    return len(validation['all_fields'])
+
+
+def template_summary(template: DocumentTemplate) -> TemplateSummaryResponse:
+    """List entry for a template loaded with its creator and blob size (see list_templates)."""
+    return TemplateSummaryResponse(
+        id=template.id,
+        organization_id=template.organization_id,
+        name=template.name,
+        description=template.description,
+        created_by_user_id=template.created_by_user_id,
+        created_at=template.created_at,
+        updated_at=template.updated_at,
+        is_active=template.is_active,
+        created_by_user=template.created_by_user,
+        field_count=template.field_count,
+        size_bytes=template.content_blob.size_bytes,
+    )
+
+
+def get_accessible_template(db: Session, template_id: int, organization_id: int) -> DocumentTemplate:
+    """Active template of the organization, or 404/403."""
+    template = db.query(DocumentTemplate).filter(
+        DocumentTemplate.id == template_id,
+        DocumentTemplate.is_active == True
+    ).first()
+
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found"
+        )
+
+    # Verify organization access
+    if template.organization_id != organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this template"
+        )
+    return template
+
+
+def template_etag(template_id: int, version_row) -> str:
+    """
+    ETag for a template - hashes the small columns and the content hash, so any edit
+    (even two within the same second of updated_at) changes it without reading the HTML.
+    """
+    return hash_etag("template", template_id, *version_row)
+
+
+def template_version_row(db: Session, template_id: int):
+    """Columns that make up a template's ETag, or None if there is no such active template."""
+    return db.query(
+        DocumentTemplate.organization_id,
+        DocumentTemplate.name,
+        DocumentTemplate.description,
+        DocumentTemplate.signature_blocks,
+        DocumentTemplate.content_sha256,
+        DocumentTemplate.created_by_user_id,
+        DocumentTemplate.updated_at,
+    ).filter(
+        DocumentTemplate.id == template_id,
+        DocumentTemplate.is_active == True
+    ).first()
+
+
 # ========== API Endpoints ==========
 
-@router.get("/organizations/{organization_id}/templates", response_model=list[TemplateResponse])
+@router.get("/organizations/{organization_id}/templates", response_model=list[TemplateSummaryResponse])
 async def list_templates(
     organization_id: int,
+    response: Response,
     search: Optional[str] = Query(None, description="Search in name and description"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
@@ -106,6 +229,10 @@ async def list_templates(
     """
     List all templates for an organization.
     Requires organization membership.
+
+    Returns summaries without content or signature blocks (GET /templates/{id} has those),
+    with creators and content sizes joined in, in a single query. Returns an ETag; a request
+    with a matching If-None-Match gets 304 Not Modified.
     """
     # Verify organization access
     if current_organization.id != organization_id:
@@ -114,8 +241,21 @@ async def list_templates(
             detail="Access denied to this organization"
         )
 
-    # Build query
-    query = db.query(DocumentTemplate).filter(
+    # Build query - summary columns only, creator and blob size joined in (never the HTML)
+    query = db.query(DocumentTemplate).options(
+        load_only(
+            DocumentTemplate.organization_id,
+            DocumentTemplate.name,
+            DocumentTemplate.description,
+            DocumentTemplate.created_by_user_id,
+            DocumentTemplate.created_at,
+            DocumentTemplate.updated_at,
+            DocumentTemplate.is_active,
+            DocumentTemplate.field_count,
+        ),
+        joinedload(DocumentTemplate.created_by_user).load_only(User.email, User.full_name),
+        joinedload(DocumentTemplate.content_blob).load_only(HtmlBlob.size_bytes),
+    ).filter(
         DocumentTemplate.organization_id == organization_id,
         DocumentTemplate.is_active == True
     )
@@ -133,13 +273,14 @@ async def list_templates(
     # Order by most recent first
     query = query.order_by(DocumentTemplate.updated_at.desc())
 
-    templates = query.all()
+    summaries = [template_summary(template) for template in query.all()]
 
-    # Load relationships
-    for template in templates:
-        db.refresh(template, ["created_by_user"])
+    etag = hash_etag("templates", *(summary.model_dump_json() for summary in summaries))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    return templates
+    response.headers["ETag"] = etag
+    return summaries
 
 
 @router.post("/organizations/{organization_id}/templates", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
@@ -168,18 +309,23 @@ async def create_template(
             detail="Invalid signature_blocks JSON format"
         )
 
+    content = normalize_html(template_data.content)
+    field_count = ensure_known_merge_fields(content)
+
     # Create template
     template = DocumentTemplate(
         organization_id=organization_id,
         name=template_data.name,
         description=template_data.description,
-        content=template_data.content,
+        content=content,
+        field_count=field_count,
         signature_blocks=template_data.signature_blocks,
         created_by_user_id=current_user.id,
         is_active=True
     )
 
     db.add(template)
+    record_template_version(db, template, current_user.id)
     db.commit()
     db.refresh(template)
     db.refresh(template, ["created_by_user"])
@@ -190,15 +336,28 @@ async def create_template(
 @router.get("/templates/{template_id}", response_model=TemplateResponse)
 async def get_template(
     template_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_dependency),
     current_organization: Organization = Depends(get_current_organization_dependency),
 ):
     """
-    Get a template by ID.
+    Get a template by ID, including its content.
     Requires organization membership.
+
+    Returns an ETag; a request with a matching If-None-Match gets 304 Not Modified
+    after a single lookup of the template's small columns, without reading the HTML.
     """
-    template = db.query(DocumentTemplate).filter(
+    version_row = template_version_row(db, template_id)
+    if version_row is not None and version_row.organization_id == current_organization.id:
+        etag = template_etag(template_id, version_row)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    template = db.query(DocumentTemplate).options(
+        joinedload(DocumentTemplate.created_by_user)
+    ).filter(
         DocumentTemplate.id == template_id,
         DocumentTemplate.is_active == True
     ).first()
@@ -216,8 +375,7 @@ async def get_template(
             detail="Access denied to this template"
         )
 
-    db.refresh(template, ["created_by_user"])
-
+    response.headers["ETag"] = template_etag(template_id, version_row)
     return template
 
 
@@ -257,7 +415,9 @@ async def update_template(
     if template_data.description is not None:
         template.description = template_data.description
     if template_data.content is not None:
-        template.content = template_data.content
+        content = normalize_html(template_data.content)
+        template.field_count = ensure_known_merge_fields(content, template.id)
+        template.content = content
     if template_data.signature_blocks is not None:
         # Validate signature_blocks JSON
         if template_data.signature_blocks and not validate_signature_blocks_json(template_data.signature_blocks):
@@ -269,6 +429,8 @@ async def update_template(
 
     # updated_at is automatically set by onupdate
 
+    # Snapshot changed content/signature blocks; documents keep the version they were generated from
+    record_template_version(db, template, current_user.id)
     db.commit()
     db.refresh(template)
     db.refresh(template, ["created_by_user"])
@@ -349,15 +511,64 @@ async def duplicate_template(
         name=f"העתק של {template.name}",
         description=template.description,
         content=template.content,
+        field_count=template.field_count,
         signature_blocks=template.signature_blocks,
         created_by_user_id=current_user.id,
         is_active=True
     )
 
     db.add(new_template)
+    record_template_version(db, new_template, current_user.id)
     db.commit()
     db.refresh(new_template)
     db.refresh(new_template, ["created_by_user"])
 
     return new_template
 
+
+@router.get("/templates/{template_id}/versions", response_model=list[TemplateVersionResponse])
+async def list_versions(
+    template_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+):
+    """
+    List a template's versions, newest first (without content).
+    Requires organization membership.
+    """
+    get_accessible_template(db, template_id, current_organization.id)
+    return list_template_versions(db, template_id)
+
+
+@router.get("/templates/{template_id}/versions/{version_number}", response_model=TemplateVersionDetailResponse)
+async def get_version(
+    template_id: int,
+    version_number: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_dependency),
+    current_organization: Organization = Depends(get_current_organization_dependency),
+):
+    """
+    Get one version of a template, including its content.
+    Requires organization membership.
+
+    Versions never change, so the ETag is the version id and a matching If-None-Match
+    gets 304 Not Modified without reading the content.
+    """
+    get_accessible_template(db, template_id, current_organization.id)
+    version = get_template_version(db, template_id, version_number)
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template version not found"
+        )
+
+    etag = make_etag("template-version", version.id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return version
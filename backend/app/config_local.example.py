@@ -25,3 +25,55 @@ SMTP_FROM_NAME = "Doc Flow"  # Display name
 EMAIL_VERIFICATION_TOKEN_EXPIRY_HOURS = 24  # Token expires after 24 hours
 FRONTEND_BASE_URL = "http://localhost:3000"  # Change to your production URL
 
+
+# Reminder scheduler (runs in one elected worker process)
+REMINDER_SCHEDULER_ENABLED = True
+REMINDER_SCAN_INTERVAL_SECONDS = 60  # How often due reminders are picked up
+REMINDER_BATCH_SIZE = 50  # Reminders claimed per batch
+REMINDER_LEASE_SECONDS = 300  # Claimed reminders are retried by another run after this
+REMINDER_SEND_HOUR_UTC = 6  # Hour (UTC) at which a reminder date becomes due
+REMINDER_MAX_ATTEMPTS = 5  # Give up on a reminder after this many failed sends
+
+# Lead change log (field-level audit trail, written in batches off the request path)
+CHANGE_LOG_FLUSH_INTERVAL_SECONDS = 1.0  # Max delay before queued changes are written
+CHANGE_LOG_BATCH_SIZE = 500  # Rows per INSERT batch
+CHANGE_LOG_MAX_QUEUE = 10000  # Writers block (instead of dropping changes) when the queue is full
+
+# Stage registry (in-memory stage cache)
+STAGE_REGISTRY_CHECK_SECONDS = 30  # How often a worker checks whether another worker changed the stages
+
+# Compiled merge-field templates (per worker, LRU)
+TEMPLATE_CACHE_SIZE = 256  # Templates/documents kept compiled in memory
+
+# Batch (mail-merge) document generation
+DOCUMENT_BATCH_MAX_LEADS = 1000  # Max leads per batch request
+DOCUMENT_BATCH_CHUNK_SIZE = 100  # Leads loaded/inserted per statement (one progress event each)
+
+# PDF rendering (signed documents -> PDF_STORAGE_DIR/{organization_id}/{document_id}.pdf)
+PDF_STORAGE_DIR = "storage/pdfs"
+PDF_FONT_DIR = None  # Directory with .ttf/.otf Hebrew fonts (e.g. Noto Sans Hebrew) embedded in the PDFs
+PDF_RENDER_WORKERS = 2  # Renderer processes
+PDF_RENDER_MAX_QUEUE = 1000  # Render jobs waiting for a worker
+SIGNATURE_IMAGE_CACHE_SIZE = 256  # Decoded signature images kept per renderer process for stamping
+
+# Compressed text columns (document/template HTML, signature images)
+COMPRESSION_CODEC = "zlib"  # Or "zstd" (requires the zstandard package); existing values stay readable either way
+COMPRESSION_LEVEL = 6
+COMPRESSION_MIN_BYTES = 512  # Shorter values are stored as plain text
+
+# HTTP response encoding (GET /api/documents/{id}/content)
+RESPONSE_COMPRESSION_MIN_BYTES = 1024  # Smaller bodies are sent uncompressed; br needs the brotli package, else gzip
+ENCODED_RESPONSE_CACHE_SIZE = 128  # Compressed bodies kept per worker, keyed by content hash
+
+# Uploaded PDFs (streamed to disk in chunks, hashed while streaming)
+UPLOAD_STORAGE_DIR = "storage/uploads"
+UPLOAD_MAX_BYTES = 100 * 1024 * 1024  # Larger uploads are rejected with 413
+UPLOAD_CHUNK_BYTES = 1024 * 1024  # Read/write chunk size
+
+# PDF downloads
+# Let the fronting proxy send the file bytes instead of a Python worker:
+#   "x-accel-redirect" (nginx) - e.g. location /protected-files/ { internal; alias /srv/app/backend/; }
+#   "x-sendfile" (Apache mod_xsendfile, lighttpd) - the header carries the absolute path
+FILE_DOWNLOAD_OFFLOAD = None
+FILE_DOWNLOAD_ACCEL_PREFIX = "/protected-files/"  # Internal location mapped to the backend working directory
+SIGNED_PDF_MAX_AGE_SECONDS = 86400  # Browser cache lifetime of signed documents' PDFs (uploads are immutable)
@@ -118,6 +118,9 @@ def get_current_user_dependency(
             detail="User not found or inactive"
         )
     
+    # Remember who is acting in this session (used as the author of lead change log rows)
+    db.info['user_id'] = user.id
+    
     # Attach impersonation info to user object if present
     if session_data.get('is_impersonated') and session_data.get('impersonated_by'):
         user._impersonated_by = session_data.get('impersonated_by')
@@ -0,0 +1,73 @@
+"""
+Transparent compression for large text columns (contract HTML, base64 signature images).
+
+Values of at least COMPRESSION_MIN_BYTES are stored as bytes: one header byte naming the
+codec followed by the compressed UTF-8 text. Shorter values are stored as plain text, and so
+are rows written before compression was enabled - a str read from the database is returned
+as-is, which lets scripts/compress_text_columns.py convert existing rows while the app runs.
+
+Values are inflated when the column is loaded, so models map these columns deferred (and
+the HTML blob relationships lazy): a row loaded for its other fields never reads or inflates
+them. Queries that serialize them for many rows undefer() them.
+"""
+import logging
+import zlib
+from typing import Optional, Union
+from sqlalchemy.types import Text, TypeDecorator
+from app.core.config import COMPRESSION_CODEC, COMPRESSION_LEVEL, COMPRESSION_MIN_BYTES
+
+try:
+    import zstandard
+except ImportError:  # Optional - zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# First byte of a compressed value
+HEADER_ZLIB = 0x01
+HEADER_ZSTD = 0x02
+
+if COMPRESSION_CODEC == 'zstd' and zstandard is None:
+    logger.warning("COMPRESSION_CODEC is 'zstd' but zstandard is not installed; using zlib")
+_WRITE_HEADER = HEADER_ZSTD if COMPRESSION_CODEC == 'zstd' and zstandard is not None else HEADER_ZLIB
+
+
+def compress_text(value: str, min_bytes: int = COMPRESSION_MIN_BYTES) -> Union[str, bytes]:
+    """Stored form of a text value: header + compressed bytes, or the text itself if short."""
+    data = value.encode('utf-8')
+    if len(data) < min_bytes:
+        return value
+    if _WRITE_HEADER == HEADER_ZSTD:
+        return bytes([HEADER_ZSTD]) + zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+    return bytes([HEADER_ZLIB]) + zlib.compress(data, COMPRESSION_LEVEL)
+
+
+def decompress_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """Text of a stored value (plain text is returned unchanged)."""
+    if value is None or isinstance(value, str):
+        return value
+    header, payload = value[0], value[1:]
+    if header == HEADER_ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if header == HEADER_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Value is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    raise ValueError(f"Unknown compression header: {header:#04x}")
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column stored compressed (see module docstring). The column stays TEXT in the
+    schema; SQLite keeps the compressed values as BLOBs in it.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
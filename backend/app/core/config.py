@@ -39,6 +39,62 @@ except ImportError:
     EMAIL_VERIFICATION_TOKEN_EXPIRY_HOURS: int = 24
     FRONTEND_BASE_URL: str = "http://localhost:3000"
 
+# Optional settings - older config_local.py files may not define these,
+# so each one falls back to its default individually.
+try:
+    from app import config_local as _config_local
+except ImportError:
+    _config_local = None
+
+# Reminder scheduler
+REMINDER_SCHEDULER_ENABLED: bool = getattr(_config_local, "REMINDER_SCHEDULER_ENABLED", True)
+REMINDER_SCAN_INTERVAL_SECONDS: int = getattr(_config_local, "REMINDER_SCAN_INTERVAL_SECONDS", 60)
+REMINDER_BATCH_SIZE: int = getattr(_config_local, "REMINDER_BATCH_SIZE", 50)
+REMINDER_LEASE_SECONDS: int = getattr(_config_local, "REMINDER_LEASE_SECONDS", 300)
+REMINDER_SEND_HOUR_UTC: int = getattr(_config_local, "REMINDER_SEND_HOUR_UTC", 6)  # 09:00 Israel time
+REMINDER_MAX_ATTEMPTS: int = getattr(_config_local, "REMINDER_MAX_ATTEMPTS", 5)
+
+# Lead change log appender
+CHANGE_LOG_FLUSH_INTERVAL_SECONDS: float = getattr(_config_local, "CHANGE_LOG_FLUSH_INTERVAL_SECONDS", 1.0)
+CHANGE_LOG_BATCH_SIZE: int = getattr(_config_local, "CHANGE_LOG_BATCH_SIZE", 500)
+CHANGE_LOG_MAX_QUEUE: int = getattr(_config_local, "CHANGE_LOG_MAX_QUEUE", 10000)
+
+# Stage registry
+STAGE_REGISTRY_CHECK_SECONDS: int = getattr(_config_local, "STAGE_REGISTRY_CHECK_SECONDS", 30)
+
+# Compiled merge-field template cache
+TEMPLATE_CACHE_SIZE: int = getattr(_config_local, "TEMPLATE_CACHE_SIZE", 256)
+
+# Batch (mail-merge) document generation
+DOCUMENT_BATCH_MAX_LEADS: int = getattr(_config_local, "DOCUMENT_BATCH_MAX_LEADS", 1000)
+DOCUMENT_BATCH_CHUNK_SIZE: int = getattr(_config_local, "DOCUMENT_BATCH_CHUNK_SIZE", 100)
+
+# PDF rendering
+PDF_STORAGE_DIR: str = getattr(_config_local, "PDF_STORAGE_DIR", "storage/pdfs")
+PDF_FONT_DIR: Optional[str] = getattr(_config_local, "PDF_FONT_DIR", None)
+PDF_RENDER_WORKERS: int = getattr(_config_local, "PDF_RENDER_WORKERS", 2)
+PDF_RENDER_MAX_QUEUE: int = getattr(_config_local, "PDF_RENDER_MAX_QUEUE", 1000)
+SIGNATURE_IMAGE_CACHE_SIZE: int = getattr(_config_local, "SIGNATURE_IMAGE_CACHE_SIZE", 256)
+
+# Compressed text columns (document/template HTML, signature images)
+COMPRESSION_CODEC: str = getattr(_config_local, "COMPRESSION_CODEC", "zlib")
+COMPRESSION_LEVEL: int = getattr(_config_local, "COMPRESSION_LEVEL", 6)
+COMPRESSION_MIN_BYTES: int = getattr(_config_local, "COMPRESSION_MIN_BYTES", 512)
+
+# HTTP response encoding (document content endpoint)
+RESPONSE_COMPRESSION_MIN_BYTES: int = getattr(_config_local, "RESPONSE_COMPRESSION_MIN_BYTES", 1024)
+ENCODED_RESPONSE_CACHE_SIZE: int = getattr(_config_local, "ENCODED_RESPONSE_CACHE_SIZE", 128)
+
+# Uploaded PDFs
+UPLOAD_STORAGE_DIR: str = getattr(_config_local, "UPLOAD_STORAGE_DIR", "storage/uploads")
+UPLOAD_MAX_BYTES: int = getattr(_config_local, "UPLOAD_MAX_BYTES", 100 * 1024 * 1024)
+UPLOAD_CHUNK_BYTES: int = getattr(_config_local, "UPLOAD_CHUNK_BYTES", 1024 * 1024)
+
+# PDF downloads
+FILE_DOWNLOAD_OFFLOAD: Optional[str] = getattr(_config_local, "FILE_DOWNLOAD_OFFLOAD", None)
+FILE_DOWNLOAD_ACCEL_PREFIX: str = getattr(_config_local, "FILE_DOWNLOAD_ACCEL_PREFIX", "/protected-files/")
+SIGNED_PDF_MAX_AGE_SECONDS: int = getattr(_config_local, "SIGNED_PDF_MAX_AGE_SECONDS", 86400)
+
 
 def get_settings():
     """Return settings object (for FastAPI dependency injection if needed)."""
@@ -56,5 +112,34 @@ def get_settings():
         "smtp_from_name": SMTP_FROM_NAME,
         "email_verification_token_expiry_hours": EMAIL_VERIFICATION_TOKEN_EXPIRY_HOURS,
         "frontend_base_url": FRONTEND_BASE_URL,
+        "reminder_scheduler_enabled": REMINDER_SCHEDULER_ENABLED,
+        "reminder_scan_interval_seconds": REMINDER_SCAN_INTERVAL_SECONDS,
+        "reminder_batch_size": REMINDER_BATCH_SIZE,
+        "reminder_lease_seconds": REMINDER_LEASE_SECONDS,
+        "reminder_send_hour_utc": REMINDER_SEND_HOUR_UTC,
+        "reminder_max_attempts": REMINDER_MAX_ATTEMPTS,
+        "change_log_flush_interval_seconds": CHANGE_LOG_FLUSH_INTERVAL_SECONDS,
+        "change_log_batch_size": CHANGE_LOG_BATCH_SIZE,
+        "change_log_max_queue": CHANGE_LOG_MAX_QUEUE,
+        "stage_registry_check_seconds": STAGE_REGISTRY_CHECK_SECONDS,
+        "template_cache_size": TEMPLATE_CACHE_SIZE,
+        "document_batch_max_leads": DOCUMENT_BATCH_MAX_LEADS,
+        "document_batch_chunk_size": DOCUMENT_BATCH_CHUNK_SIZE,
+        "pdf_storage_dir": PDF_STORAGE_DIR,
+        "pdf_font_dir": PDF_FONT_DIR,
+        "pdf_render_workers": PDF_RENDER_WORKERS,
+        "pdf_render_max_queue": PDF_RENDER_MAX_QUEUE,
+        "signature_image_cache_size": SIGNATURE_IMAGE_CACHE_SIZE,
+        "compression_codec": COMPRESSION_CODEC,
+        "compression_level": COMPRESSION_LEVEL,
+        "compression_min_bytes": COMPRESSION_MIN_BYTES,
+        "response_compression_min_bytes": RESPONSE_COMPRESSION_MIN_BYTES,
+        "encoded_response_cache_size": ENCODED_RESPONSE_CACHE_SIZE,
+        "upload_storage_dir": UPLOAD_STORAGE_DIR,
+        "upload_max_bytes": UPLOAD_MAX_BYTES,
+        "upload_chunk_bytes": UPLOAD_CHUNK_BYTES,
+        "file_download_offload": FILE_DOWNLOAD_OFFLOAD,
+        "file_download_accel_prefix": FILE_DOWNLOAD_ACCEL_PREFIX,
+        "signed_pdf_max_age_seconds": SIGNED_PDF_MAX_AGE_SECONDS,
     })()
 
@@ -0,0 +1,122 @@
+"""
+File download responses - conditional, range-aware and optionally served by the proxy.
+
+file_download_response() answers If-None-Match with 304 and a single-range Range request
+(honouring If-Range) with 206, streaming only the requested bytes. With
+FILE_DOWNLOAD_OFFLOAD set, the bytes are not sent by Python at all: the response carries
+an X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd) header and the fronting proxy
+serves the file, including ranges, without tying up a worker.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote
+from fastapi import Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from app.core.config import FILE_DOWNLOAD_OFFLOAD, FILE_DOWNLOAD_ACCEL_PREFIX
+from app.core.http_cache import etag_matches, parse_byte_range
+
+logger = logging.getLogger(__name__)
+
+RANGE_CHUNK_BYTES = 64 * 1024
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Bytes start..end (inclusive) of a file, in chunks (iterated in the threadpool)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _offload_headers(path: Path) -> Optional[dict]:
+    """X-Accel-Redirect / X-Sendfile header for the configured proxy, or None to serve directly."""
+    if FILE_DOWNLOAD_OFFLOAD == "x-sendfile":
+        return {"X-Sendfile": str(path.resolve())}
+    if FILE_DOWNLOAD_OFFLOAD == "x-accel-redirect":
+        relative = os.path.relpath(path.resolve(), Path.cwd().resolve())
+        if relative.startswith(".."):
+            logger.warning(f"Cannot offload {path}: outside the working directory mapped by FILE_DOWNLOAD_ACCEL_PREFIX")
+            return None
+        return {"X-Accel-Redirect": FILE_DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + quote(Path(relative).as_posix())}
+    return None
+
+
+def file_download_response(
+    path: Path,
+    stat_result: os.stat_result,
+    *,
+    media_type: str,
+    filename: str,
+    etag: str,
+    cache_control: str,
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+    if_none_match: Optional[str] = None
+) -> Response:
+    """
+    Response sending a file as an attachment.
+
+    Args:
+        path: File to send
+        stat_result: os.stat() of the file (its size bounds the ranges)
+        media_type: Content-Type
+        filename: Download filename
+        etag: Strong ETag of the file
+        cache_control: Cache-Control header value
+        range_header: Range request header
+        if_range: If-Range request header - the range is only served if it matches etag
+        if_none_match: If-None-Match request header
+
+    Returns:
+        304, 206, 416 or 200 response (200 with an offload header and no body if offloaded)
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition(filename)
+    offload = _offload_headers(path)
+    if offload is not None:
+        return Response(media_type=media_type, headers={**headers, **offload})
+
+    size = stat_result.st_size
+    byte_range = None
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    if byte_range is None:
+        return FileResponse(path=str(path), media_type=media_type, headers=headers, stat_result=stat_result)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
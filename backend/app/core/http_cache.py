@@ -0,0 +1,177 @@
+"""
+HTTP caching helpers - ETag generation, conditional request matching, response encoding
+and byte ranges.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from app.core.config import RESPONSE_COMPRESSION_MIN_BYTES, ENCODED_RESPONSE_CACHE_SIZE
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is always available
+    brotli = None
+
+
+def make_etag(*parts: object, weak: bool = False) -> str:
+    """
+    Build a quoted ETag from the given parts.
+
+    Short identifying parts (ids, version numbers) are joined as-is;
+    use hash_etag() when the parts are large or contain arbitrary text.
+    """
+    value = "-".join(str(part) for part in parts)
+    return f'W/"{value}"' if weak else f'"{value}"'
+
+
+def parts_digest(*parts: object) -> str:
+    """Hex SHA-256 digest (first 32 characters) of the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+def hash_etag(*parts: object, weak: bool = False) -> str:
+    """Build a quoted ETag from a SHA-256 digest of the given parts."""
+    return make_etag(parts_digest(*parts), weak=weak)
+
+
+def file_etag(stat_result) -> str:
+    """Strong ETag of a file that is only ever replaced atomically (inode, mtime and size)."""
+    return make_etag(f"{stat_result.st_ino:x}", f"{stat_result.st_mtime_ns:x}", f"{stat_result.st_size:x}")
+
+
+def _strip_weak(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header_value: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match / If-Match header value against an ETag.
+
+    Accepts comma-separated lists and '*'. Comparison is weak (the W/ prefix is ignored),
+    which is what If-None-Match requires and is safe for our If-Match use since every
+    ETag we issue changes whenever the representation changes.
+    """
+    if not header_value:
+        return False
+    if header_value.strip() == "*":
+        return True
+    target = _strip_weak(etag)
+    return any(_strip_weak(candidate) == target for candidate in header_value.split(","))
+
+
+# ========== Response encoding ==========
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """
+    Content coding to send a body of `size` bytes with: 'br' (if brotli is installed) or
+    'gzip', preferring the higher q-value and br on a tie; None for identity, which is
+    also used for bodies under RESPONSE_COMPRESSION_MIN_BYTES.
+    """
+    if not accept_encoding or size < RESPONSE_COMPRESSION_MIN_BYTES:
+        return None
+    offered = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip().lower()] = quality
+    candidates = [
+        (offered.get(coding, offered.get("*", 0.0)), preference, coding)
+        for preference, coding in ((1, "br"), (0, "gzip"))
+        if coding != "br" or brotli is not None
+    ]
+    quality, _, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+def encode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+class EncodedBodyCache:
+    """
+    Per-worker LRU of compressed response bodies, keyed by the caller's content hash, so a
+    body is read and compressed once per encoding however often it is downloaded.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, content_key: str, encoding: Optional[str], load_body: Callable[[], bytes]) -> bytes:
+        """
+        Body in the given encoding (see negotiate_encoding).
+
+        Args:
+            content_key: Hash identifying the body (e.g. its SHA-256)
+            encoding: 'br', 'gzip' or None
+            load_body: Returns the uncompressed body - only called on a miss
+        """
+        if encoding is None:
+            return load_body()
+        key = (content_key, encoding)
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                return encoded
+        encoded = encode_body(load_body(), encoding)
+        with self._lock:
+            self._entries[key] = encoded
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return encoded
+
+
+encoded_body_cache = EncodedBodyCache(max_size=ENCODED_RESPONSE_CACHE_SIZE)
+
+
+# ========== Byte ranges ==========
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single byte range requested by a Range header, as inclusive (first, last) offsets.
+
+    Returns None when the whole body should be sent: no header, a unit other than bytes,
+    malformed syntax, or several ranges (which we do not serve as multipart).
+
+    Raises:
+        ValueError: If the range cannot be satisfied (416 Range Not Satisfiable)
+    """
+    if not range_header:
+        return None
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, dash, last = (part.strip() for part in ranges.partition("-"))
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:  # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None  # Invalid range - ignored
+    if start >= size:
+        raise ValueError("Range starts past the end")
+    return start, end
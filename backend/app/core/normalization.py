@@ -0,0 +1,66 @@
+"""
+Normalization of lead contact identifiers into match keys.
+
+The keys are stored next to the raw values on the lead (see Lead.*_normalized) and indexed,
+so duplicate detection is an index lookup instead of an ILIKE scan over every lead.
+"""
+import re
+from typing import Optional
+
+DEFAULT_COUNTRY_CODE = "972"  # Israel
+
+# Israeli mobile number typed without its trunk 0 ('50-1234567')
+_MOBILE_WITHOUT_TRUNK_PREFIX = re.compile(r"^5\d{8}$")
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]")
+
+
+def normalize_phone(value: Optional[str], country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 digits without the leading '+'.
+
+    '050-123 4567', '+972 50 1234567', '00972501234567' and '501234567' all become
+    '972501234567'. The country code is only added to national-format numbers; other
+    digit strings are taken to already start with one ('14155550100' stays as it is).
+    Numbers too short to be a real phone number normalize to None.
+    """
+    if not value:
+        return None
+    digits = _NON_DIGITS.sub("", str(value))
+    if str(value).strip().startswith("+"):
+        pass  # Already has a country code
+    elif digits.startswith("00"):
+        digits = digits[2:]  # International dialing prefix
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]  # National format
+    elif country_code == DEFAULT_COUNTRY_CODE and _MOBILE_WITHOUT_TRUNK_PREFIX.match(digits):
+        digits = country_code + digits
+    if len(digits) < 8 or len(digits) > 15:
+        return None
+    return digits
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    """Normalize an email address to its trimmed, lowercased form."""
+    if not value:
+        return None
+    normalized = str(value).strip().lower()
+    return normalized or None
+
+
+def normalize_client_id(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize an ID number (ת"ז) to 9 zero-padded digits.
+
+    '12345678', '012345678' and '01234567-8' all become '012345678'. Values with letters
+    (passport numbers) keep their alphanumeric characters, uppercased.
+    """
+    if not value:
+        return None
+    raw = str(value).strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if digits and len(digits) == len(_NON_ALNUM.sub("", raw)):
+        return digits.zfill(9) if len(digits) <= 9 else digits
+    alnum = _NON_ALNUM.sub("", raw).upper()
+    return alnum or None
@@ -3,10 +3,15 @@ FastAPI application entry point.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import health, auth, organizations, leads, stages, templates, documents
+from app.api import health, auth, organizations, leads, stages, templates, documents, segments, analytics
 from app.api import public_signing
 from app.api.admin import router as admin_router
 from app.core.config import get_settings
+from app.services.reminder_scheduler import start_reminder_scheduler, stop_reminder_scheduler
+from app.services.lead_change_log import change_log_appender
+from app.services.pdf_rendering import pdf_render_queue
+from app.services.stage_registry import load_stage_registry
+from app.core.database import SessionLocal
 
 app_settings = get_settings()
 
@@ -30,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # Needed for conditional requests from the frontend
 )
 
 # Include routers
@@ -38,10 +44,28 @@ app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(organizations.router, prefix="/api", tags=["organizations"])
 app.include_router(leads.router, prefix="/api/leads", tags=["leads"])
 app.include_router(stages.router, prefix="/api/stages", tags=["stages"])
+app.include_router(segments.router, prefix="/api/segments", tags=["segments"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(templates.router, prefix="/api", tags=["templates"])
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(public_signing.router, prefix="/api/public", tags=["public-signing"])
 app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
 
 
+@app.on_event("startup")
+def start_background_jobs():
+    """Load the stage registry and start the reminder scheduler (only runs in the elected worker)."""
+    db = SessionLocal()
+    try:
+        load_stage_registry(db)
+    finally:
+        db.close()
+    start_reminder_scheduler()
 
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    """Stop the reminder scheduler, write any queued lead change log rows and finish running PDF renders."""
+    stop_reminder_scheduler()
+    change_log_appender.stop()
+    pdf_render_queue.stop()
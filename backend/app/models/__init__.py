@@ -9,8 +9,24 @@ from app.models.organization_invitation import OrganizationInvitation
 from app.models.platform_settings import PlatformSettings
 from app.models.lead_stage import LeadStage
 from app.models.lead import Lead
+from app.models.lead_extensions import (
+    LeadIntegration,
+    LeadTriggers,
+    LeadDocumentLinks,
+    LeadCollection,
+    LeadWorkflow,
+    LeadContractDetails,
+)
 from app.models.lead_stage_history import LeadStageHistory
+from app.models.lead_reminder import LeadReminder
+from app.models.lead_change_log import LeadChangeLog
+from app.models.lead_segment import LeadSegment, LeadSegmentMember
+from app.models.stage_transition_rule import StageTransitionRule
+from app.models.pipeline_stage_daily import PipelineStageDaily
+from app.models.html_blob import HtmlBlob
+from app.models.upload_blob import UploadBlob
 from app.models.document_template import DocumentTemplate
+from app.models.document_template_version import DocumentTemplateVersion
 from app.models.document import Document
 from app.models.document_signature import DocumentSignature
 from app.models.signing_link import SigningLink
@@ -25,8 +41,23 @@ __all__ = [
     "PlatformSettings",
     "LeadStage",
     "Lead",
+    "LeadIntegration",
+    "LeadTriggers",
+    "LeadDocumentLinks",
+    "LeadCollection",
+    "LeadWorkflow",
+    "LeadContractDetails",
     "LeadStageHistory",
+    "LeadReminder",
+    "LeadChangeLog",
+    "LeadSegment",
+    "LeadSegmentMember",
+    "StageTransitionRule",
+    "PipelineStageDaily",
+    "HtmlBlob",
+    "UploadBlob",
     "DocumentTemplate",
+    "DocumentTemplateVersion",
     "Document",
     "DocumentSignature",
     "SigningLink",
@@ -1,10 +1,19 @@
 """
 Document model - represents generated documents from templates
+
+A generated document shares the HTML blob of the template version it was generated from
+(see app/models/html_blob.py) until it is edited; setting rendered_content then stores a
+private copy in the documents row.
+
+An uploaded PDF is referenced by its SHA-256 in the content-addressed upload store
+(see app/models/upload_blob.py and app/services/uploads.py).
 """
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property, deferred
+from app.core.compression import CompressedText
 from app.core.database import Base
+from app.models.html_blob import shared_html
 
 
 class Document(Base):
@@ -15,11 +24,22 @@ class Document(Base):
     organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False, index=True)
     template_id = Column(Integer, ForeignKey('document_templates.id'), nullable=True, index=True)  # Nullable for uploaded documents
+    template_version_id = Column(Integer, ForeignKey('document_template_versions.id'), nullable=True, index=True)  # Version generated from
     
     title = Column(String(500), nullable=False)  # Generated from template name + lead info
-    rendered_content = Column(Text, nullable=True)  # HTML with merged data (no placeholders) - Nullable for uploaded PDFs
+    inline_content = deferred(Column('rendered_content', CompressedText, nullable=True))  # Private HTML once edited (copy-on-write); loaded when read
+    content_sha256 = column_property(
+        Column(String(64), ForeignKey('html_blobs.sha256'), nullable=True, index=True),  # Shared HTML until edited
+        active_history=True
+    )
     signature_blocks = Column(Text, nullable=True)  # JSON string with signature block metadata (copied from template, can be edited)
-    pdf_file_path = Column(String(1000), nullable=True)  # Path/URL to signed PDF file
+    pdf_file_path = Column(String(1000), nullable=True)  # Path/URL to signed PDF file (for uploads, the stored file's path)
+    pdf_render_digest = Column(String(64), nullable=True)  # Content hash of the published render's print HTML (see pdf_rendering)
+    pdf_signatures_key = Column(String(64), nullable=True)  # Signatures stamped on the published PDF (see signature_set_key); null if unstamped
+    pdf_sha256 = column_property(
+        Column(String(64), ForeignKey('upload_blobs.sha256'), nullable=True, index=True),  # Uploaded PDF in the upload store
+        active_history=True
+    )
     signing_url = Column(String(500), nullable=True)  # Public signing URL (stored when signing link is created)
     
     contract_type = Column(String(50), nullable=True)  # 'buyer', 'seller', 'lawyer' - determines which stage this contract is for
@@ -35,7 +55,23 @@ class Document(Base):
     organization = relationship("Organization", back_populates="documents")
     lead = relationship("Lead", back_populates="documents")
     template = relationship("DocumentTemplate", back_populates="documents")
+    template_version = relationship("DocumentTemplateVersion")
     created_by_user = relationship("User", foreign_keys=[created_by_user_id])
     signatures = relationship("DocumentSignature", back_populates="document", cascade="all, delete-orphan")
     signing_links = relationship("SigningLink", back_populates="document", cascade="all, delete-orphan")
+    content_blob = relationship("HtmlBlob", viewonly=True)  # Loaded when the HTML is read
+
+    @property
+    def rendered_content(self):
+        """HTML with merge fields - Nullable for uploaded PDFs."""
+        if self.inline_content is not None:
+            return self.inline_content
+        return shared_html(self)
+
+    @rendered_content.setter
+    def rendered_content(self, value):
+        if value is not None and self.inline_content is None and value == shared_html(self):
+            return  # Unchanged - keep sharing the blob
+        self.inline_content = value
+        self.content_sha256 = None
 
@@ -1,9 +1,10 @@
 """
 DocumentSignature model - stores signature data for documents
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from app.core.compression import CompressedText
 from app.core.database import Base
 
 
@@ -20,7 +21,7 @@ class DocumentSignature(Base):
     signer_name = Column(String(255), nullable=False)  # Name of signer
     signer_email = Column(String(255), nullable=True)  # Email of signer
     
-    signature_data = Column(Text, nullable=False)  # Base64-encoded signature image or JSON
+    signature_data = deferred(Column(CompressedText, nullable=False))  # Base64-encoded signature image or JSON; loaded when read
     
     signing_token = Column(String(255), nullable=True, index=True)  # Token used for signing (client only)
     ip_address = Column(String(45), nullable=True)  # IPv4 or IPv6
@@ -1,10 +1,15 @@
 """
 DocumentTemplate model for document template management.
+
+Template HTML lives in a content-addressed blob (see app/models/html_blob.py) shared with
+the documents generated from it and with duplicates of the template. Every saved state of
+the content is kept as an immutable DocumentTemplateVersion; documents are pinned to one.
 """
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from app.core.database import Base
+from app.models.html_blob import shared_html, point_at_html
 
 
 class DocumentTemplate(Base):
@@ -14,7 +19,11 @@ class DocumentTemplate(Base):
     organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    content = Column(Text, nullable=False)  # HTML content with merge fields
+    content_sha256 = column_property(
+        Column(String(64), ForeignKey('html_blobs.sha256'), nullable=False, index=True),  # HTML content with merge fields
+        active_history=True
+    )
+    field_count = Column(Integer, nullable=False, default=0, server_default='0')  # Distinct merge fields in the content
     signature_blocks = Column(Text, nullable=True)  # JSON string with signature block metadata
     created_by_user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -25,4 +34,19 @@ class DocumentTemplate(Base):
     organization = relationship("Organization", back_populates="document_templates")
     created_by_user = relationship("User", foreign_keys=[created_by_user_id])
     documents = relationship("Document", back_populates="template", cascade="all, delete-orphan")
+    versions = relationship(
+        "DocumentTemplateVersion",
+        back_populates="template",
+        order_by="DocumentTemplateVersion.version_number",
+        cascade="all, delete-orphan"
+    )
+    content_blob = relationship("HtmlBlob", viewonly=True)  # Loaded when the HTML is read
+
+    @property
+    def content(self):
+        """HTML content with merge fields."""
+        return shared_html(self)
 
+    @content.setter
+    def content(self, value):
+        point_at_html(self, value)
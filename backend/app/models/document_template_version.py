@@ -0,0 +1,47 @@
+"""
+DocumentTemplateVersion model - immutable snapshots of a template's content.
+
+A new version is recorded whenever a template's content or signature blocks change
+(see app/services/template_versions.py). Versions reference the deduplicated HTML blob
+(see app/models/html_blob.py), so unchanged content is never stored twice, and documents
+are pinned to the version they were generated from. Versions are never updated.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, event
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, column_property
+from app.core.database import Base
+from app.models.html_blob import shared_html
+
+
+class DocumentTemplateVersion(Base):
+    __tablename__ = "document_template_versions"
+    __table_args__ = (
+        UniqueConstraint('template_id', 'version_number', name='uq_document_template_versions_number'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_id = Column(Integer, ForeignKey('document_templates.id'), nullable=False, index=True)
+    version_number = Column(Integer, nullable=False)  # 1, 2, ... per template
+    content_sha256 = column_property(
+        Column(String(64), ForeignKey('html_blobs.sha256'), nullable=False, index=True),  # HTML content with merge fields
+        active_history=True
+    )
+    signature_blocks = Column(Text, nullable=True)  # JSON string with signature block metadata
+    field_count = Column(Integer, nullable=False, default=0, server_default='0')  # Distinct merge fields in the content
+    created_by_user_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # Null if unknown
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    template = relationship("DocumentTemplate", back_populates="versions")
+    created_by_user = relationship("User", foreign_keys=[created_by_user_id])
+    content_blob = relationship("HtmlBlob", viewonly=True)
+
+    @property
+    def content(self):
+        """HTML content with merge fields."""
+        return shared_html(self)
+
+
+@event.listens_for(DocumentTemplateVersion, "before_update")
+def _reject_version_update(mapper, connection, target):
+    raise ValueError(f"Template version {target.id} is immutable")
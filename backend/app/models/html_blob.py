@@ -0,0 +1,185 @@
+"""
+HtmlBlob model - content-addressed, reference-counted storage for template and document HTML.
+
+Templates and their versions always keep their HTML in a blob. A document created from a
+template points at the blob of the template's current version, so hundreds of documents from
+one contract share a single copy. When a document is edited, its HTML is copied into
+documents.rendered_content (copy-on-write) and its blob reference is dropped. Blobs are
+deleted once nothing references them.
+
+ref_count is maintained on flush for ORM changes (see _track_blob_references); bulk
+statements must call acquire_html()/release_html() themselves.
+"""
+import hashlib
+from typing import Dict, Optional
+from sqlalchemy import Column, Integer, String, DateTime, bindparam, delete, event, inspect, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.core.compression import CompressedText
+from app.core.database import Base
+
+
+class HtmlBlob(Base):
+    __tablename__ = "html_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex SHA-256 of the UTF-8 content
+    content = Column(CompressedText, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default='0')  # Templates + documents pointing here
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Instance attribute holding (sha256, html) for content set since the last load
+PENDING_HTML_ATTR = '_pending_html'
+
+# Session.info key holding blob references to drop once the flush has written the new pointers
+_RELEASES_KEY = 'html_blob_releases'
+
+
+def html_sha256(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def shared_html(obj) -> Optional[str]:
+    """HTML of the blob an object points at (content set in this session is returned as-is)."""
+    if obj.content_sha256 is None:
+        return None
+    pending = obj.__dict__.get(PENDING_HTML_ATTR)
+    if pending is not None and pending[0] == obj.content_sha256:
+        return pending[1]
+    return obj.content_blob.content if obj.content_blob is not None else None
+
+
+def point_at_html(obj, content: str) -> None:
+    """Make an object reference the blob of `content` (created on flush if needed)."""
+    sha256 = html_sha256(content)
+    obj.content_sha256 = sha256
+    obj.__dict__[PENDING_HTML_ATTR] = (sha256, content)
+
+
+def share_html(obj, source) -> None:
+    """Make an object reference the same blob as `source` (e.g. a document its template)."""
+    obj.inline_content = None
+    obj.content_sha256 = source.content_sha256
+    obj.__dict__[PENDING_HTML_ATTR] = (source.content_sha256, shared_html(source))
+
+
+# ========== Reference counting ==========
+
+def acquire_html(connection: Connection, counts: Dict[str, int], contents: Optional[Dict[str, str]] = None) -> None:
+    """
+    Add references to blobs.
+
+    Args:
+        connection: Connection in the caller's transaction
+        counts: sha256 -> number of new references
+        contents: sha256 -> HTML for blobs that may not exist yet
+    """
+    contents = contents or {}
+    new_rows = [
+        {'sha256': sha256, 'content': contents[sha256], 'size_bytes': len(contents[sha256].encode('utf-8')), 'ref_count': count}
+        for sha256, count in counts.items() if sha256 in contents
+    ]
+    if new_rows:
+        statement = sqlite_insert(HtmlBlob)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=['sha256'],
+                set_={'ref_count': HtmlBlob.ref_count + statement.excluded.ref_count}
+            ),
+            new_rows
+        )
+    existing = [{'blob_sha256': sha256, 'delta': count} for sha256, count in counts.items() if sha256 not in contents]
+    if existing:
+        connection.execute(
+            update(HtmlBlob.__table__)
+            .where(HtmlBlob.__table__.c.sha256 == bindparam('blob_sha256'))
+            .values(ref_count=HtmlBlob.__table__.c.ref_count + bindparam('delta')),
+            existing
+        )
+
+
+def release_html(connection: Connection, counts: Dict[str, int]) -> None:
+    """Drop references to blobs and delete the blobs nothing references any more."""
+    if not counts:
+        return
+    connection.execute(
+        update(HtmlBlob.__table__)
+        .where(HtmlBlob.__table__.c.sha256 == bindparam('blob_sha256'))
+        .values(ref_count=HtmlBlob.__table__.c.ref_count - bindparam('delta')),
+        [{'blob_sha256': sha256, 'delta': count} for sha256, count in counts.items()]
+    )
+    connection.execute(
+        delete(HtmlBlob).where(HtmlBlob.sha256.in_(list(counts)), HtmlBlob.ref_count <= 0)
+    )
+
+
+def _add(counts: Dict[str, int], sha256: Optional[str]) -> None:
+    if sha256 is not None:
+        counts[sha256] = counts.get(sha256, 0) + 1
+
+
+def _blob_owners() -> tuple:
+    """Models with content_sha256/content_blob (imported here to avoid an import cycle)."""
+    from app.models.document import Document
+    from app.models.document_template import DocumentTemplate
+    from app.models.document_template_version import DocumentTemplateVersion
+    return (Document, DocumentTemplate, DocumentTemplateVersion)
+
+
+def _committed_sha256(obj) -> Optional[str]:
+    history = inspect(obj).attrs.content_sha256.history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return obj.content_sha256
+
+
+@event.listens_for(Session, "before_flush")
+def _track_blob_references(session, flush_context, instances):
+    """Create/reference blobs before rows pointing at them are written; queue released references."""
+    acquired: Dict[str, int] = {}
+    released: Dict[str, int] = session.info.setdefault(_RELEASES_KEY, {})
+    contents: Dict[str, str] = {}
+    owners = _blob_owners()
+
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, owners):
+            continue
+        pending = obj.__dict__.get(PENDING_HTML_ATTR)
+        if pending is not None:
+            contents[pending[0]] = pending[1]
+        if obj in session.new:
+            _add(acquired, obj.content_sha256)
+            continue
+        history = inspect(obj).attrs.content_sha256.history
+        for sha256 in history.added:
+            _add(acquired, sha256)
+        for sha256 in history.deleted:
+            _add(released, sha256)
+
+    for obj in session.deleted:
+        if isinstance(obj, owners):
+            _add(released, _committed_sha256(obj))
+
+    if acquired:
+        acquire_html(
+            session.connection(),
+            acquired,
+            {sha256: contents[sha256] for sha256 in acquired if sha256 in contents}
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _release_blob_references(session, flush_context):
+    released = session.info.pop(_RELEASES_KEY, None)
+    if released:
+        release_html(session.connection(), released)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_blob_releases(session, previous_transaction):
+    session.info.pop(_RELEASES_KEY, None)
@@ -1,10 +1,18 @@
 """
 Lead model for CRM functionality.
+
+Only frequently read columns live in the `leads` table. Rarely read groups (integration IDs,
+triggers, document links, collection, workflow flags, contract wording) are stored in 1:1
+extension tables (see app/models/lead_extensions.py) and exposed here as regular attributes.
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Numeric
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Numeric, Index, event
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, Session, validates
+from sqlalchemy.ext.associationproxy import association_proxy
 from app.core.database import Base
+from app.core.normalization import normalize_phone, normalize_email, normalize_client_id
+from app.models.lead_extensions import LEAD_EXTENSION_GROUPS, LEAD_EXTENSION_FIELDS
 
 
 class Lead(Base):
@@ -20,6 +28,7 @@ class Lead(Base):
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # Soft delete
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # Optimistic concurrency (ETag)
 
     # ========== Basic Information Fields ==========
     full_name = Column(String(255), nullable=False)  # Required - שם
@@ -29,6 +38,12 @@ class Lead(Base):
     email = Column(String(255), nullable=True)  # דוא"ל
     birth_date = Column(Date, nullable=True)  # תאריך לידה
 
+    # ========== Duplicate Detection Keys ==========
+    # Maintained from the raw fields above on every write (see _normalize_match_keys)
+    phone_normalized = Column(String(20), nullable=True)  # E.164 digits, e.g. 972501234567
+    email_normalized = Column(String(255), nullable=True)  # Lowercased email
+    client_id_normalized = Column(String(50), nullable=True)  # Zero-padded ת"ז
+
     # ========== Transaction Details Fields ==========
     signing_date = Column(Date, nullable=True)  # יום החתימה
     plot_number = Column(String(50), nullable=True)  # חלקה
@@ -45,16 +60,6 @@ class Lead(Base):
 
     # ========== Document & Status Fields ==========
     id_scan = Column(String(500), nullable=True)  # צילום ת.ז (URL or path)
-    search_component = Column(String(255), nullable=True)  # רכיב סיחור
-    land_component = Column(String(255), nullable=True)  # רכיב קרקע
-    land_component_text = Column(String(500), nullable=True)  # רכיב קרקע במילים
-    search_component_text = Column(String(500), nullable=True)  # רכיב סיחור במילים
-    transaction_amount_text = Column(String(500), nullable=True)  # סך עסקה במילים
-    search_component_percent = Column(Numeric(5, 2), nullable=True)  # שיעור רכיב סיחור %
-    additional_buyer_details = Column(Text, nullable=True)  # פרטי רוכש נוספים בעסקה
-    membership_request = Column(String(255), nullable=True)  # בקשת הצטרפות
-    fee_agreement = Column(String(255), nullable=True)  # הסכם שכ"ט
-    client_recognition_form = Column(String(255), nullable=True)  # טופס הכרת לקוח
     signing_status = Column(String(100), nullable=True)  # סטטוס חתימה
     fee_payment_status = Column(String(100), nullable=True)  # תשלום שכר טרחה
     project_name = Column(String(255), nullable=True)  # שם הפרויקט
@@ -73,40 +78,6 @@ class Lead(Base):
     days_to_send_payment_request = Column(Integer, nullable=True)  # ימים לשליחת לדרישת תשלום
     payment_request_deadline = Column(Date, nullable=True)  # מועד שליחת דרישת תשלום
 
-    # ========== Trigger Fields ==========
-    date_trigger = Column(String(255), nullable=True)  # טריגר תאריך
-    payment_request_date_trigger = Column(String(255), nullable=True)  # טריגר להגדרת תאריך לדרישת תשלום
-    payment_request_send_trigger = Column(String(255), nullable=True)  # טריגר לשליחת דרישת תשלום
-    reminder_message3_trigger = Column(String(255), nullable=True)  # טריגר שליחת הודעה 3 (תזכורת)
-    reminder_message4_trigger = Column(String(255), nullable=True)  # טריגר שליחת הודעה 4 (תזכורת)
-    reminder_message5_trigger = Column(String(255), nullable=True)  # טריגר לשליחת הודעה 5 (תזכורת)
-    reminder_message6_trigger = Column(String(255), nullable=True)  # טריגר לשליחת הודעה 6 (תזכורת)
-
-    # ========== Integration & External ID Fields ==========
-    morning_client_id_company = Column(String(100), nullable=True)  # ID לקוח במורנינג (חברה)
-    morning_client_id_office = Column(String(100), nullable=True)  # ID לקוח במורנינג (משרד)
-    invoice_id = Column(String(100), nullable=True)  # ID חשבונית
-    invoice_source = Column(String(255), nullable=True)  # מקור החשבונית
-    morning_item_id = Column(String(100), nullable=True)  # Item ID
-    financial_client_created = Column(Boolean, nullable=True)  # צור לקוח בכספים
-    morning_client_created = Column(Boolean, nullable=True)  # הקמת לקוח במורינג
-
-    # ========== Document Link Fields ==========
-    payment_request_document = Column(String(500), nullable=True)  # מסמך - דרישת תשלום
-    payment_request_link = Column(String(500), nullable=True)  # לינק לדרישת תשלום
-    signing_documents_word = Column(String(500), nullable=True)  # מסמכים לחתימה - WORD
-    signing_documents_pdf = Column(String(500), nullable=True)  # מסמכים לחתימה - PDF
-    signed_by_client_documents = Column(String(500), nullable=True)  # מסמכים חתומים על ידי לקוח
-    documents_for_lawyer_verification = Column(String(500), nullable=True)  # מסמכים לאימות עו"ד
-    verified_client_signed_documents = Column(String(500), nullable=True)  # מסמכים חתומים על ידי לקוח מאומתים
-    attachments_link = Column(String(500), nullable=True)  # לינק לנספחים
-    attachments_and_agreement_link = Column(String(500), nullable=True)  # לינק לנספחים והסכם שיתוף
-    signed_attachments_and_agreement = Column(String(500), nullable=True)  # נספחים והסכם שיתוף חתומים
-    company_seller_documents = Column(String(500), nullable=True)  # מסמכי חברה/המוכר
-    company_seller_signing_link = Column(String(500), nullable=True)  # לינק לחתימת חברה/מוכר
-    signed_by_company_seller_documents = Column(String(500), nullable=True)  # מסמכים חתומים עי ידי חברה/מוכר
-    verified_company_seller_signed_documents = Column(String(500), nullable=True)  # מסמכים חתומים עי ידי חברה/מוכר מאומתים
-
     # ========== User & Assignment Fields ==========
     lawyer_name = Column(String(255), nullable=True)  # עו"ד (מחתים)
     lawyer_name_general = Column(String(255), nullable=True)  # עו"ד
@@ -116,46 +87,13 @@ class Lead(Base):
 
     # ========== Status & Workflow Fields ==========
     client_type = Column(String(100), nullable=True)  # סוג לקוח
-    is_employee_or_self_employed = Column(Boolean, nullable=True)  # לסמן שכיר או עצמאי
-    full_transaction_details = Column(Boolean, nullable=True)  # מלא פרטי עסקה
-    whatsapp_sent = Column(Boolean, nullable=True)  # שליחת וואטסאפ
-    transfer_to_registration = Column(Boolean, nullable=True)  # העברה לרישום בעלות
-    transfer_to_ownership_registration = Column(Boolean, nullable=True)  # העברה ל״רישום בעלויות״
-    transfer_to_appointments_board = Column(Boolean, nullable=True)  # העבר לבורד זימונים
-    group_transactions_after_realization = Column(Boolean, nullable=True)  # גרופ עסקאות לאחר מימוש
-    create_levy_board_item = Column(Boolean, nullable=True)  # יצירת איטם בורד היטלי השבחה
-    create_financial_client_trigger = Column(String(255), nullable=True)  # טריגר יצירת לקוח בכספים
-
-    # ========== Power of Attorney Fields ==========
-    poa_share_agreement = Column(String(500), nullable=True)  # ייפוי כח הסכם שיתוף
-    poa_planning = Column(String(500), nullable=True)  # ייפוי כח תכנוני
-
-    # ========== Collection & Payment Fields ==========
-    non_payment_reason = Column(String(255), nullable=True)  # סיבת אי תשלום
-    coordinated_call_payment_date = Column(Date, nullable=True)  # מועד מתואם שיחה/תשלום
-    initiated_contact_attempts = Column(Integer, nullable=True)  # מספר ניסיון התקשרות יזום
-    last_contact_date = Column(Date, nullable=True)  # תאריך יצירת קשר אחרון
-    collection_notes = Column(Text, nullable=True)  # הערות גבייה
-    plot_value = Column(Numeric(15, 2), nullable=True)  # מגרש תמורה
-    realization_completed_if_error = Column(Boolean, nullable=True)  # בוצע מימוש ( אם הייתה שגיאה)
 
     # ========== Message Reminder Fields ==========
     reminder_message3_date = Column(Date, nullable=True)  # מועד שליחת הודעה 3 (7 ימים)
     reminder_message4_date = Column(Date, nullable=True)  # מועד שליחת הודעה 4 (21 ימים)
     reminder_message5_date = Column(Date, nullable=True)  # מועד שליחת הודעה 5 (42 ימים)
     reminder_message6_date = Column(Date, nullable=True)  # מועד שליחת הודעה 6 (84 ימים)
-
-    # ========== Other Fields ==========
     check_call_reminder = Column(Date, nullable=True)  # תזכורת לבדיקה/שיחה
-    preparation_signature_document = Column(Boolean, nullable=True)  # הכן מסמך לחתימה דיגיטלית
-    create_client_signing_link = Column(Boolean, nullable=True)  # צור לינק לחתימת לקוח
-    client_signing_link = Column(String(500), nullable=True)  # לינק לחתימה עבור לקוח
-    create_attachments_link = Column(Boolean, nullable=True)  # צור לינק לנספחים
-    create_company_seller_link = Column(Boolean, nullable=True)  # צור לינק לחתימת חברה/מוכר
-    identification_mark = Column(String(255), nullable=True)  # סימן זיהוי
-    action_confirmation_ea = Column(String(255), nullable=True)  # אישור ביצוע פעולה הע"א
-    ea_registration_status = Column(String(255), nullable=True)  # סטטוס רישום הע"א
-    page_spread = Column(String(255), nullable=True)  # פריסת העמודים
 
     # ========== Relationships ==========
     organization = relationship("Organization", foreign_keys=[organization_id])
@@ -165,3 +103,67 @@ class Lead(Base):
     stage_history = relationship("LeadStageHistory", back_populates="lead", order_by="LeadStageHistory.changed_at")
     documents = relationship("Document", back_populates="lead", cascade="all, delete-orphan")
 
+    # Extension groups - lazy by default, loaded on first access to one of their fields
+    integration = relationship("LeadIntegration", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+    triggers = relationship("LeadTriggers", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+    document_links = relationship("LeadDocumentLinks", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+    collection = relationship("LeadCollection", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+    workflow = relationship("LeadWorkflow", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+    contract_details = relationship("LeadContractDetails", uselist=False, back_populates="lead", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index('ix_leads_org_phone_normalized', 'organization_id', 'phone_normalized', 'deleted_at'),
+        Index('ix_leads_org_email_normalized', 'organization_id', 'email_normalized', 'deleted_at'),
+        Index('ix_leads_org_client_id_normalized', 'organization_id', 'client_id_normalized', 'deleted_at'),
+    )
+
+    @validates('phone', 'email', 'client_id')
+    def _normalize_match_keys(self, key, value):
+        """Keep the normalized duplicate-detection key in step with the raw value."""
+        if key == 'phone':
+            self.phone_normalized = normalize_phone(value)
+        elif key == 'email':
+            self.email_normalized = normalize_email(value)
+        else:
+            self.client_id_normalized = normalize_client_id(value)
+        return value
+
+    # Every UPDATE bumps `version` and is conditioned on the version that was loaded,
+    # so concurrent writers get a StaleDataError instead of silently overwriting each other
+    __mapper_args__ = {"version_id_col": version}
+
+
+def _extension_creator(model, field):
+    """Creator used when a field is set on a lead that has no row in that group yet."""
+    def create(value):
+        return model(**{field: value})
+    return create
+
+
+# Expose every extension field as a plain Lead attribute (lead.invoice_id, Lead(invoice_id=...)).
+# Reading a field of a missing group returns None; writing one creates the group row.
+for _field, _group in LEAD_EXTENSION_FIELDS.items():
+    setattr(Lead, _field, association_proxy(
+        _group, _field, creator=_extension_creator(LEAD_EXTENSION_GROUPS[_group], _field)
+    ))
+
+# Derived columns - written only by the model itself, never by API clients
+LEAD_MATCH_KEY_FIELDS = ('phone_normalized', 'email_normalized', 'client_id_normalized')
+
+# All lead field names (hot columns + extension fields), in declaration order
+LEAD_FIELD_NAMES = [
+    column.name for column in Lead.__table__.columns if column.name not in LEAD_MATCH_KEY_FIELDS
+] + list(LEAD_EXTENSION_FIELDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_leads_with_changed_extensions(session, flush_context, instances):
+    """
+    Bump the parent lead's updated_at (and therefore its version/ETag) when only an
+    extension row changed, since those writes never touch the `leads` row itself.
+    """
+    extension_models = tuple(LEAD_EXTENSION_GROUPS.values())
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, extension_models) and session.is_modified(obj) and obj.lead is not None:
+            if obj.lead not in session.new:
+                obj.lead.updated_at = datetime.utcnow()
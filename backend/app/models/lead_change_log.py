@@ -0,0 +1,29 @@
+"""
+LeadChangeLog model - field-level audit trail of lead changes.
+
+Rows are captured from SQLAlchemy attribute history on flush and written in batches
+by the change log appender (see app/services/lead_change_log.py).
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class LeadChangeLog(Base):
+    __tablename__ = "lead_change_log"
+    __table_args__ = (
+        # Per-lead history, newest first, paginated by id
+        Index('ix_lead_change_log_lead_id_id', 'lead_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
+    field_name = Column(String(100), nullable=False)
+    old_value = Column(Text, nullable=True)  # Text form of the value (dates ISO, booleans true/false)
+    new_value = Column(Text, nullable=True)
+    changed_by_user_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # NULL for system/public changes
+    changed_at = Column(DateTime(timezone=True), nullable=False)  # Time of the flush that made the change
+
+    # Relationships
+    changed_by_user = relationship("User", foreign_keys=[changed_by_user_id])
@@ -0,0 +1,154 @@
+"""
+Lead extension models - rarely read lead columns split out of the hot `leads` table.
+
+Each group lives in its own 1:1 table keyed by lead_id and is only loaded when one of its
+fields is accessed (or the group is eager-loaded explicitly). The fields stay readable and
+writable as plain attributes on Lead through association proxies, see app/models/lead.py.
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, ForeignKey, Numeric
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class LeadIntegration(Base):
+    """Morning (accounting) integration and invoice fields."""
+    __tablename__ = "lead_integration"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    morning_client_id_company = Column(String(100), nullable=True)  # ID לקוח במורנינג (חברה)
+    morning_client_id_office = Column(String(100), nullable=True)  # ID לקוח במורנינג (משרד)
+    invoice_id = Column(String(100), nullable=True)  # ID חשבונית
+    invoice_source = Column(String(255), nullable=True)  # מקור החשבונית
+    morning_item_id = Column(String(100), nullable=True)  # Item ID
+    financial_client_created = Column(Boolean, nullable=True)  # צור לקוח בכספים
+    morning_client_created = Column(Boolean, nullable=True)  # הקמת לקוח במורינג
+
+    lead = relationship("Lead", back_populates="integration")
+
+
+class LeadTriggers(Base):
+    """Automation trigger fields."""
+    __tablename__ = "lead_triggers"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    date_trigger = Column(String(255), nullable=True)  # טריגר תאריך
+    payment_request_date_trigger = Column(String(255), nullable=True)  # טריגר להגדרת תאריך לדרישת תשלום
+    payment_request_send_trigger = Column(String(255), nullable=True)  # טריגר לשליחת דרישת תשלום
+    reminder_message3_trigger = Column(String(255), nullable=True)  # טריגר שליחת הודעה 3 (תזכורת)
+    reminder_message4_trigger = Column(String(255), nullable=True)  # טריגר שליחת הודעה 4 (תזכורת)
+    reminder_message5_trigger = Column(String(255), nullable=True)  # טריגר לשליחת הודעה 5 (תזכורת)
+    reminder_message6_trigger = Column(String(255), nullable=True)  # טריגר לשליחת הודעה 6 (תזכורת)
+    create_financial_client_trigger = Column(String(255), nullable=True)  # טריגר יצירת לקוח בכספים
+
+    lead = relationship("Lead", back_populates="triggers")
+
+
+class LeadDocumentLinks(Base):
+    """Links to external documents, signing pages and powers of attorney."""
+    __tablename__ = "lead_document_links"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    payment_request_document = Column(String(500), nullable=True)  # מסמך - דרישת תשלום
+    payment_request_link = Column(String(500), nullable=True)  # לינק לדרישת תשלום
+    signing_documents_word = Column(String(500), nullable=True)  # מסמכים לחתימה - WORD
+    signing_documents_pdf = Column(String(500), nullable=True)  # מסמכים לחתימה - PDF
+    signed_by_client_documents = Column(String(500), nullable=True)  # מסמכים חתומים על ידי לקוח
+    documents_for_lawyer_verification = Column(String(500), nullable=True)  # מסמכים לאימות עו"ד
+    verified_client_signed_documents = Column(String(500), nullable=True)  # מסמכים חתומים על ידי לקוח מאומתים
+    attachments_link = Column(String(500), nullable=True)  # לינק לנספחים
+    attachments_and_agreement_link = Column(String(500), nullable=True)  # לינק לנספחים והסכם שיתוף
+    signed_attachments_and_agreement = Column(String(500), nullable=True)  # נספחים והסכם שיתוף חתומים
+    company_seller_documents = Column(String(500), nullable=True)  # מסמכי חברה/המוכר
+    company_seller_signing_link = Column(String(500), nullable=True)  # לינק לחתימת חברה/מוכר
+    signed_by_company_seller_documents = Column(String(500), nullable=True)  # מסמכים חתומים עי ידי חברה/מוכר
+    verified_company_seller_signed_documents = Column(String(500), nullable=True)  # מסמכים חתומים עי ידי חברה/מוכר מאומתים
+    client_signing_link = Column(String(500), nullable=True)  # לינק לחתימה עבור לקוח
+    poa_share_agreement = Column(String(500), nullable=True)  # ייפוי כח הסכם שיתוף
+    poa_planning = Column(String(500), nullable=True)  # ייפוי כח תכנוני
+
+    lead = relationship("Lead", back_populates="document_links")
+
+
+class LeadCollection(Base):
+    """Collection and payment follow-up fields."""
+    __tablename__ = "lead_collection"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    non_payment_reason = Column(String(255), nullable=True)  # סיבת אי תשלום
+    coordinated_call_payment_date = Column(Date, nullable=True)  # מועד מתואם שיחה/תשלום
+    initiated_contact_attempts = Column(Integer, nullable=True)  # מספר ניסיון התקשרות יזום
+    last_contact_date = Column(Date, nullable=True)  # תאריך יצירת קשר אחרון
+    collection_notes = Column(Text, nullable=True)  # הערות גבייה
+    plot_value = Column(Numeric(15, 2), nullable=True)  # מגרש תמורה
+    realization_completed_if_error = Column(Boolean, nullable=True)  # בוצע מימוש ( אם הייתה שגיאה)
+
+    lead = relationship("Lead", back_populates="collection")
+
+
+class LeadWorkflow(Base):
+    """Workflow checkboxes and registration status fields."""
+    __tablename__ = "lead_workflow"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    is_employee_or_self_employed = Column(Boolean, nullable=True)  # לסמן שכיר או עצמאי
+    full_transaction_details = Column(Boolean, nullable=True)  # מלא פרטי עסקה
+    whatsapp_sent = Column(Boolean, nullable=True)  # שליחת וואטסאפ
+    transfer_to_registration = Column(Boolean, nullable=True)  # העברה לרישום בעלות
+    transfer_to_ownership_registration = Column(Boolean, nullable=True)  # העברה ל״רישום בעלויות״
+    transfer_to_appointments_board = Column(Boolean, nullable=True)  # העבר לבורד זימונים
+    group_transactions_after_realization = Column(Boolean, nullable=True)  # גרופ עסקאות לאחר מימוש
+    create_levy_board_item = Column(Boolean, nullable=True)  # יצירת איטם בורד היטלי השבחה
+    preparation_signature_document = Column(Boolean, nullable=True)  # הכן מסמך לחתימה דיגיטלית
+    create_client_signing_link = Column(Boolean, nullable=True)  # צור לינק לחתימת לקוח
+    create_attachments_link = Column(Boolean, nullable=True)  # צור לינק לנספחים
+    create_company_seller_link = Column(Boolean, nullable=True)  # צור לינק לחתימת חברה/מוכר
+    identification_mark = Column(String(255), nullable=True)  # סימן זיהוי
+    action_confirmation_ea = Column(String(255), nullable=True)  # אישור ביצוע פעולה הע"א
+    ea_registration_status = Column(String(255), nullable=True)  # סטטוס רישום הע"א
+    page_spread = Column(String(255), nullable=True)  # פריסת העמודים
+
+    lead = relationship("Lead", back_populates="workflow")
+
+
+class LeadContractDetails(Base):
+    """Contract wording fields (amounts in words, components, attached forms)."""
+    __tablename__ = "lead_contract_details"
+
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+
+    search_component = Column(String(255), nullable=True)  # רכיב סיחור
+    land_component = Column(String(255), nullable=True)  # רכיב קרקע
+    land_component_text = Column(String(500), nullable=True)  # רכיב קרקע במילים
+    search_component_text = Column(String(500), nullable=True)  # רכיב סיחור במילים
+    transaction_amount_text = Column(String(500), nullable=True)  # סך עסקה במילים
+    search_component_percent = Column(Numeric(5, 2), nullable=True)  # שיעור רכיב סיחור %
+    additional_buyer_details = Column(Text, nullable=True)  # פרטי רוכש נוספים בעסקה
+    membership_request = Column(String(255), nullable=True)  # בקשת הצטרפות
+    fee_agreement = Column(String(255), nullable=True)  # הסכם שכ"ט
+    client_recognition_form = Column(String(255), nullable=True)  # טופס הכרת לקוח
+
+    lead = relationship("Lead", back_populates="contract_details")
+
+
+# Relationship name on Lead -> extension model
+LEAD_EXTENSION_GROUPS = {
+    'integration': LeadIntegration,
+    'triggers': LeadTriggers,
+    'document_links': LeadDocumentLinks,
+    'collection': LeadCollection,
+    'workflow': LeadWorkflow,
+    'contract_details': LeadContractDetails,
+}
+
+# Field name -> relationship name on Lead of the group that stores it
+LEAD_EXTENSION_FIELDS = {
+    column.name: group
+    for group, model in LEAD_EXTENSION_GROUPS.items()
+    for column in model.__table__.columns
+    if column.name != 'lead_id'
+}
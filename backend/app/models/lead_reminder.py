@@ -0,0 +1,39 @@
+"""
+LeadReminder model - scheduled reminder messages derived from lead reminder dates.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class LeadReminder(Base):
+    """One scheduled reminder per (lead, kind), picked up by the reminder scheduler when due."""
+    __tablename__ = "lead_reminders"
+    __table_args__ = (
+        UniqueConstraint('lead_id', 'kind', name='uq_lead_reminders_lead_kind'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False, index=True)
+    kind = Column(String(50), nullable=False)  # 'message3'..'message6', 'check_call'
+
+    # Moment the lead's reminder date schedules; retries move next_due_at, not this
+    due_at = Column(DateTime(timezone=True), nullable=True)
+    # NULL once the reminder is sent or given up on, so the index only holds pending rows
+    next_due_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'sent', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+
+    # Lease taken by the worker processing this reminder (prevents double-sending)
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    lead = relationship("Lead")
@@ -0,0 +1,36 @@
+"""
+LeadSegment models - saved lead filters with incrementally maintained membership.
+
+A segment's filters are declarative (see app/services/lead_segments.py). Membership rows are
+kept current on every lead write, so opening a segment reads lead_segment_members by index
+instead of re-running the filter over the organization's leads.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class LeadSegment(Base):
+    __tablename__ = "lead_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
+    created_by_user_id = Column(Integer, ForeignKey('users.id'), nullable=False)  # Resolves "$me" in filters
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    filters = Column(Text, nullable=False, default='[]')  # JSON list of {field, op, value} conditions (ANDed)
+    member_count = Column(Integer, nullable=False, default=0, server_default='0')
+    period_key = Column(String(100), nullable=True)  # Period the membership was built for (relative date filters only)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    created_by_user = relationship("User", foreign_keys=[created_by_user_id])
+
+
+class LeadSegmentMember(Base):
+    __tablename__ = "lead_segment_members"
+
+    segment_id = Column(Integer, ForeignKey('lead_segments.id', ondelete='CASCADE'), primary_key=True)
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True, index=True)
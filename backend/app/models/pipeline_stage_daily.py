@@ -0,0 +1,20 @@
+"""
+PipelineStageDaily model - per organization, per day, per stage rollup of lead stage history.
+
+Rows are updated incrementally whenever a lead_stage_history row is inserted (see
+app/services/pipeline_analytics.py), so funnel and time-in-stage reports sum a few rows per
+day instead of scanning the history.
+"""
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from app.core.database import Base
+
+
+class PipelineStageDaily(Base):
+    __tablename__ = "pipeline_stage_daily"
+
+    organization_id = Column(Integer, ForeignKey('organizations.id'), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of the history row
+    stage_id = Column(Integer, ForeignKey('lead_stages.id'), primary_key=True)
+    entered_count = Column(Integer, nullable=False, default=0, server_default='0')  # Leads that reached the stage
+    exited_count = Column(Integer, nullable=False, default=0, server_default='0')  # Leads that moved on from the stage
+    time_in_stage_seconds = Column(Float, nullable=False, default=0, server_default='0')  # Total duration of the stays that ended this day
@@ -0,0 +1,31 @@
+"""
+StageTransitionRule model - declarative lead stage transitions triggered by document events.
+
+A rule maps an event (plus an optional contract_type / document_type) to a target stage.
+Rules are compiled into an in-memory lookup and applied by app/services/stage_transitions.py.
+"""
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class StageTransitionRule(Base):
+    __tablename__ = "stage_transition_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event = Column(String(50), nullable=False)  # document_ready, document_signed, document_uploaded
+    contract_type = Column(String(50), nullable=True)  # buyer, seller, lawyer - NULL matches any
+    document_type = Column(String(100), nullable=True)  # Uploaded document type ID - NULL matches any
+    target_stage_id = Column(Integer, ForeignKey('lead_stages.id'), nullable=False)
+    mode = Column(String(20), nullable=False, default='advance')  # advance: move lead forward; record: history entry only
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('event', 'contract_type', 'document_type', name='uq_stage_transition_rules_match'),
+    )
+
+    # Relationships
+    target_stage = relationship("LeadStage", foreign_keys=[target_stage_id])
@@ -0,0 +1,172 @@
+"""
+UploadBlob model - reference counts for content-addressed uploaded PDF files.
+
+Uploaded PDFs are stored once per content under UPLOAD_STORAGE_DIR/ab/cd/<sha256>
+(see app/services/uploads.py); an upload of a file that is already stored reuses it.
+Each file has an upload_blobs row counting the documents that point at it through
+Document.pdf_sha256. When the count drops to zero the row is deleted and, once the
+transaction commits, so is the file.
+
+ref_count is maintained on flush for ORM changes (see _track_upload_references), like
+HtmlBlob's; bulk statements must call acquire_uploads()/release_uploads() themselves.
+"""
+from typing import Dict, Optional
+from sqlalchemy import Column, Integer, String, DateTime, bindparam, delete, event, inspect, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UploadBlob(Base):
+    __tablename__ = "upload_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex SHA-256 of the file
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default='0')  # Documents pointing here
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Instance attribute holding (sha256, size_bytes) for a file attached since the last load
+PENDING_UPLOAD_ATTR = '_pending_upload'
+
+# Session.info keys: references to drop after the flush, files to remove after the commit
+_RELEASES_KEY = 'upload_blob_releases'
+_ORPHANS_KEY = 'upload_blob_orphans'
+
+
+def point_at_upload(document, sha256: str, size_bytes: int) -> None:
+    """Make a document reference a stored upload (its row is created on flush if needed)."""
+    document.pdf_sha256 = sha256
+    document.__dict__[PENDING_UPLOAD_ATTR] = (sha256, size_bytes)
+
+
+# ========== Reference counting ==========
+
+def acquire_uploads(connection: Connection, counts: Dict[str, int], sizes: Optional[Dict[str, int]] = None) -> None:
+    """
+    Add references to stored uploads.
+
+    Args:
+        connection: Connection in the caller's transaction
+        counts: sha256 -> number of new references
+        sizes: sha256 -> file size for uploads that may not have a row yet
+    """
+    sizes = sizes or {}
+    new_rows = [
+        {'sha256': sha256, 'size_bytes': sizes[sha256], 'ref_count': count}
+        for sha256, count in counts.items() if sha256 in sizes
+    ]
+    if new_rows:
+        statement = sqlite_insert(UploadBlob)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=['sha256'],
+                set_={'ref_count': UploadBlob.ref_count + statement.excluded.ref_count}
+            ),
+            new_rows
+        )
+    existing = [{'blob_sha256': sha256, 'delta': count} for sha256, count in counts.items() if sha256 not in sizes]
+    if existing:
+        connection.execute(
+            update(UploadBlob.__table__)
+            .where(UploadBlob.__table__.c.sha256 == bindparam('blob_sha256'))
+            .values(ref_count=UploadBlob.__table__.c.ref_count + bindparam('delta')),
+            existing
+        )
+
+
+def release_uploads(connection: Connection, counts: Dict[str, int]) -> list:
+    """
+    Drop references to stored uploads and delete the rows nothing references any more.
+
+    Returns:
+        sha256 of the deleted rows, whose files can be removed once the transaction commits
+    """
+    if not counts:
+        return []
+    connection.execute(
+        update(UploadBlob.__table__)
+        .where(UploadBlob.__table__.c.sha256 == bindparam('blob_sha256'))
+        .values(ref_count=UploadBlob.__table__.c.ref_count - bindparam('delta')),
+        [{'blob_sha256': sha256, 'delta': count} for sha256, count in counts.items()]
+    )
+    orphans = connection.execute(
+        select(UploadBlob.sha256).where(UploadBlob.sha256.in_(list(counts)), UploadBlob.ref_count <= 0)
+    ).scalars().all()
+    if orphans:
+        connection.execute(delete(UploadBlob).where(UploadBlob.sha256.in_(orphans)))
+    return orphans
+
+
+def _add(counts: Dict[str, int], sha256: Optional[str]) -> None:
+    if sha256 is not None:
+        counts[sha256] = counts.get(sha256, 0) + 1
+
+
+def _committed_sha256(document) -> Optional[str]:
+    history = inspect(document).attrs.pdf_sha256.history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return document.pdf_sha256
+
+
+@event.listens_for(Session, "before_flush")
+def _track_upload_references(session, flush_context, instances):
+    """Create/reference upload rows before documents pointing at them are written; queue releases."""
+    from app.models.document import Document  # Avoid an import cycle
+
+    acquired: Dict[str, int] = {}
+    released: Dict[str, int] = session.info.setdefault(_RELEASES_KEY, {})
+    sizes: Dict[str, int] = {}
+
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Document):
+            continue
+        pending = obj.__dict__.get(PENDING_UPLOAD_ATTR)
+        if pending is not None:
+            sizes[pending[0]] = pending[1]
+        if obj in session.new:
+            _add(acquired, obj.pdf_sha256)
+            continue
+        history = inspect(obj).attrs.pdf_sha256.history
+        for sha256 in history.added:
+            _add(acquired, sha256)
+        for sha256 in history.deleted:
+            _add(released, sha256)
+
+    for obj in session.deleted:
+        if isinstance(obj, Document):
+            _add(released, _committed_sha256(obj))
+
+    if acquired:
+        acquire_uploads(
+            session.connection(),
+            acquired,
+            {sha256: sizes[sha256] for sha256 in acquired if sha256 in sizes}
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _release_upload_references(session, flush_context):
+    released = session.info.pop(_RELEASES_KEY, None)
+    if released:
+        orphans = release_uploads(session.connection(), released)
+        session.info.setdefault(_ORPHANS_KEY, set()).update(orphans)
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_orphaned_uploads(session):
+    orphans = session.info.pop(_ORPHANS_KEY, None)
+    if orphans:
+        from app.services.uploads import remove_unreferenced_uploads  # Avoid an import cycle
+        remove_unreferenced_uploads(orphans)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_upload_releases(session, previous_transaction):
+    session.info.pop(_RELEASES_KEY, None)
+    session.info.pop(_ORPHANS_KEY, None)
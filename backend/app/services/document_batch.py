@@ -0,0 +1,203 @@
+"""
+Batch document generation - mail-merge one template into documents for many leads.
+
+The template is validated (and compiled) once, leads are loaded and documents inserted in
+chunks of DOCUMENT_BATCH_CHUNK_SIZE, and the whole batch shares the caller's transaction.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import DOCUMENT_BATCH_CHUNK_SIZE, DOCUMENT_BATCH_MAX_LEADS
+from app.models.document import Document
+from app.models.document_template import DocumentTemplate
+from app.models.html_blob import acquire_html
+from app.models.lead import Lead
+from app.models.lead_segment import LeadSegment
+from app.models.document_template_version import DocumentTemplateVersion
+from app.services.document_generation import generate_document_title
+from app.services.template_versions import current_version_for_generation
+from app.services.lead_segments import compile_segment_condition
+
+logger = logging.getLogger(__name__)
+
+VALID_CONTRACT_TYPES = ('buyer', 'seller', 'lawyer')
+
+# Per-lead outcome statuses
+OUTCOME_CREATED = 'created'
+OUTCOME_FAILED = 'failed'
+
+
+def select_batch_lead_ids(
+    db: Session,
+    organization_id: int,
+    user_id: int,
+    lead_ids: Optional[List[int]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None
+) -> List[int]:
+    """
+    Resolve the leads of a batch: an explicit ID list (order kept, duplicates dropped) or
+    segment-style filters (see lead_segments) evaluated against the organization's leads.
+
+    Raises:
+        ValueError: If neither or both are given, the filters are invalid or the batch is too large
+    """
+    if (lead_ids is None) == (filters is None):
+        raise ValueError("Provide either lead_ids or filters")
+
+    if lead_ids is not None:
+        resolved = list(dict.fromkeys(lead_ids))
+    else:
+        # An unsaved segment; "$me" in the filters resolves to the requesting user
+        segment = LeadSegment(
+            organization_id=organization_id,
+            created_by_user_id=user_id,
+            filters=json.dumps(filters, ensure_ascii=False)
+        )
+        resolved = db.execute(
+            select(Lead.id).where(compile_segment_condition(segment)).order_by(Lead.id)
+        ).scalars().all()
+
+    if len(resolved) > DOCUMENT_BATCH_MAX_LEADS:
+        raise ValueError(f"Batch has {len(resolved)} leads; the maximum is {DOCUMENT_BATCH_MAX_LEADS}")
+    return resolved
+
+
+def validate_batch_request(
+    db: Session,
+    template: DocumentTemplate,
+    created_by_user_id: int,
+    contract_type: Optional[str] = None
+) -> DocumentTemplateVersion:
+    """
+    Validate a batch before any document is created. Does not commit.
+
+    Returns:
+        The template's current version (validated and compiled), which the batch is pinned to
+
+    Raises:
+        ValueError: If the template references unknown merge fields or contract_type is invalid
+    """
+    if contract_type is not None and contract_type not in VALID_CONTRACT_TYPES:
+        raise ValueError(f"Invalid contract_type. Must be one of: {', '.join(VALID_CONTRACT_TYPES)}")
+    return current_version_for_generation(db, template, created_by_user_id)
+
+
+def iter_documents_batch(
+    db: Session,
+    organization_id: int,
+    template: DocumentTemplate,
+    lead_ids: List[int],
+    created_by_user_id: int,
+    contract_type: Optional[str] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Create a draft document from the template for every lead, one chunk at a time.
+    Does not commit.
+
+    Like create_document, each document is pinned to the template's current version and
+    shares its content (with its merge fields); values are filled in when the document is displayed.
+
+    Args:
+        db: Database session
+        organization_id: Organization the template and leads must belong to
+        template: Active template of the organization
+        lead_ids: Leads to generate documents for
+        created_by_user_id: User creating the documents
+        contract_type: Optional 'buyer', 'seller' or 'lawyer' for all documents
+
+    Returns:
+        Iterator over the outcomes of each chunk, in input order: {lead_id, status, document_id, error}
+
+    Raises:
+        ValueError: If the template references unknown merge fields or contract_type is invalid
+            (raised right away, before any document is created)
+    """
+    # Validate (and compile) the template's current version once for the whole batch
+    version = validate_batch_request(db, template, created_by_user_id, contract_type)
+
+    return _insert_document_chunks(db, organization_id, template, version, lead_ids, created_by_user_id, contract_type)
+
+
+def _insert_document_chunks(
+    db: Session,
+    organization_id: int,
+    template: DocumentTemplate,
+    version: DocumentTemplateVersion,
+    lead_ids: List[int],
+    created_by_user_id: int,
+    contract_type: Optional[str]
+) -> Iterator[List[Dict[str, Any]]]:
+    now = datetime.utcnow()
+    created_count = 0
+
+    for start in range(0, len(lead_ids), DOCUMENT_BATCH_CHUNK_SIZE):
+        chunk = lead_ids[start:start + DOCUMENT_BATCH_CHUNK_SIZE]
+        leads = db.execute(
+            select(Lead.id, Lead.full_name).where(
+                Lead.id.in_(chunk),
+                Lead.organization_id == organization_id,
+                Lead.deleted_at.is_(None)
+            )
+        ).all()
+
+        document_ids = {}
+        if leads:
+            document_ids = dict(db.execute(
+                insert(Document).values([
+                    {
+                        'organization_id': organization_id,
+                        'lead_id': lead.id,
+                        'template_id': template.id,
+                        'template_version_id': version.id,
+                        'title': generate_document_title(template, lead),
+                        'content_sha256': version.content_sha256,  # Shares the version's HTML blob
+                        'signature_blocks': version.signature_blocks,
+                        'contract_type': contract_type,
+                        'status': 'draft',
+                        'created_by_user_id': created_by_user_id,
+                        'created_at': now,
+                    }
+                    for lead in leads
+                ]).returning(Document.lead_id, Document.id)
+            ).all())
+            acquire_html(db.connection(), {version.content_sha256: len(document_ids)})
+        created_count += len(document_ids)
+
+        yield [
+            {
+                'lead_id': lead_id,
+                'status': OUTCOME_CREATED,
+                'document_id': document_ids[lead_id],
+                'error': None,
+            } if lead_id in document_ids else {
+                'lead_id': lead_id,
+                'status': OUTCOME_FAILED,
+                'document_id': None,
+                'error': "Lead not found or not accessible",
+            }
+            for lead_id in chunk
+        ]
+
+    logger.info(
+        f"Batch generated {created_count} of {len(lead_ids)} documents from template {template.id} "
+        f"for organization {organization_id}"
+    )
+
+
+def generate_documents_batch(
+    db: Session,
+    organization_id: int,
+    template: DocumentTemplate,
+    lead_ids: List[int],
+    created_by_user_id: int,
+    contract_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Create the whole batch (see iter_documents_batch) and return all outcomes. Does not commit."""
+    return [
+        outcome
+        for chunk in iter_documents_batch(db, organization_id, template, lead_ids, created_by_user_id, contract_type)
+        for outcome in chunk
+    ]
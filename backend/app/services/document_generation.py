@@ -3,9 +3,16 @@ Document generation service - handles merge field replacement and document rende
 """
 import re
 import html
-from typing import Dict, Any, Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import Column
+from app.core.config import TEMPLATE_CACHE_SIZE
+from app.models.document import Document
 from app.models.document_template import DocumentTemplate
-from app.models.lead import Lead
+from app.models.lead import Lead, LEAD_MATCH_KEY_FIELDS
+from app.models.lead_extensions import LEAD_EXTENSION_GROUPS, LEAD_EXTENSION_FIELDS
 
 
 def get_lead_field_value(lead: Lead, field_key: str) -> str:
@@ -40,7 +47,151 @@ def escape_html(text: str) -> str:
     return html.escape(str(text))
 
 
-def replace_merge_fields(content: str, lead: Lead) -> str:
+# Fields a template may reference, precomputed once from the Lead mapping
+# (`leads` columns plus the extension-table fields proxied on Lead)
+MERGE_FIELD_SCHEMA: Dict[str, Column] = {
+    column.name: column for column in Lead.__table__.columns if column.name not in LEAD_MATCH_KEY_FIELDS
+}
+MERGE_FIELD_SCHEMA.update({
+    field: LEAD_EXTENSION_GROUPS[group].__table__.columns[field] for field, group in LEAD_EXTENSION_FIELDS.items()
+})
+
+# Merge field formats (matched at the positions the scanner finds their openers):
+# 1. TipTap HTML: <span data-field-key="field_key" data-merge-field="true" ...>...</span>
+#    (attributes can be in any order - the whole span element is replaced)
+# 2. Plain text: {{lead.field_key}}
+TIPTAP_FIELD_OPENER = '<span'
+TIPTAP_FIELD_TOKEN = re.compile(
+    r'<span(?=[^>]*data-merge-field=["\']true["\'])(?=[^>]*data-field-key=["\'](\w+)["\'])[^>]*>.*?</span>',
+    re.DOTALL
+)
+PLAIN_FIELD_OPENER = '{{lead.'
+PLAIN_FIELD_TOKEN = re.compile(r'\{\{lead\.(\w+)\}\}')
+
+
+class CompiledTemplate:
+    """
+    Merge-field content compiled into a segment list.
+
+    `parts` alternates literal HTML chunks (even indexes) and field keys (odd indexes),
+    so rendering is one join over the resolved field values. `unknown_fields` are the
+    referenced keys missing from MERGE_FIELD_SCHEMA.
+    """
+    __slots__ = ('parts', 'field_keys', 'unknown_fields')
+
+    def __init__(self, parts: List[str]):
+        self.parts = tuple(parts)
+        self.field_keys = frozenset(parts[1::2])
+        self.unknown_fields = tuple(sorted(key for key in self.field_keys if key not in MERGE_FIELD_SCHEMA))
+
+    def render(self, lead: Lead) -> str:
+        """Render with the lead's values (HTML escaped to prevent XSS)."""
+        values = {key: escape_html(get_lead_field_value(lead, key)) for key in self.field_keys}
+        parts = list(self.parts)
+        parts[1::2] = [values[key] for key in parts[1::2]]
+        return ''.join(parts)
+
+
+def compile_merge_template(content: str) -> CompiledTemplate:
+    """
+    Scan template/document content once, left to right, into literal chunks and field references.
+
+    Args:
+        content: HTML content with merge fields
+
+    Returns:
+        CompiledTemplate with the referenced fields, unknown fields and renderable parts
+    """
+    parts = []
+    literal_start = 0
+    next_span = content.find(TIPTAP_FIELD_OPENER)
+    next_plain = content.find(PLAIN_FIELD_OPENER)
+    while next_span != -1 or next_plain != -1:
+        # Try whichever opener comes first; a TipTap span swallows any placeholder inside it
+        if next_plain == -1 or (next_span != -1 and next_span < next_plain):
+            at, match = next_span, TIPTAP_FIELD_TOKEN.match(content, next_span)
+        else:
+            at, match = next_plain, PLAIN_FIELD_TOKEN.match(content, next_plain)
+        if match:
+            parts.append(content[literal_start:at])
+            parts.append(match.group(1))
+            literal_start = end = match.end()
+        else:
+            end = at + 1  # Not a merge field - keep scanning (inside it, too)
+        if next_span != -1 and next_span < end:
+            next_span = content.find(TIPTAP_FIELD_OPENER, end)
+        if next_plain != -1 and next_plain < end:
+            next_plain = content.find(PLAIN_FIELD_OPENER, end)
+    parts.append(content[literal_start:])
+    return CompiledTemplate(parts)
+
+
+class TemplateCache:
+    """
+    Per-worker LRU cache of compiled templates.
+
+    Entries are keyed by the caller's key (e.g. ('document', id)) plus a hash of the content,
+    so edited content never hits a stale entry and old versions simply age out. Content that
+    can never change under its key - a template version, see version_cache_key() - is cached
+    by key alone, without hashing the content on every lookup.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[Any, str], CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, content: str, cache_key: Any = None, immutable: bool = False) -> CompiledTemplate:
+        """Compiled form of content, compiling it on a miss (immutable: the key alone identifies the content)."""
+        if immutable and cache_key is not None:
+            key = (cache_key, None)
+        else:
+            key = (cache_key, hashlib.sha256(content.encode('utf-8')).hexdigest())
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.metrics['hits'] += 1
+                return compiled
+            self.metrics['misses'] += 1
+
+        compiled = compile_merge_template(content)
+
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.metrics['evictions'] += 1
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+template_cache = TemplateCache(max_size=TEMPLATE_CACHE_SIZE)
+
+
+def version_cache_key(template_version_id: int) -> Tuple[str, int]:
+    """Cache key of a template version's compiled content (use with immutable=True)."""
+    return ('template_version', template_version_id)
+
+
+def document_cache_key(document: Document) -> Tuple[Tuple[Any, ...], bool]:
+    """
+    (cache_key, immutable) for rendering a document's content. A document that still
+    shares its template version's HTML uses the version's entry, so all documents
+    generated from one version share a single compiled template.
+    """
+    if document.template_version_id is not None and document.content_sha256 is not None \
+            and document.inline_content is None:
+        return version_cache_key(document.template_version_id), True
+    return ('document', document.id), False
+
+
+def replace_merge_fields(content: str, lead: Lead, cache_key: Any = None, immutable: bool = False) -> str:
     """
     Replace merge fields in template content with actual lead values.
     
@@ -48,49 +199,19 @@ def replace_merge_fields(content: str, lead: Lead) -> str:
     1. Plain text: {{lead.field_key}}
     2. TipTap HTML: <span data-field-key="field_key" data-merge-field="true" ...>{{lead.field_key}}</span>
     
+    The content is compiled once and cached (see TemplateCache); later calls only
+    resolve the field values and join.
+    
     Args:
         content: HTML template content with merge fields
         lead: Lead object with field values
+        cache_key: Identifies the content's owner, e.g. ('document', document.id)
+        immutable: The content under cache_key never changes (see TemplateCache)
     
     Returns:
         HTML content with merge fields replaced
     """
-    # First, handle TipTap HTML format: <span data-field-key="field_key" data-merge-field="true" ...>...</span>
-    # This pattern matches TipTap merge field spans (attributes can be in any order)
-    # We match any span that contains both data-merge-field="true" and data-field-key attributes
-    tiptap_pattern = r'<span[^>]*data-merge-field=["\']true["\'][^>]*>.*?</span>'
-    
-    def replace_tiptap_match(match: re.Match) -> str:
-        span_html = match.group(0)
-        # Extract field_key from data-field-key attribute (can be anywhere in the span tag)
-        field_key_match = re.search(r'data-field-key=["\'](\w+)["\']', span_html)
-        if not field_key_match:
-            return span_html  # Return unchanged if we can't extract field_key
-        
-        field_key = field_key_match.group(1)
-        field_value = get_lead_field_value(lead, field_key)
-        # HTML escape the value to prevent XSS
-        escaped_value = escape_html(field_value)
-        return escaped_value
-    
-    # Replace TipTap HTML merge fields (entire span element)
-    # Only match spans that have data-merge-field="true" AND data-field-key attribute
-    rendered_content = re.sub(tiptap_pattern, replace_tiptap_match, content, flags=re.DOTALL)
-    
-    # Then handle plain text format: {{lead.field_key}}
-    plain_pattern = r'\{\{lead\.(\w+)\}\}'
-    
-    def replace_plain_match(match: re.Match) -> str:
-        field_key = match.group(1)
-        field_value = get_lead_field_value(lead, field_key)
-        # HTML escape the value to prevent XSS
-        escaped_value = escape_html(field_value)
-        return escaped_value
-    
-    # Replace plain text merge fields
-    rendered_content = re.sub(plain_pattern, replace_plain_match, rendered_content)
-    
-    return rendered_content
+    return template_cache.get(content, cache_key, immutable).render(lead)
 
 
 def preserve_signature_blocks(rendered_content: str, signature_blocks_json: Optional[str] = None) -> str:
@@ -147,7 +268,7 @@ def generate_document_content(template: DocumentTemplate, lead: Lead) -> str:
     content = template.content
     
     # Replace merge fields
-    rendered_content = replace_merge_fields(content, lead)
+    rendered_content = replace_merge_fields(content, lead, cache_key=('template', template.id))
     
     # Preserve signature blocks (they're handled separately, but ensure structure is OK)
     rendered_content = preserve_signature_blocks(rendered_content, template.signature_blocks)
@@ -164,40 +285,23 @@ def generate_document_content(template: DocumentTemplate, lead: Lead) -> str:
     return rendered_content
 
 
-def validate_merge_fields(content: str, lead: Lead) -> Dict[str, Any]:
+def validate_merge_fields(content: str, cache_key: Any = None, immutable: bool = False) -> Dict[str, Any]:
     """
-    Validate that all merge fields in content can be resolved from lead.
+    Validate that all merge fields in content are known lead fields.
     
     Supports both formats:
     1. Plain text: {{lead.field_key}}
     2. TipTap HTML: <span data-field-key="field_key" data-merge-field="true" ...>
     
+    Uses the same compiled (and cached) scan as rendering.
+    
     Returns:
         Dictionary with 'valid': bool, 'missing_fields': list, 'all_fields': list
     """
-    found_fields = set()
-    
-    # Find TipTap HTML format merge fields
-    tiptap_pattern = r'<span[^>]*data-merge-field=["\']true["\'][^>]*data-field-key=["\'](\w+)["\']'
-    tiptap_fields = re.findall(tiptap_pattern, content)
-    found_fields.update(tiptap_fields)
-    
-    # Find plain text format merge fields
-    plain_pattern = r'\{\{lead\.(\w+)\}\}'
-    plain_fields = re.findall(plain_pattern, content)
-    found_fields.update(plain_fields)
-    
-    missing_fields = []
-    for field_key in found_fields:
-        value = getattr(lead, field_key, None)
-        # Field is considered missing if attribute doesn't exist
-        # (None values are OK - they'll be replaced with empty string)
-        if not hasattr(lead, field_key):
-            missing_fields.append(field_key)
+    compiled = template_cache.get(content, cache_key, immutable)
     
     return {
-        'valid': len(missing_fields) == 0,
-        'missing_fields': missing_fields,
-        'all_fields': list(found_fields),
+        'valid': len(compiled.unknown_fields) == 0,
+        'missing_fields': list(compiled.unknown_fields),
+        'all_fields': sorted(compiled.field_keys),
     }
-
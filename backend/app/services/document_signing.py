@@ -6,24 +6,28 @@ from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models.document import Document
 from app.models.document_signature import DocumentSignature
-from app.models.lead import Lead
-from app.models.lead_stage import LeadStage
-from app.models.lead_stage_history import LeadStageHistory
 from app.models.signing_link import SigningLink
+from app.services.pdf_rendering import enqueue_pdf_render
+from app.services.stage_registry import (
+    StageInfo,
+    get_stage_by_order as _registry_stage_by_order,
+    find_stage_by_name,
+)
+from app.services.stage_transitions import (
+    EVENT_DOCUMENT_SIGNED,
+    apply_stage_transition,
+    move_leads_to_stage,
+)
 
 
-def get_stage_by_order(db: Session, order: int) -> Optional[LeadStage]:
+def get_stage_by_order(db: Session, order: int) -> Optional[StageInfo]:
     """Get a lead stage by its order number."""
-    return db.query(LeadStage).filter(LeadStage.order == order).first()
+    return _registry_stage_by_order(db, order)
 
 
-def get_stage_by_name_pattern(db: Session, pattern: str) -> Optional[LeadStage]:
+def get_stage_by_name_pattern(db: Session, pattern: str) -> Optional[StageInfo]:
     """Get a lead stage by name pattern (for Hebrew stage names)."""
-    # Look for stages that contain the pattern
-    stages = db.query(LeadStage).filter(LeadStage.name.like(f"%{pattern}%")).all()
-    if stages:
-        return stages[0]
-    return None
+    return find_stage_by_name(db, pattern)
 
 
 def advance_lead_stage(db: Session, lead_id: int, stage_order: int, changed_by_user_id: int) -> bool:
@@ -34,33 +38,10 @@ def advance_lead_stage(db: Session, lead_id: int, stage_order: int, changed_by_u
     Returns:
         True if stage was advanced, False if already at that stage or higher
     """
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
-        return False
-    
-    # Get target stage
     target_stage = get_stage_by_order(db, stage_order)
     if not target_stage:
         return False
-    
-    # Check if lead is already at this stage or beyond
-    current_stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-    if current_stage and current_stage.order >= stage_order:
-        return False  # Already at or beyond target stage
-    
-    # Update lead stage
-    lead.stage_id = target_stage.id
-    
-    # Create stage history entry
-    history_entry = LeadStageHistory(
-        lead_id=lead_id,
-        stage_id=target_stage.id,
-        changed_by_user_id=changed_by_user_id
-    )
-    db.add(history_entry)
-    db.commit()
-    
-    return True
+    return advance_lead_stage_by_id(db, lead_id, target_stage.id, changed_by_user_id)
 
 
 def advance_lead_stage_by_id(db: Session, lead_id: int, stage_id: int, changed_by_user_id: int) -> bool:
@@ -71,33 +52,10 @@ def advance_lead_stage_by_id(db: Session, lead_id: int, stage_id: int, changed_b
     Returns:
         True if stage was advanced, False if already at that stage or higher
     """
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
-        return False
-    
-    # Get target stage
-    target_stage = db.query(LeadStage).filter(LeadStage.id == stage_id).first()
-    if not target_stage:
-        return False
-    
-    # Check if lead is already at this stage or beyond
-    current_stage = db.query(LeadStage).filter(LeadStage.id == lead.stage_id).first()
-    if current_stage and current_stage.order >= target_stage.order:
-        return False  # Already at or beyond target stage
-    
-    # Update lead stage
-    lead.stage_id = target_stage.id
-    
-    # Create stage history entry
-    history_entry = LeadStageHistory(
-        lead_id=lead_id,
-        stage_id=target_stage.id,
-        changed_by_user_id=changed_by_user_id
-    )
-    db.add(history_entry)
+    advanced = move_leads_to_stage(db, [lead_id], stage_id, changed_by_user_id)
     db.commit()
     
-    return True
+    return bool(advanced)
 
 
 def update_document_status_after_signing(
@@ -203,28 +161,22 @@ def submit_signature(
     # Update document status (new workflow: always set to 'signed')
     new_status = update_document_status_after_signing(db, document_id, document.contract_type)
     
-    # Advance lead stage based on contract_type
-    # Map contract_type to signed stage name (Hebrew):
-    # - buyer → "חתום על ידי לקוח" (Buyer Signed)
-    # - seller → "חתום על ידי מוכר" (Seller Signed)  
-    # - lawyer → "חתום על ידי עורך דין" (Lawyer Signed)
-    if document.contract_type:
-        stage_name_map = {
-            'buyer': 'חתום על ידי לקוח',    # Buyer Signed
-            'seller': 'חתום על ידי מוכר',   # Seller Signed
-            'lawyer': 'חתום על ידי עורך דין',  # Lawyer Signed
-        }
-        target_stage_name = stage_name_map.get(document.contract_type)
-        if target_stage_name:
-            # Get stage by name to avoid issues with duplicate orders
-            target_stage = db.query(LeadStage).filter(LeadStage.name == target_stage_name).first()
-            if target_stage:
-                advance_lead_stage_by_id(db, document.lead_id, target_stage.id, signer_user_id or document.created_by_user_id)
+    # Advance lead stage based on contract_type (see stage_transition_rules)
+    apply_stage_transition(
+        db,
+        EVENT_DOCUMENT_SIGNED,
+        [document.lead_id],
+        signer_user_id or document.created_by_user_id,
+        contract_type=document.contract_type
+    )
     
     db.commit()
     db.refresh(signature)
     db.refresh(document)
     
+    # Render the signed document's PDF in the background
+    enqueue_pdf_render([document.id])
+    
     return signature, new_status, True  # Always return True for is_completed since contract is signed
 
 
@@ -394,24 +346,14 @@ def finish_document_signing(
     db.add(document)
     db.flush()
     
-    # Advance lead stage based on contract_type
-    if document.contract_type:
-        stage_name_map = {
-            'buyer': 'חתום על ידי לקוח',    # Buyer Signed
-            'seller': 'חתום על ידי מוכר',   # Seller Signed
-            'lawyer': 'חתום על ידי עורך דין',  # Lawyer Signed
-        }
-        target_stage_name = stage_name_map.get(document.contract_type)
-        if target_stage_name:
-            # Get stage by name to avoid issues with duplicate orders
-            target_stage = db.query(LeadStage).filter(LeadStage.name == target_stage_name).first()
-            if target_stage:
-                advance_lead_stage_by_id(
-                    db, 
-                    document.lead_id, 
-                    target_stage.id, 
-                    document.created_by_user_id  # Use document creator since this is public signing
-                )
+    # Advance lead stage based on contract_type (see stage_transition_rules)
+    apply_stage_transition(
+        db,
+        EVENT_DOCUMENT_SIGNED,
+        [document.lead_id],
+        document.created_by_user_id,  # Use document creator since this is public signing
+        contract_type=document.contract_type
+    )
     
     # Mark signing link as used if token provided
     if signing_token:
@@ -421,3 +363,6 @@ def finish_document_signing(
     
     db.commit()
     db.refresh(document)
+    
+    # Render the signed document's PDF in the background
+    enqueue_pdf_render([document.id])
@@ -0,0 +1,260 @@
+"""
+HTML normalization of template and document content at save time.
+
+The editor's HTML (TipTap, often with content pasted from Word/Google Docs) is rewritten
+once, when it is saved, into a compact canonical form:
+
+- merge-field spans become <span data-merge-field="true" data-field-key="key">{{lead.key}}</span>
+  (what the editor and the merge-field scanner both parse), whatever attributes they carried
+- only allowlisted tags and attributes are kept; script-like elements are dropped with their
+  content, other unknown tags are unwrapped, and URLs must use a safe scheme
+- inline styles keep only allowlisted properties, once each, without no-op values
+- empty inline elements and attribute-less spans are removed, as is whitespace between tags
+
+Paragraphs, line breaks and text (including its spacing) are left as they are, so the page
+layout - which signature block positions depend on - does not change. Normalizing
+already-normalized HTML returns it unchanged.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# Tags kept as-is (with their allowlisted attributes)
+ALLOWED_TAGS = frozenset({
+    'p', 'br', 'hr', 'div', 'span', 'blockquote', 'pre', 'code',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'b', 'em', 'i', 'u', 's', 'strike', 'sub', 'sup', 'mark', 'small',
+    'ul', 'ol', 'li',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'colgroup', 'col', 'caption',
+    'a', 'img',
+})
+
+# Tags dropped together with everything inside them
+DROPPED_TAGS = frozenset({
+    'script', 'style', 'iframe', 'frame', 'frameset', 'object', 'embed', 'applet', 'noscript',
+    'template', 'svg', 'math', 'form', 'input', 'button', 'textarea', 'select', 'option',
+    'link', 'meta', 'base', 'head', 'title',
+})
+
+VOID_TAGS = frozenset({'br', 'hr', 'img', 'col', 'wbr'})
+
+# Inline elements that are removed when they end up with no content
+INLINE_TAGS = frozenset({
+    'span', 'strong', 'b', 'em', 'i', 'u', 's', 'strike', 'sub', 'sup', 'mark', 'small', 'code', 'a',
+})
+
+GLOBAL_ATTRIBUTES = frozenset({'style', 'dir', 'class'})
+TAG_ATTRIBUTES = {
+    'a': frozenset({'href', 'target', 'rel'}),
+    'img': frozenset({'src', 'alt', 'width', 'height', 'data-pdf-page'}),
+    'td': frozenset({'colspan', 'rowspan'}),
+    'th': frozenset({'colspan', 'rowspan'}),
+    'col': frozenset({'span'}),
+    'ol': frozenset({'start'}),
+}
+
+SAFE_HREF = re.compile(r'^(?:https?:|mailto:|tel:|#|/(?!/))', re.IGNORECASE)
+SAFE_SRC = re.compile(r'^(?:https?:|data:image/(?:png|jpe?g|gif|webp);|/(?!/))', re.IGNORECASE)
+
+# Style properties kept; anything else (editor/paste noise) is dropped
+ALLOWED_STYLES = frozenset({
+    'font-size', 'font-weight', 'font-style', 'text-decoration', 'text-align', 'direction',
+    'color', 'background-color', 'line-height', 'vertical-align', 'text-indent',
+    'display', 'width', 'max-width', 'height', 'float',
+    'margin', 'margin-top', 'margin-bottom', 'margin-left', 'margin-right',
+    'padding', 'padding-top', 'padding-bottom', 'padding-left', 'padding-right',
+    'border', 'border-collapse',
+})
+
+# Declarations that never change the rendering (initial values of non-inherited properties)
+NO_OP_STYLES = frozenset({
+    ('background-color', 'transparent'),
+    ('vertical-align', 'baseline'),
+    ('text-indent', '0'),
+    ('text-indent', '0px'),
+})
+
+_FIELD_KEY = re.compile(r'^\w+$')
+_UNSAFE_STYLE_VALUE = re.compile(r'expression|url\s*\(|javascript:', re.IGNORECASE)
+_INTER_TAG_WHITESPACE = re.compile(r'^\s*\n\s*$')
+
+
+def canonical_merge_field(field_key: str) -> str:
+    return f'<span data-merge-field="true" data-field-key="{field_key}">{{{{lead.{field_key}}}}}</span>'
+
+
+def normalize_style(style: str) -> str:
+    """Allowlisted, deduplicated (last wins) declarations of an inline style, compactly joined."""
+    declarations: Dict[str, str] = {}
+    for declaration in style.split(';'):
+        name, _, value = declaration.partition(':')
+        name = name.strip().lower()
+        value = ' '.join(value.split())
+        if not value or name not in ALLOWED_STYLES or _UNSAFE_STYLE_VALUE.search(value):
+            continue
+        declarations.pop(name, None)  # Keep the last occurrence, in its position
+        if (name, value.lower()) not in NO_OP_STYLES:
+            declarations[name] = value
+    return ';'.join(f'{name}:{value}' for name, value in declarations.items())
+
+
+def _allowed_attributes(tag: str, attrs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, str]]:
+    allowed = TAG_ATTRIBUTES.get(tag, frozenset())
+    result = []
+    seen = set()
+    for name, value in attrs:
+        name = name.lower()
+        if name in seen or (name not in GLOBAL_ATTRIBUTES and name not in allowed):
+            continue
+        value = (value or '').strip()
+        if name == 'style':
+            value = normalize_style(value)
+        elif name == 'href' and not SAFE_HREF.match(value):
+            continue
+        elif name == 'src' and not SAFE_SRC.match(value):
+            continue
+        elif name == 'class':
+            value = ' '.join(value.split())
+        if not value:
+            continue
+        seen.add(name)
+        result.append((name, value))
+    return result
+
+
+class _Normalizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out: List[str] = []
+        # Open elements: (tag, index of the start tag in out, or None if not emitted)
+        self.stack: List[Tuple[str, Optional[int]]] = []
+        self.skip_tag: Optional[str] = None  # Dropped element or merge-field span being skipped
+        self.skip_depth = 0
+
+    # ----- skipping dropped content -----
+
+    def _skipping(self, tag: str, opening: bool) -> bool:
+        if self.skip_tag is None:
+            return False
+        if tag == self.skip_tag:
+            self.skip_depth += 1 if opening else -1
+            if self.skip_depth == 0:
+                self.skip_tag = None
+        return True
+
+    def _skip(self, tag: str) -> None:
+        self.skip_tag, self.skip_depth = tag, 1
+
+    # ----- tags -----
+
+    def handle_starttag(self, tag, attrs):
+        if self._skipping(tag, True):
+            return
+        if tag in DROPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self._skip(tag)
+            return
+        if tag == 'span':
+            values = dict(attrs)
+            field_key = (values.get('data-field-key') or '').strip()
+            if values.get('data-merge-field') == 'true' and _FIELD_KEY.match(field_key):
+                self.out.append(canonical_merge_field(field_key))
+                self._skip('span')  # Its content is always the placeholder
+                return
+        if tag not in ALLOWED_TAGS:
+            if tag not in VOID_TAGS:
+                self.stack.append((tag, None))  # Unwrapped - children are kept
+            return
+
+        attributes = _allowed_attributes(tag, attrs)
+        if tag in VOID_TAGS:
+            if tag != 'img' or any(name == 'src' for name, _ in attributes):
+                self.out.append(self._start_tag(tag, attributes))
+            return
+        if tag == 'span' and not attributes:
+            self.stack.append((tag, None))  # A bare span is a no-op
+            return
+        self.stack.append((tag, len(self.out)))
+        self.out.append(self._start_tag(tag, attributes))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and (self.skip_tag == tag or (self.stack and self.stack[-1][0] == tag)):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._skipping(tag, False):
+            return
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self.stack):
+            return  # Stray end tag
+        while self.stack:
+            open_tag, start = self.stack.pop()
+            self._close(open_tag, start)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag: str, start: Optional[int]) -> None:
+        if start is None:
+            return
+        if tag in INLINE_TAGS and all(not part for part in self.out[start + 1:]):
+            del self.out[start:]  # Empty inline element
+            return
+        self.out.append(f'</{tag}>')
+
+    @staticmethod
+    def _start_tag(tag: str, attributes: List[Tuple[str, str]]) -> str:
+        rendered = ''.join(f' {name}="{escape(value, quote=True)}"' for name, value in attributes)
+        return f'<{tag}{rendered}>'
+
+    # ----- content -----
+
+    def handle_data(self, data):
+        if self.skip_tag is not None:
+            return
+        if _INTER_TAG_WHITESPACE.match(data):
+            return  # Source formatting between tags
+        self.out.append(data.replace('<', '&lt;').replace('>', '&gt;'))
+
+    def handle_entityref(self, name):
+        if self.skip_tag is None:
+            self.out.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if self.skip_tag is None:
+            self.out.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        pass
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+    def unknown_decl(self, data):
+        pass
+
+    def result(self) -> str:
+        self.close()
+        while self.stack:
+            self._close(*self.stack.pop())
+        return ''.join(self.out)
+
+
+def normalize_html(content: str) -> str:
+    """
+    Canonical, compact form of template/document HTML (see module docstring).
+
+    Args:
+        content: HTML as saved by the editor
+
+    Returns:
+        Normalized HTML
+    """
+    if not content:
+        return content
+    normalizer = _Normalizer()
+    normalizer.feed(content)
+    return normalizer.result()
@@ -0,0 +1,268 @@
+"""
+Lead change log - captures field-level lead changes on flush and writes them in batches.
+
+Capture: a before_flush listener diffs the attribute history of changed leads (and their
+extension rows) and keeps the entries on the session. They are handed to the appender only
+after the transaction commits, so rolled-back changes are never logged.
+
+Write: the appender queues the entries and a background thread inserts them in batches,
+so request handlers never wait on audit inserts.
+"""
+import atexit
+import logging
+import queue
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import (
+    CHANGE_LOG_FLUSH_INTERVAL_SECONDS,
+    CHANGE_LOG_BATCH_SIZE,
+    CHANGE_LOG_MAX_QUEUE,
+)
+from app.core.database import engine
+from app.models.lead import Lead, LEAD_MATCH_KEY_FIELDS
+from app.models.lead_extensions import LEAD_EXTENSION_GROUPS
+from app.models.lead_change_log import LeadChangeLog
+
+logger = logging.getLogger(__name__)
+
+# System-maintained columns that are not worth an audit row
+SKIPPED_FIELDS = {'id', 'lead_id', 'organization_id', 'created_at', 'updated_at', 'version', *LEAD_MATCH_KEY_FIELDS}
+
+# Session.info key holding entries captured in the current transaction
+_PENDING_KEY = 'lead_change_log_pending'
+
+
+def serialize_value(value: Any) -> Optional[str]:
+    """Text form of a field value as stored in the change log."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class LeadChangeAppender:
+    """
+    Buffered writer for change log rows.
+
+    append() only enqueues; a daemon thread writes queued rows every flush_interval
+    seconds, or sooner once batch_size rows are waiting. When the queue is full,
+    append() blocks instead of dropping audit rows.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, max_queue: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._retry_batch: List[Dict[str, Any]] = []
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics: Dict[str, Any] = {'written': 0, 'batches': 0, 'failed_batches': 0, 'last_error': None}
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue change log rows for writing."""
+        self._ensure_started()
+        for entry in entries:
+            self._queue.put(entry)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far in the calling thread.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        with self._write_lock:
+            while True:
+                batch = self._retry_batch or self._drain()
+                if not batch:
+                    break
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(LeadChangeLog.__table__), batch)
+                except Exception as e:
+                    # Keep the batch and retry it on the next flush
+                    logger.error(f"Failed to write {len(batch)} lead change log rows: {e}", exc_info=True)
+                    self._retry_batch = batch
+                    self.metrics['failed_batches'] += 1
+                    self.metrics['last_error'] = str(e)
+                    break
+                self._retry_batch = []
+                written += len(batch)
+                self.metrics['written'] += len(batch)
+                self.metrics['batches'] += 1
+        return written
+
+    def stop(self) -> None:
+        """Stop the writer thread and write whatever is still queued."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+        self._stopping.clear()
+
+    def pending(self) -> int:
+        """Number of rows waiting to be written."""
+        return self._queue.qsize() + len(self._retry_batch)
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="lead-change-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Lead change log writer failed: {e}", exc_info=True)
+
+
+change_log_appender = LeadChangeAppender(
+    flush_interval=CHANGE_LOG_FLUSH_INTERVAL_SECONDS,
+    batch_size=CHANGE_LOG_BATCH_SIZE,
+    max_queue=CHANGE_LOG_MAX_QUEUE,
+)
+atexit.register(change_log_appender.stop)
+
+
+def _diff_entries(obj: Any, lead: Lead, changed_at: datetime, user_id: Optional[int]) -> List[Dict[str, Any]]:
+    """Build change log rows from the pending attribute history of a lead or extension row."""
+    state = inspect(obj)
+    entries = []
+    for attr in state.mapper.column_attrs:
+        if attr.key in SKIPPED_FIELDS:
+            continue
+        history = state.attrs[attr.key].history
+        if not history.added:
+            continue
+        old_value = serialize_value(history.deleted[0]) if history.deleted else None
+        new_value = serialize_value(history.added[0])
+        if old_value == new_value:
+            continue
+        entries.append({
+            'organization_id': lead.organization_id,
+            'lead_id': lead.id,
+            'field_name': attr.key,
+            'old_value': old_value,
+            'new_value': new_value,
+            'changed_by_user_id': user_id,
+            'changed_at': changed_at,
+        })
+    return entries
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_lead_changes(session, flush_context, instances):
+    """Record field-level changes of existing leads (creation itself is not diffed)."""
+    extension_models = tuple(LEAD_EXTENSION_GROUPS.values())
+    changed_at = datetime.utcnow()
+    user_id = session.info.get('user_id')
+    entries = []
+
+    for obj in list(session.dirty) + list(session.new):
+        if isinstance(obj, Lead):
+            lead = obj
+        elif isinstance(obj, extension_models):
+            lead = obj.lead
+        else:
+            continue
+        if lead is None or lead in session.new or lead.id is None:
+            continue
+        entries.extend(_diff_entries(obj, lead, changed_at, user_id))
+
+    if entries:
+        session.info.setdefault(_PENDING_KEY, []).extend(entries)
+
+
+def record_lead_changes(session: Session, entries: List[Dict[str, Any]]) -> None:
+    """
+    Add change log rows for writes the flush hook cannot see (bulk UPDATE statements).
+
+    The rows are handed to the appender when the session's transaction commits.
+    """
+    if entries:
+        session.info.setdefault(_PENDING_KEY, []).extend(entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_lead_changes(session):
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        change_log_appender.append(entries)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_lead_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_lead_changes(
+    db: Session,
+    lead_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    field_name: Optional[str] = None
+) -> Tuple[List[LeadChangeLog], Optional[str]]:
+    """
+    Load a page of a lead's change history, newest first.
+
+    Queued rows are written first so a client sees its own changes immediately.
+
+    Args:
+        cursor: Opaque cursor from a previous page (the id of its last row)
+        field_name: Only return changes to this field
+
+    Returns:
+        (changes, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if change_log_appender.pending():
+        change_log_appender.flush()
+
+    query = db.query(LeadChangeLog).options(
+        joinedload(LeadChangeLog.changed_by_user)
+    ).filter(LeadChangeLog.lead_id == lead_id)
+
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise ValueError("Invalid cursor")
+        query = query.filter(LeadChangeLog.id < int(cursor))
+    if field_name:
+        query = query.filter(LeadChangeLog.field_name == field_name)
+
+    changes = query.order_by(LeadChangeLog.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(changes) > limit:
+        changes = changes[:limit]
+        next_cursor = str(changes[-1].id)
+    return changes, next_cursor
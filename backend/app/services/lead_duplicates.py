@@ -0,0 +1,145 @@
+"""
+Lead duplicate detection - matches leads on their normalized phone, email and ID number keys.
+
+Every lookup goes through the (organization_id, <key>, deleted_at) indexes on leads,
+so it never scans the table.
+"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func, literal, union_all
+from sqlalchemy.orm import Session
+from app.core.normalization import normalize_phone, normalize_email, normalize_client_id
+from app.models.lead import Lead
+
+# Match field -> (normalized column, normalizer for raw input)
+MATCH_FIELDS = {
+    'phone': (Lead.phone_normalized, normalize_phone),
+    'email': (Lead.email_normalized, normalize_email),
+    'client_id': (Lead.client_id_normalized, normalize_client_id),
+}
+
+
+def find_lead_duplicates(
+    db: Session,
+    organization_id: int,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    client_id: Optional[str] = None,
+    exclude_lead_id: Optional[int] = None,
+    limit: int = 20
+) -> List[Tuple[Lead, List[str]]]:
+    """
+    Find existing leads sharing a phone, email or ID number with the given raw values.
+
+    Runs one indexed equality lookup per provided value.
+
+    Returns:
+        List of (lead, matched fields) tuples, most recently created first
+    """
+    raw_values = {'phone': phone, 'email': email, 'client_id': client_id}
+    matches: Dict[int, Tuple[Lead, List[str]]] = {}
+
+    for field, (column, normalize) in MATCH_FIELDS.items():
+        key = normalize(raw_values[field])
+        if not key:
+            continue
+        query = db.query(Lead).filter(
+            Lead.organization_id == organization_id,
+            column == key,
+            Lead.deleted_at.is_(None)
+        )
+        if exclude_lead_id is not None:
+            query = query.filter(Lead.id != exclude_lead_id)
+        for lead in query.limit(limit).all():
+            matches.setdefault(lead.id, (lead, []))[1].append(field)
+
+    ordered = sorted(matches.values(), key=lambda match: match[0].id, reverse=True)
+    return ordered[:limit]
+
+
+def find_duplicate_groups(
+    db: Session,
+    organization_id: int,
+    fields: Optional[List[str]] = None,
+    lead: Optional[Lead] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> Tuple[int, List[Dict[str, object]]]:
+    """
+    List groups of leads that share a normalized match key.
+
+    Groups are computed with GROUP BY over the match key indexes and paginated in SQL;
+    the leads of the returned page are then loaded with one IN query per field.
+
+    Args:
+        fields: Match fields to group on (default: all of MATCH_FIELDS)
+        lead: Only return the groups this lead belongs to
+        limit, offset: Pagination over groups, largest groups first
+
+    Returns:
+        (total group count, list of {'field', 'value', 'count', 'leads'} dictionaries)
+
+    Raises:
+        ValueError: If an unknown match field is requested
+    """
+    fields = fields or list(MATCH_FIELDS)
+    unknown = [field for field in fields if field not in MATCH_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown duplicate match fields: {', '.join(unknown)}")
+
+    selects = []
+    for field in fields:
+        column = MATCH_FIELDS[field][0]
+        group_select = select(
+            literal(field).label('field'),
+            column.label('value'),
+            func.count().label('lead_count')
+        ).where(
+            Lead.organization_id == organization_id,
+            column.isnot(None),
+            Lead.deleted_at.is_(None)
+        )
+        if lead is not None:
+            lead_key = getattr(lead, column.key)
+            if not lead_key:
+                continue
+            group_select = group_select.where(column == lead_key)
+        selects.append(group_select.group_by(column).having(func.count() > 1))
+
+    if not selects:
+        return 0, []
+
+    groups_query = union_all(*selects).subquery() if len(selects) > 1 else selects[0].subquery()
+    total = db.execute(select(func.count()).select_from(groups_query)).scalar() or 0
+    rows = db.execute(
+        select(groups_query)
+        .order_by(groups_query.c.lead_count.desc(), groups_query.c.field, groups_query.c.value)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+
+    # Load the leads of this page's groups, one query per match field
+    values_by_field: Dict[str, List[str]] = {}
+    for row in rows:
+        values_by_field.setdefault(row.field, []).append(row.value)
+
+    leads_by_key: Dict[Tuple[str, str], List[Lead]] = {}
+    for field, values in values_by_field.items():
+        column = MATCH_FIELDS[field][0]
+        group_leads = db.query(Lead).filter(
+            Lead.organization_id == organization_id,
+            column.in_(values),
+            Lead.deleted_at.is_(None)
+        ).order_by(Lead.id).all()
+        for group_lead in group_leads:
+            leads_by_key.setdefault((field, getattr(group_lead, column.key)), []).append(group_lead)
+
+    groups = [
+        {
+            'field': row.field,
+            'value': row.value,
+            'count': row.lead_count,
+            'leads': leads_by_key.get((row.field, row.value), []),
+        }
+        for row in rows
+    ]
+    return total, groups
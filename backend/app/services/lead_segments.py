@@ -0,0 +1,359 @@
+"""
+Lead segments service - declarative segment filters and incremental membership maintenance.
+
+A segment filter is a JSON list of conditions over `leads` columns, ANDed together:
+
+    [{"field": "assigned_user_id", "op": "eq", "value": "$me"},
+     {"field": "stage_id", "op": "in", "value": [3, 4]},
+     {"field": "fee_payment_status", "op": "ne", "value": "שולם"},
+     {"field": "signing_date", "op": "in_period", "value": "this_month"}]
+
+"$me" is the segment creator. Relative periods (in_period) are evaluated against the
+current date; the membership remembers the period it was built for and is rebuilt on
+first read after the period rolls over.
+
+Membership is maintained by an after_flush listener that re-evaluates only the leads
+written in that flush, in one statement for all of the organization's segments.
+"""
+import json
+import logging
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, case, delete, event, insert, literal, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, joinedload, noload
+from app.models.lead import Lead, LEAD_MATCH_KEY_FIELDS
+from app.models.lead_segment import LeadSegment, LeadSegmentMember
+
+logger = logging.getLogger(__name__)
+
+# Columns a segment may filter on (hot `leads` columns only - extension fields live elsewhere)
+FILTERABLE_FIELDS = {
+    column.name: column
+    for column in Lead.__table__.columns
+    if column.name not in {'id', 'organization_id', 'deleted_at', 'version', *LEAD_MATCH_KEY_FIELDS}
+}
+
+OPERATORS = {'eq', 'ne', 'in', 'not_in', 'gt', 'gte', 'lt', 'lte', 'is_null', 'not_null', 'contains', 'in_period'}
+PERIODS = {'today', 'this_week', 'this_month', 'this_year'}
+
+CURRENT_USER = '$me'
+
+
+class SegmentFilter(BaseModel):
+    """One condition of a segment filter - all conditions must match."""
+    field: str = Field(..., description="Lead column name, e.g. stage_id")
+    op: str = Field("eq", description="eq, ne, in, not_in, gt, gte, lt, lte, is_null, not_null, contains, in_period")
+    value: Optional[Any] = Field(None, description="Value, list for in/not_in, '$me' for the segment owner, period name for in_period")
+
+
+# ========== Filter parsing and compilation ==========
+
+def _coerce(column, value: Any, field: str) -> Any:
+    """Convert a JSON filter value to the column's Python type."""
+    if value is None or value == CURRENT_USER:
+        return value
+    python_type = column.type.python_type
+    try:
+        if python_type is date:
+            return date.fromisoformat(str(value)[:10])
+        if python_type is Decimal:
+            return Decimal(str(value))
+        if python_type is int and not isinstance(value, bool):
+            return int(value)
+        if python_type is bool:
+            if isinstance(value, str):
+                return value.lower() in ('true', '1', 'yes')
+            return bool(value)
+    except (ValueError, InvalidOperation):
+        raise ValueError(f"Invalid value for '{field}': {value!r}")
+    return value
+
+
+def parse_segment_filters(filters: Any) -> List[Dict[str, Any]]:
+    """
+    Validate segment filters.
+
+    Returns:
+        The filters as a normalized list of {'field', 'op', 'value'} dictionaries
+
+    Raises:
+        ValueError: If a condition uses an unknown field or operator or an invalid value
+    """
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters or '[]')
+        except json.JSONDecodeError:
+            raise ValueError("Segment filters must be valid JSON")
+    if not isinstance(filters, list):
+        raise ValueError("Segment filters must be a list of conditions")
+
+    parsed = []
+    for condition in filters:
+        if not isinstance(condition, dict):
+            raise ValueError("Each segment filter must be an object with field, op and value")
+        field = condition.get('field')
+        op = condition.get('op', 'eq')
+        value = condition.get('value')
+
+        if field not in FILTERABLE_FIELDS:
+            raise ValueError(f"Unknown segment filter field: {field}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown segment filter operator: {op}")
+
+        column = FILTERABLE_FIELDS[field]
+        if op in ('in', 'not_in'):
+            if not isinstance(value, list) or not value:
+                raise ValueError(f"'{op}' on '{field}' needs a non-empty list value")
+            value = [_coerce(column, item, field) for item in value]
+        elif op == 'in_period':
+            if column.type.python_type is not date or value not in PERIODS:
+                raise ValueError(f"'in_period' needs a date field and one of: {', '.join(sorted(PERIODS))}")
+        elif op in ('is_null', 'not_null'):
+            value = None
+        elif op == 'contains':
+            if not isinstance(value, str) or not value:
+                raise ValueError(f"'contains' on '{field}' needs a text value")
+        else:
+            if value is None:
+                raise ValueError(f"'{op}' on '{field}' needs a value")
+            value = _coerce(column, value, field)
+
+        parsed.append({'field': field, 'op': op, 'value': value})
+    return parsed
+
+
+def period_range(period: str, today: date) -> Tuple[date, date]:
+    """Start (inclusive) and end (exclusive) date of a relative period."""
+    if period == 'today':
+        return today, today + timedelta(days=1)
+    if period == 'this_week':
+        # Israeli week starts on Sunday
+        start = today - timedelta(days=(today.weekday() + 1) % 7)
+        return start, start + timedelta(days=7)
+    if period == 'this_month':
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+    start = today.replace(month=1, day=1)
+    return start, start.replace(year=start.year + 1)
+
+
+def segment_period_key(filters: List[Dict[str, Any]], today: date) -> Optional[str]:
+    """Identify the period a segment's membership is valid for (None if it has no relative dates)."""
+    periods = sorted({condition['value'] for condition in filters if condition['op'] == 'in_period'})
+    if not periods:
+        return None
+    return ','.join(period_range(period, today)[0].isoformat() for period in periods)
+
+
+def compile_segment_condition(segment: LeadSegment, today: Optional[date] = None):
+    """Build the SQL condition selecting the segment's leads."""
+    today = today or date.today()
+    conditions = [Lead.organization_id == segment.organization_id, Lead.deleted_at.is_(None)]
+
+    for condition in parse_segment_filters(segment.filters):
+        column = getattr(Lead, condition['field'])
+        op = condition['op']
+        value = condition['value']
+        if value == CURRENT_USER:
+            value = segment.created_by_user_id
+        elif isinstance(value, list):
+            value = [segment.created_by_user_id if item == CURRENT_USER else item for item in value]
+
+        if op == 'eq':
+            conditions.append(column == value)
+        elif op == 'ne':
+            conditions.append(or_(column != value, column.is_(None)))
+        elif op == 'in':
+            conditions.append(column.in_(value))
+        elif op == 'not_in':
+            conditions.append(or_(column.notin_(value), column.is_(None)))
+        elif op == 'gt':
+            conditions.append(column > value)
+        elif op == 'gte':
+            conditions.append(column >= value)
+        elif op == 'lt':
+            conditions.append(column < value)
+        elif op == 'lte':
+            conditions.append(column <= value)
+        elif op == 'is_null':
+            conditions.append(column.is_(None))
+        elif op == 'not_null':
+            conditions.append(column.isnot(None))
+        elif op == 'contains':
+            conditions.append(column.ilike(f"%{value}%"))
+        elif op == 'in_period':
+            start, end = period_range(value, today)
+            conditions.append(and_(column >= start, column < end))
+
+    return and_(*conditions)
+
+
+# ========== Membership maintenance ==========
+
+def rebuild_segment_membership(db: Session, segment: LeadSegment, today: Optional[date] = None) -> int:
+    """
+    Recompute a segment's membership from scratch (on create, filter change or period rollover).
+
+    Does not commit.
+
+    Returns:
+        The new member count
+    """
+    today = today or date.today()
+    condition = compile_segment_condition(segment, today)
+
+    db.execute(delete(LeadSegmentMember).where(LeadSegmentMember.segment_id == segment.id))
+    result = db.execute(
+        insert(LeadSegmentMember).from_select(
+            ['segment_id', 'lead_id'],
+            select(literal(segment.id), Lead.id).where(condition)
+        )
+    )
+    segment.member_count = result.rowcount
+    segment.period_key = segment_period_key(parse_segment_filters(segment.filters), today)
+    db.flush()
+    return segment.member_count
+
+
+def refresh_lead_segments(connection: Connection, lead_ids: Iterable[int], today: Optional[date] = None) -> None:
+    """
+    Re-evaluate every segment of the given leads' organizations for just these leads.
+
+    Adds/removes membership rows and adjusts member counts. Call this explicitly after bulk
+    UPDATE statements, which bypass the ORM flush hook.
+    """
+    lead_ids = list(set(lead_ids))
+    if not lead_ids:
+        return
+    today = today or date.today()
+
+    organization_ids = connection.execute(
+        select(Lead.organization_id).where(Lead.id.in_(lead_ids)).distinct()
+    ).scalars().all()
+    segments = [
+        LeadSegment(
+            id=row.id,
+            organization_id=row.organization_id,
+            created_by_user_id=row.created_by_user_id,
+            filters=row.filters,
+        )
+        for row in connection.execute(
+            select(
+                LeadSegment.id,
+                LeadSegment.organization_id,
+                LeadSegment.created_by_user_id,
+                LeadSegment.filters,
+                LeadSegment.period_key,
+            ).where(LeadSegment.organization_id.in_(organization_ids))
+        )
+        # Stale period segments are rebuilt on next read - don't mix periods
+        if row.period_key == segment_period_key(parse_segment_filters(row.filters), today)
+    ]
+
+    # Existing membership of these leads
+    existing = set(
+        connection.execute(
+            select(LeadSegmentMember.segment_id, LeadSegmentMember.lead_id)
+            .where(LeadSegmentMember.lead_id.in_(lead_ids))
+        ).tuples().all()
+    )
+
+    # One statement evaluates every segment for every changed lead
+    wanted = set()
+    if segments:
+        columns = [
+            case((compile_segment_condition(segment, today), 1), else_=0).label(f"s{segment.id}")
+            for segment in segments
+        ]
+        for row in connection.execute(select(Lead.id, *columns).where(Lead.id.in_(lead_ids))):
+            for segment, matches in zip(segments, row[1:]):
+                if matches:
+                    wanted.add((segment.id, row[0]))
+
+    evaluated = {segment.id for segment in segments}
+    to_add = wanted - existing
+    to_remove = {member for member in existing if member[0] in evaluated and member not in wanted}
+    if not to_add and not to_remove:
+        return
+
+    if to_add:
+        connection.execute(
+            insert(LeadSegmentMember),
+            [{'segment_id': segment_id, 'lead_id': lead_id} for segment_id, lead_id in to_add]
+        )
+    for segment_id, lead_id in to_remove:
+        connection.execute(delete(LeadSegmentMember).where(
+            LeadSegmentMember.segment_id == segment_id,
+            LeadSegmentMember.lead_id == lead_id
+        ))
+
+    deltas: Dict[int, int] = {}
+    for segment_id, _lead_id in to_add:
+        deltas[segment_id] = deltas.get(segment_id, 0) + 1
+    for segment_id, _lead_id in to_remove:
+        deltas[segment_id] = deltas.get(segment_id, 0) - 1
+    for segment_id, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(LeadSegment)
+                .where(LeadSegment.id == segment_id)
+                .values(member_count=LeadSegment.member_count + delta)
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_segments_for_flushed_leads(session, flush_context):
+    """Keep segment membership current for leads inserted or updated in this flush."""
+    lead_ids = [
+        obj.id for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Lead) and obj.id is not None
+        and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    deleted_ids = [obj.id for obj in session.deleted if isinstance(obj, Lead)]
+
+    if deleted_ids:
+        connection = session.connection()
+        for segment_id in connection.execute(
+            select(LeadSegmentMember.segment_id).where(LeadSegmentMember.lead_id.in_(deleted_ids))
+        ).scalars().all():
+            connection.execute(
+                update(LeadSegment).where(LeadSegment.id == segment_id)
+                .values(member_count=LeadSegment.member_count - 1)
+            )
+        connection.execute(delete(LeadSegmentMember).where(LeadSegmentMember.lead_id.in_(deleted_ids)))
+
+    if lead_ids:
+        refresh_lead_segments(session.connection(), lead_ids)
+
+
+# ========== Reading ==========
+
+def ensure_segment_current(db: Session, segment: LeadSegment) -> None:
+    """Rebuild a relative-date segment whose period rolled over since it was built (commits)."""
+    key = segment_period_key(parse_segment_filters(segment.filters), date.today())
+    if key != segment.period_key:
+        rebuild_segment_membership(db, segment)
+        db.commit()
+        db.refresh(segment)
+
+
+def get_segment_leads(db: Session, segment: LeadSegment, offset: int = 0, limit: int = 50) -> List[Lead]:
+    """
+    Load a page of a segment's leads through the membership index, newest first.
+
+    Users are joined in; the stage relationship is left unloaded (stages come from the stage registry).
+    """
+    ensure_segment_current(db, segment)
+    return db.query(Lead).join(
+        LeadSegmentMember, LeadSegmentMember.lead_id == Lead.id
+    ).options(
+        noload(Lead.stage),
+        joinedload(Lead.assigned_user),
+        joinedload(Lead.created_by_user),
+    ).filter(
+        LeadSegmentMember.segment_id == segment.id
+    ).order_by(Lead.created_at.desc(), Lead.id.desc()).offset(offset).limit(limit).all()
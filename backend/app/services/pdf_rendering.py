@@ -0,0 +1,414 @@
+"""
+PDF rendering - turns a document's merged HTML into PDF_STORAGE_DIR/{organization_id}/{document_id}.pdf.
+
+Rendering is CPU-bound and slow for long contracts, so it never runs in a request handler:
+enqueue_pdf_render() puts the document on a bounded queue, a dispatcher thread builds the
+print HTML and hands it to a pool of renderer processes (WeasyPrint), and the finished file
+path is stored in Document.pdf_file_path - with the render's content hash and the signatures
+stamped on it (pdf_render_digest, pdf_signatures_key), which identify the file for HTTP caching.
+
+Renders are cached by the SHA-256 of the print HTML under PDF_STORAGE_DIR/_cache, so the same
+merged contract (re-render, retry, identical documents) is only rendered once. Identical jobs
+that are in flight at the same time share one render. The cache holds unsigned renders; for
+signed documents the published PDF is a stamped copy (see pdf_stamping), made in the same pool.
+"""
+import atexit
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import (
+    PDF_STORAGE_DIR,
+    PDF_FONT_DIR,
+    PDF_RENDER_WORKERS,
+    PDF_RENDER_MAX_QUEUE,
+)
+from app.core.database import SessionLocal
+from app.models.document import Document
+from app.models.lead import Lead
+from app.services.document_generation import document_cache_key, replace_merge_fields
+from app.services.pdf_stamping import collect_signature_stamps, signature_set_key, stamp_signatures
+
+logger = logging.getLogger(__name__)
+
+# Bump when the print stylesheet or renderer changes in a way that should invalidate cached PDFs
+RENDERER_VERSION = '1'
+
+FONT_FAMILY = 'DocFlow Hebrew'
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+
+# A4 with the same 64px margins as the editor's page shell (666px content width)
+PRINT_STYLESHEET = """
+@page { size: A4; margin: 64px; }
+html { direction: rtl; }
+body {
+    font-family: '%(font_family)s', 'Noto Sans Hebrew', 'David CLM', 'Arial', sans-serif;
+    font-size: 12pt;
+    line-height: 1.5;
+    unicode-bidi: embed;
+}
+img { max-width: 100%%; }
+table { border-collapse: collapse; }
+"""
+
+
+# ========== Print HTML ==========
+
+def _font_faces() -> str:
+    """@font-face rules for the fonts in PDF_FONT_DIR (bold/italic guessed from the file name)."""
+    if not PDF_FONT_DIR or not os.path.isdir(PDF_FONT_DIR):
+        return ''
+    rules = []
+    for name in sorted(os.listdir(PDF_FONT_DIR)):
+        if not name.lower().endswith(FONT_EXTENSIONS):
+            continue
+        stem = name.lower()
+        weight = 'bold' if 'bold' in stem else 'normal'
+        style = 'italic' if 'italic' in stem or 'oblique' in stem else 'normal'
+        url = Path(PDF_FONT_DIR, name).resolve().as_uri()
+        rules.append(
+            f"@font-face {{ font-family: '{FONT_FAMILY}'; src: url('{url}'); "
+            f"font-weight: {weight}; font-style: {style}; }}"
+        )
+    return '\n'.join(rules)
+
+
+def build_print_html(body_html: str) -> str:
+    """Wrap merged document HTML into a standalone RTL page for the renderer."""
+    return (
+        '<!DOCTYPE html><html lang="he" dir="rtl"><head><meta charset="utf-8">'
+        f'<style>{_font_faces()}{PRINT_STYLESHEET % {"font_family": FONT_FAMILY}}</style>'
+        f'</head><body>{body_html}</body></html>'
+    )
+
+
+def content_hash(print_html: str) -> str:
+    """Cache key of a render."""
+    return hashlib.sha256(f"{RENDERER_VERSION}\n{print_html}".encode('utf-8')).hexdigest()
+
+
+def cached_pdf_path(digest: str) -> Path:
+    return Path(PDF_STORAGE_DIR) / '_cache' / digest[:2] / f"{digest}.pdf"
+
+
+def document_pdf_path(organization_id: int, document_id: int) -> Path:
+    return Path(PDF_STORAGE_DIR) / str(organization_id) / f"{document_id}.pdf"
+
+
+# ========== Renderer process ==========
+
+def _render_pdf_file(print_html: str, output_path: str) -> int:
+    """
+    Render HTML to a PDF file (runs in a renderer process).
+
+    Writes to a temporary file first so a crashed render never leaves a partial cache entry.
+
+    Returns:
+        Size of the PDF in bytes
+    """
+    from weasyprint import HTML
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    HTML(string=print_html, base_url=os.getcwd()).write_pdf(tmp_path)
+    os.replace(tmp_path, output_path)
+    return os.path.getsize(output_path)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Publish a cached render at the document's path (hard link when possible)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_target = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(source, tmp_target)
+    except OSError:
+        shutil.copyfile(source, tmp_target)
+    os.replace(tmp_target, target)
+
+
+# ========== Job queue ==========
+
+# How often an idle dispatcher checks whether stop() was called
+STOP_POLL_SECONDS = 1.0
+
+class PdfRenderQueue:
+    """
+    Bounded queue of documents to render, fed to a process pool.
+
+    enqueue() only queues the document ID; a daemon dispatcher thread loads the document,
+    builds its print HTML and submits uncached renders to the pool. The pool uses the
+    'spawn' start method so renderer processes do not inherit the database engine or threads.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self._queue: "queue.Queue[int]" = queue.Queue(maxsize=max_queue)
+        self._start_lock = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}  # content hash -> render in progress
+        self._slots = threading.BoundedSemaphore(workers * 2)  # Renders submitted but not finished
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.metrics: Dict[str, Any] = {
+            'rendered': 0,
+            'stamped': 0,
+            'cache_hits': 0,
+            'failed': 0,
+            'last_error': None,
+            'last_render_ms': None,
+        }
+
+    def enqueue(self, document_id: int) -> bool:
+        """
+        Queue a document for rendering.
+
+        Returns:
+            False if the queue is full (the document can be re-queued later)
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(document_id)
+        except queue.Full:
+            logger.warning(f"PDF render queue is full, document {document_id} not queued")
+            return False
+        return True
+
+    def pending(self) -> int:
+        """Number of documents waiting for the dispatcher."""
+        return self._queue.qsize()
+
+    def stop(self) -> None:
+        """Stop the dispatcher and wait for submitted renders; queued documents are dropped."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._drop_queued()
+            try:
+                self._queue.put_nowait(None)  # Wake the dispatcher; it also polls _stopping
+            except queue.Full:
+                pass  # Refilled by a concurrent enqueue()
+            self._thread.join(timeout=10)
+            self._thread = None
+            self._drop_queued()  # A leftover wake-up would stop the next dispatcher
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._stopping.clear()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pdf-render-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _drop_queued(self) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                document_id = self._queue.get(timeout=STOP_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if document_id is None:
+                break
+            try:
+                self._dispatch(document_id)
+            except Exception as e:
+                self.metrics['failed'] += 1
+                self.metrics['last_error'] = str(e)
+                logger.error(f"PDF render of document {document_id} failed: {e}", exc_info=True)
+
+    def _dispatch(self, document_id: int) -> None:
+        db = SessionLocal()
+        try:
+            job = prepare_render_job(db, document_id)
+        finally:
+            db.close()
+        if job is None:
+            return
+
+        cache_path = cached_pdf_path(job['digest'])
+        if cache_path.exists():
+            self.metrics['cache_hits'] += 1
+            self._publish(job, cache_path)
+            return
+
+        # Only this thread submits, so the lookup and the insert below cannot race
+        with self._inflight_lock:
+            future = self._inflight.get(job['digest'])
+        if future is None:
+            self._slots.acquire()  # Back-pressure: at most workers * 2 renders in the pool
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            started_at = datetime.utcnow()
+            future = self._executor.submit(_render_pdf_file, job['html'], str(cache_path))
+            with self._inflight_lock:
+                self._inflight[job['digest']] = future
+            future.add_done_callback(lambda f: self._release(job['digest']))
+            future.add_done_callback(lambda f: self._record_render(f, started_at))
+        else:
+            self.metrics['cache_hits'] += 1
+        future.add_done_callback(lambda f: self._complete(f, job, cache_path))
+
+    def _release(self, digest: str) -> None:
+        with self._inflight_lock:
+            self._inflight.pop(digest, None)
+        self._slots.release()
+
+    def _record_render(self, future: Future, started_at: datetime) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.metrics['rendered'] += 1
+        self.metrics['last_render_ms'] = int((datetime.utcnow() - started_at).total_seconds() * 1000)
+
+    def _complete(self, future: Future, job: Dict[str, Any], cache_path: Path) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._fail(job, f"PDF render of document {job['document_id']} failed: {error}")
+            return
+        try:
+            self._publish(job, cache_path)
+        except Exception as e:
+            self._fail(job, f"Saving PDF of document {job['document_id']} failed: {e}")
+
+    def _publish(self, job: Dict[str, Any], cache_path: Path) -> None:
+        """Link the render to the document's path, or stamp the signatures onto a copy there."""
+        target = document_pdf_path(job['organization_id'], job['document_id'])
+        if not job['stamps']:
+            _link_or_copy(cache_path, target)
+            _store_pdf_path(job, target)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        future = self._executor.submit(stamp_signatures, str(cache_path), str(target), job['stamps'])
+        future.add_done_callback(lambda f: self._stamped(f, job, target))
+
+    def _stamped(self, future: Future, job: Dict[str, Any], target: Path) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._fail(job, f"Stamping signatures on document {job['document_id']} failed: {error}")
+            return
+        self.metrics['stamped'] += 1
+        try:
+            _store_pdf_path(job, target)
+        except Exception as e:
+            self._fail(job, f"Saving PDF of document {job['document_id']} failed: {e}")
+
+    def _fail(self, job: Dict[str, Any], message: str) -> None:
+        self.metrics['failed'] += 1
+        self.metrics['last_error'] = message
+        logger.error(message)
+
+
+# ========== Jobs ==========
+
+def prepare_render_job(db: Session, document_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Build the render job of a document: its merged print HTML, content hash and, once it is
+    signed, the signatures to stamp.
+
+    Returns:
+        None for documents without HTML (uploaded PDFs) or that no longer exist
+    """
+    document = db.get(Document, document_id)
+    if document is None or not document.rendered_content:
+        return None
+    lead = db.get(Lead, document.lead_id)
+    if lead is not None:
+        cache_key, immutable = document_cache_key(document)
+        body_html = replace_merge_fields(document.rendered_content, lead, cache_key, immutable)
+    else:
+        body_html = document.rendered_content
+    html = build_print_html(body_html)
+    return {
+        'document_id': document.id,
+        'organization_id': document.organization_id,
+        'html': html,
+        'digest': content_hash(html),
+        'stamps': collect_signature_stamps(db, document) if document.status == 'signed' else [],
+        'signatures_key': signature_set_key(db, document.id) if document.status == 'signed' else None,
+    }
+
+
+def _record_published_pdf(document: Document, job: Dict[str, Any], target: Path) -> None:
+    document.pdf_file_path = str(target)
+    document.pdf_render_digest = job['digest']
+    document.pdf_signatures_key = job['signatures_key']
+
+
+def _store_pdf_path(job: Dict[str, Any], target: Path) -> None:
+    """Store the published PDF on the document."""
+    db = SessionLocal()
+    try:
+        document = db.get(Document, job['document_id'])
+        if document is not None:
+            _record_published_pdf(document, job, target)
+            db.commit()
+    finally:
+        db.close()
+    logger.info(f"PDF for document {job['document_id']} saved to {target}")
+
+
+def render_document_pdf(db: Session, document_id: int) -> Optional[str]:
+    """
+    Render a document synchronously in the calling process (scripts and backfills).
+    Does not commit.
+
+    Returns:
+        Path of the PDF, or None if the document has no HTML to render
+    """
+    job = prepare_render_job(db, document_id)
+    if job is None:
+        return None
+    cache_path = cached_pdf_path(job['digest'])
+    if not cache_path.exists():
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _render_pdf_file(job['html'], str(cache_path))
+    target = document_pdf_path(job['organization_id'], job['document_id'])
+    if job['stamps']:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        stamp_signatures(str(cache_path), str(target), job['stamps'])
+    else:
+        _link_or_copy(cache_path, target)
+    _record_published_pdf(db.get(Document, document_id), job, target)
+    return str(target)
+
+
+pdf_render_queue = PdfRenderQueue(workers=PDF_RENDER_WORKERS, max_queue=PDF_RENDER_MAX_QUEUE)
+atexit.register(pdf_render_queue.stop)
+
+
+def enqueue_pdf_render(document_ids: List[int]) -> int:
+    """
+    Queue documents for PDF rendering. Call after the transaction that made them
+    renderable has committed.
+
+    Returns:
+        Number of documents queued
+    """
+    return sum(1 for document_id in document_ids if pdf_render_queue.enqueue(document_id))
+
+
+def get_pdf_render_metrics() -> Dict[str, Any]:
+    return {**pdf_render_queue.metrics, 'pending': pdf_render_queue.pending()}
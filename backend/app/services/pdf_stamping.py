@@ -0,0 +1,182 @@
+"""
+PDF signature stamping - overlays the signature images of a signed document onto its rendered PDF.
+
+Signature blocks are positioned by the editor in CSS pixels on a column of A4 pages
+(794 x 1123px each, stacked without gaps), so a block's page is y // 1123 and its position
+on the page is scaled to PDF points by the page width.
+
+Stamping runs in the PDF renderer processes (see pdf_rendering). Each process keeps the
+decoded signature images in a small LRU keyed by signature row, and within one PDF every
+image is embedded once and referenced from all of its blocks.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import SIGNATURE_IMAGE_CACHE_SIZE
+from app.models.document import Document
+from app.models.document_signature import DocumentSignature
+from app.models.document_template import DocumentTemplate
+
+logger = logging.getLogger(__name__)
+
+# Editor page geometry (see frontend GoogleDocsEditor: A4 at 96 DPI)
+EDITOR_PAGE_WIDTH_PX = 794
+EDITOR_PAGE_HEIGHT_PX = 1123
+
+# signature row key -> decoded fitz.Pixmap, per renderer process
+_signature_images: "OrderedDict[tuple, Any]" = OrderedDict()
+_cache_metrics = {'hits': 0, 'misses': 0}
+
+
+# ========== Collecting stamps ==========
+
+def signature_set_key(db: Session, document_id: int) -> str:
+    """
+    Key of the signatures that would be stamped on a document (SHA-256 of their IDs and
+    times) - compared with Document.pdf_signatures_key to tell whether the published PDF
+    carries all of them. Reads no signature images.
+    """
+    digest = hashlib.sha256()
+    for signature_id, signed_at in db.query(DocumentSignature.id, DocumentSignature.signed_at).filter(
+        DocumentSignature.document_id == document_id,
+        DocumentSignature.signature_block_id.isnot(None)
+    ).order_by(DocumentSignature.id):
+        digest.update(f"{signature_id}:{signed_at.isoformat() if signed_at else ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def collect_signature_stamps(db: Session, document: Document) -> List[Dict[str, Any]]:
+    """
+    Signature images to stamp on a document, one per signed block.
+
+    Blocks come from the document (or its template, like the signing page). When a block
+    was signed more than once, the latest signature wins.
+
+    Returns:
+        List of {signature_id, signed_at, data, x, y, width, height}; empty if nothing is signed
+    """
+    signature_blocks_json = document.signature_blocks
+    if not signature_blocks_json and document.template_id:
+        template = db.get(DocumentTemplate, document.template_id)
+        signature_blocks_json = template.signature_blocks if template else None
+    if not signature_blocks_json:
+        return []
+    try:
+        blocks = json.loads(signature_blocks_json)
+    except json.JSONDecodeError:
+        logger.warning(f"Document {document.id} has invalid signature_blocks, nothing stamped")
+        return []
+
+    latest: Dict[str, DocumentSignature] = {}
+    for signature in db.query(DocumentSignature).filter(
+        DocumentSignature.document_id == document.id,
+        DocumentSignature.signature_block_id.isnot(None)
+    ).order_by(DocumentSignature.signed_at, DocumentSignature.id):
+        latest[signature.signature_block_id] = signature
+
+    stamps = []
+    for block in blocks:
+        signature = latest.get(block.get('id'))
+        if signature is None:
+            continue
+        try:
+            geometry = {key: float(block[key]) for key in ('x', 'y', 'width', 'height')}
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Signature block {block.get('id')} of document {document.id} has no position")
+            continue
+        stamps.append({
+            'signature_id': signature.id,
+            'signed_at': signature.signed_at.isoformat() if signature.signed_at else None,
+            'data': signature.signature_data,
+            **geometry,
+        })
+    return stamps
+
+
+# ========== Stamping (renderer process) ==========
+
+def decode_signature_data(data: str) -> Optional[bytes]:
+    """Image bytes of a signature ('data:image/png;base64,...' or bare base64); None if not an image."""
+    if data.startswith('data:'):
+        header, _, data = data.partition(',')
+        if ';base64' not in header or not header[5:].startswith('image/'):
+            return None
+    try:
+        return base64.b64decode(data, validate=True)
+    except ValueError:
+        return None
+
+
+def _signature_pixmap(fitz, stamp: Dict[str, Any]):
+    """Decoded image of a signature row, from the per-process LRU when possible."""
+    key = (stamp['signature_id'], stamp['signed_at'])
+    pixmap = _signature_images.get(key)
+    if pixmap is not None:
+        _signature_images.move_to_end(key)
+        _cache_metrics['hits'] += 1
+        return pixmap
+
+    _cache_metrics['misses'] += 1
+    image = decode_signature_data(stamp['data'])
+    if image is None:
+        return None
+    pixmap = fitz.Pixmap(image)
+    _signature_images[key] = pixmap
+    if len(_signature_images) > SIGNATURE_IMAGE_CACHE_SIZE:
+        _signature_images.popitem(last=False)
+    return pixmap
+
+
+def stamp_signatures(source_path: str, output_path: str, stamps: List[Dict[str, Any]]) -> int:
+    """
+    Write a copy of a PDF with the signature images drawn into their blocks.
+
+    Writes to a temporary file first, so readers never see a half-written PDF.
+
+    Returns:
+        Number of blocks stamped
+    """
+    import fitz  # PyMuPDF
+
+    stamped = 0
+    pdf = fitz.open(source_path)
+    try:
+        xrefs: Dict[int, int] = {}  # signature_id -> image xref embedded in this PDF
+        for stamp in stamps:
+            page_index = min(int(stamp['y'] // EDITOR_PAGE_HEIGHT_PX), pdf.page_count - 1)
+            page = pdf[page_index]
+            scale = page.rect.width / EDITOR_PAGE_WIDTH_PX
+            top = stamp['y'] - page_index * EDITOR_PAGE_HEIGHT_PX
+            rect = fitz.Rect(
+                stamp['x'] * scale,
+                top * scale,
+                (stamp['x'] + stamp['width']) * scale,
+                (top + stamp['height']) * scale
+            )
+
+            xref = xrefs.get(stamp['signature_id'])
+            if xref is not None:
+                page.insert_image(rect, xref=xref, keep_proportion=True)
+            else:
+                pixmap = _signature_pixmap(fitz, stamp)
+                if pixmap is None:
+                    continue
+                xrefs[stamp['signature_id']] = page.insert_image(rect, pixmap=pixmap, keep_proportion=True)
+            stamped += 1
+
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        pdf.save(tmp_path, garbage=1, deflate=True)
+    finally:
+        pdf.close()
+    os.replace(tmp_path, output_path)
+    return stamped
+
+
+def get_signature_cache_metrics() -> Dict[str, int]:
+    """Signature image cache counters of the calling process."""
+    return {**_cache_metrics, 'size': len(_signature_images)}
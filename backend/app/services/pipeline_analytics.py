@@ -0,0 +1,237 @@
+"""
+Pipeline analytics - funnel and time-in-stage reporting from an incremental daily rollup.
+
+Every lead_stage_history row is one of:
+- a move: the lead entered the stage (its current stage changed). The stay in the previous
+  stage ends here; its duration is counted on the exit day of the previous stage.
+- a milestone: the stage was marked complete without moving the lead (see MODE_RECORD in
+  stage_transitions). It counts as reaching the stage but does not end the current stay.
+
+pipeline_stage_daily is kept current by an after_flush listener for ORM inserts and by
+record_stage_events() for bulk inserts, so reports only sum the rollup rows of the range.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, event, func, inspect, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from app.models.lead import Lead
+from app.models.lead_stage_history import LeadStageHistory
+from app.models.pipeline_stage_daily import PipelineStageDaily
+from app.models.stage_transition_rule import StageTransitionRule
+from app.services.stage_registry import list_stages
+
+logger = logging.getLogger(__name__)
+
+# Rollup counters, in the order they are accumulated
+_COUNTERS = ('entered_count', 'exited_count', 'time_in_stage_seconds')
+
+
+# ========== Rollup maintenance ==========
+
+def _upsert_deltas(connection: Connection, deltas: Dict[Tuple[int, date, int], List[float]]) -> None:
+    """Add counter deltas to their (organization, day, stage) rollup rows."""
+    if not deltas:
+        return
+    statement = sqlite_insert(PipelineStageDaily)
+    statement = statement.on_conflict_do_update(
+        index_elements=['organization_id', 'day', 'stage_id'],
+        set_={
+            counter: getattr(PipelineStageDaily, counter) + getattr(statement.excluded, counter)
+            for counter in _COUNTERS
+        }
+    )
+    connection.execute(statement, [
+        {
+            'organization_id': organization_id,
+            'day': day,
+            'stage_id': stage_id,
+            **dict(zip(_COUNTERS, values)),
+        }
+        for (organization_id, day, stage_id), values in deltas.items()
+    ])
+
+
+def record_stage_events(connection: Connection, events: List[Dict[str, Any]]) -> None:
+    """
+    Roll up newly inserted stage history rows.
+
+    Call this explicitly after bulk history INSERT statements, which bypass the ORM flush hook.
+
+    Args:
+        connection: Connection in the caller's transaction
+        events: One dict per history row with organization_id, lead_id, stage_id, changed_at
+            and from_stage_id (the stage the lead left; None for a new lead or a milestone)
+    """
+    if not events:
+        return
+    deltas: Dict[Tuple[int, date, int], List[float]] = defaultdict(lambda: [0, 0, 0.0])
+
+    # When did each moved lead enter the stage it is leaving?
+    moves = [e for e in events if e['from_stage_id'] is not None]
+    stay_starts = {}
+    if moves:
+        stay_starts = {
+            (row.lead_id, row.stage_id): row.entered_at
+            for row in connection.execute(
+                select(
+                    LeadStageHistory.lead_id,
+                    LeadStageHistory.stage_id,
+                    func.max(LeadStageHistory.changed_at).label('entered_at')
+                ).where(
+                    tuple_(LeadStageHistory.lead_id, LeadStageHistory.stage_id).in_(
+                        list({(e['lead_id'], e['from_stage_id']) for e in moves})
+                    )
+                ).group_by(LeadStageHistory.lead_id, LeadStageHistory.stage_id)
+            )
+        }
+
+    for e in events:
+        changed_at = e['changed_at']
+        deltas[(e['organization_id'], changed_at.date(), e['stage_id'])][0] += 1
+        if e['from_stage_id'] is None:
+            continue
+        exit_row = deltas[(e['organization_id'], changed_at.date(), e['from_stage_id'])]
+        exit_row[1] += 1
+        entered_at = stay_starts.get((e['lead_id'], e['from_stage_id']))
+        if entered_at is not None:
+            exit_row[2] += max((changed_at - entered_at).total_seconds(), 0.0)
+
+    _upsert_deltas(connection, deltas)
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_flushed_history(session, flush_context):
+    """Roll up stage history rows inserted through the ORM in this flush."""
+    new_rows = [obj for obj in session.new if isinstance(obj, LeadStageHistory)]
+    if not new_rows:
+        return
+
+    connection = session.connection()
+    events = []
+    for history in new_rows:
+        # changed_at is a server default, so it is not loaded yet - the flush happened just now
+        changed_at = inspect(history).dict.get('changed_at') or datetime.utcnow()
+        lead = session.identity_map.get(identity_key(Lead, history.lead_id))
+        if lead is not None:
+            organization_id, current_stage_id = lead.organization_id, lead.stage_id
+            stage_history = inspect(lead).attrs.stage_id.history
+            from_stage_id = stage_history.deleted[0] if stage_history.deleted else None
+        else:
+            row = connection.execute(
+                select(Lead.organization_id, Lead.stage_id).where(Lead.id == history.lead_id)
+            ).first()
+            if row is None:
+                continue
+            organization_id, current_stage_id = row
+            from_stage_id = None
+        if current_stage_id != history.stage_id or from_stage_id == history.stage_id:
+            from_stage_id = None  # Milestone, or no stay to close
+        events.append({
+            'organization_id': organization_id,
+            'lead_id': history.lead_id,
+            'stage_id': history.stage_id,
+            'from_stage_id': from_stage_id,
+            'changed_at': changed_at,
+        })
+
+    record_stage_events(connection, events)
+
+
+def rebuild_pipeline_rollup(connection: Connection, organization_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollup from lead_stage_history (backfill / repair).
+
+    History rows do not say whether they were a move or a milestone, so rows for the target
+    stage of an active 'record' transition rule are treated as milestones.
+
+    Returns:
+        Number of history rows rolled up
+    """
+    delete_statement = delete(PipelineStageDaily)
+    history_query = (
+        select(LeadStageHistory.lead_id, LeadStageHistory.stage_id, LeadStageHistory.changed_at, Lead.organization_id)
+        .join(Lead, Lead.id == LeadStageHistory.lead_id)
+        .order_by(LeadStageHistory.lead_id, LeadStageHistory.changed_at, LeadStageHistory.id)
+    )
+    if organization_id is not None:
+        delete_statement = delete_statement.where(PipelineStageDaily.organization_id == organization_id)
+        history_query = history_query.where(Lead.organization_id == organization_id)
+    connection.execute(delete_statement)
+
+    milestone_stage_ids = set(connection.execute(
+        select(StageTransitionRule.target_stage_id).where(
+            StageTransitionRule.mode == 'record',
+            StageTransitionRule.is_active.is_(True)
+        )
+    ).scalars().all())
+
+    deltas: Dict[Tuple[int, date, int], List[float]] = defaultdict(lambda: [0, 0, 0.0])
+    current: Dict[int, Tuple[int, datetime]] = {}  # lead_id -> (stage_id, entered_at)
+    count = 0
+    for row in connection.execute(history_query):
+        count += 1
+        day = row.changed_at.date()
+        deltas[(row.organization_id, day, row.stage_id)][0] += 1
+        stay = current.get(row.lead_id)
+        if stay is not None and (row.stage_id in milestone_stage_ids or row.stage_id == stay[0]):
+            continue
+        if stay is not None:
+            exit_row = deltas[(row.organization_id, day, stay[0])]
+            exit_row[1] += 1
+            exit_row[2] += max((row.changed_at - stay[1]).total_seconds(), 0.0)
+        current[row.lead_id] = (row.stage_id, row.changed_at)
+
+    _upsert_deltas(connection, deltas)
+    logger.info(f"Rebuilt pipeline rollup from {count} stage history rows")
+    return count
+
+
+# ========== Reporting ==========
+
+def get_pipeline_stats(db: Session, organization_id: int, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+    """
+    Funnel and time-in-stage figures for every stage over a date range (inclusive).
+
+    Returns:
+        One dict per stage in pipeline order with stage, entered_count, exited_count,
+        avg_time_in_stage_seconds (None when no stay ended in the range) and
+        conversion_rate (share of the stage's entries matched by entries of the next stage)
+    """
+    totals = {
+        row.stage_id: row
+        for row in db.execute(
+            select(
+                PipelineStageDaily.stage_id,
+                func.sum(PipelineStageDaily.entered_count).label('entered_count'),
+                func.sum(PipelineStageDaily.exited_count).label('exited_count'),
+                func.sum(PipelineStageDaily.time_in_stage_seconds).label('time_in_stage_seconds'),
+            ).where(
+                PipelineStageDaily.organization_id == organization_id,
+                PipelineStageDaily.day >= start_date,
+                PipelineStageDaily.day <= end_date
+            ).group_by(PipelineStageDaily.stage_id)
+        )
+    }
+
+    stats = []
+    for stage in list_stages(db):
+        row = totals.get(stage.id)
+        entered = int(row.entered_count) if row else 0
+        exited = int(row.exited_count) if row else 0
+        seconds = float(row.time_in_stage_seconds) if row else 0.0
+        stats.append({
+            'stage': stage,
+            'entered_count': entered,
+            'exited_count': exited,
+            'avg_time_in_stage_seconds': seconds / exited if exited else None,
+            'conversion_rate': None,
+        })
+    for current, following in zip(stats, stats[1:]):
+        if current['entered_count']:
+            current['conversion_rate'] = following['entered_count'] / current['entered_count']
+    return stats
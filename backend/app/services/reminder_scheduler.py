@@ -0,0 +1,151 @@
+"""
+Reminder scheduler - runs the due-reminder scan periodically inside one elected worker process.
+
+Every uvicorn worker calls start_reminder_scheduler() on startup, but only the worker that
+acquires the scheduler lock file actually runs jobs. Leases on the reminder rows still guard
+against double-sending if two schedulers ever overlap (e.g. during a rolling restart).
+"""
+import logging
+import os
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.core.config import (
+    SQLITE_DB_PATH,
+    REMINDER_SCHEDULER_ENABLED,
+    REMINDER_SCAN_INTERVAL_SECONDS,
+)
+from app.core.database import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-process dev server, no election needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_scheduler = None
+_lock_file = None
+
+# Metrics for the last scan (exposed via /health/reminders)
+_metrics: Dict[str, Any] = {
+    'is_leader': False,
+    'worker_id': WORKER_ID,
+    'last_run_started_at': None,
+    'last_run_finished_at': None,
+    'last_run_duration_ms': None,
+    'last_run_processed': 0,
+    'last_run_failed': 0,
+    'last_run_lag_seconds': None,
+    'last_error': None,
+    'total_processed': 0,
+    'total_failed': 0,
+}
+
+
+def _acquire_leader_lock() -> bool:
+    """Try to become the scheduler leader by taking an exclusive lock next to the database file."""
+    global _lock_file
+
+    if fcntl is None:
+        return True
+
+    lock_path = Path(SQLITE_DB_PATH).parent / "reminder_scheduler.lock"
+    lock_file = open(lock_path, "w")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    lock_file.write(WORKER_ID)
+    lock_file.flush()
+    _lock_file = lock_file  # Keep the file open - the lock lives as long as the process
+    return True
+
+
+def run_reminder_scan() -> None:
+    """Scheduler job: send all due reminders and record run metrics."""
+    from app.services.reminders import process_due_reminders
+
+    started_at = datetime.utcnow()
+    _metrics['last_run_started_at'] = started_at.isoformat()
+
+    db = SessionLocal()
+    try:
+        result = process_due_reminders(db, WORKER_ID, now=started_at)
+        _metrics['last_run_processed'] = result['processed']
+        _metrics['last_run_failed'] = result['failed']
+        _metrics['last_run_lag_seconds'] = result['max_lag_seconds']
+        _metrics['total_processed'] += result['processed']
+        _metrics['total_failed'] += result['failed']
+        _metrics['last_error'] = None
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Reminder scan failed: {e}", exc_info=True)
+        _metrics['last_error'] = str(e)
+    finally:
+        db.close()
+        finished_at = datetime.utcnow()
+        _metrics['last_run_finished_at'] = finished_at.isoformat()
+        _metrics['last_run_duration_ms'] = int((finished_at - started_at).total_seconds() * 1000)
+
+
+def start_reminder_scheduler() -> bool:
+    """
+    Start the background reminder scheduler if this process wins the leader election.
+
+    Returns:
+        True if the scheduler was started in this process
+    """
+    global _scheduler
+
+    if not REMINDER_SCHEDULER_ENABLED or _scheduler is not None:
+        return False
+
+    if not _acquire_leader_lock():
+        logger.info(f"Reminder scheduler not started in {WORKER_ID}: another worker is the leader")
+        return False
+
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    _scheduler = BackgroundScheduler(timezone="UTC")
+    _scheduler.add_job(
+        run_reminder_scan,
+        "interval",
+        seconds=REMINDER_SCAN_INTERVAL_SECONDS,
+        id="reminder_scan",
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.utcnow(),
+    )
+    _scheduler.start()
+    _metrics['is_leader'] = True
+    logger.info(f"Reminder scheduler started in {WORKER_ID}")
+    return True
+
+
+def stop_reminder_scheduler() -> None:
+    """Stop the scheduler and release the leader lock."""
+    global _scheduler, _lock_file
+
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
+    _metrics['is_leader'] = False
+
+
+def get_scheduler_metrics() -> Dict[str, Any]:
+    """Return a snapshot of the scheduler metrics."""
+    return dict(_metrics)
+
+
+def get_scheduler() -> Optional[Any]:
+    """Return the running APScheduler instance (only set in the leader worker)."""
+    return _scheduler
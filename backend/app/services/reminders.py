@@ -0,0 +1,234 @@
+"""
+Reminder service - keeps lead reminders in sync with lead reminder dates and sends due reminders
+"""
+import logging
+import uuid
+from datetime import datetime, date, time, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
+from app.core.config import (
+    REMINDER_BATCH_SIZE,
+    REMINDER_LEASE_SECONDS,
+    REMINDER_SEND_HOUR_UTC,
+    REMINDER_MAX_ATTEMPTS,
+    FRONTEND_BASE_URL,
+)
+from app.models.lead import Lead
+from app.models.lead_reminder import LeadReminder
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Reminder kind -> Lead date field that schedules it
+REMINDER_DATE_FIELDS: Dict[str, str] = {
+    'message3': 'reminder_message3_date',
+    'message4': 'reminder_message4_date',
+    'message5': 'reminder_message5_date',
+    'message6': 'reminder_message6_date',
+    'check_call': 'check_call_reminder',
+}
+
+# Hebrew labels used in reminder emails
+REMINDER_LABELS: Dict[str, str] = {
+    'message3': 'שליחת הודעה 3 (תזכורת)',
+    'message4': 'שליחת הודעה 4 (תזכורת)',
+    'message5': 'שליחת הודעה 5 (תזכורת)',
+    'message6': 'שליחת הודעה 6 (תזכורת)',
+    'check_call': 'תזכורת לבדיקה/שיחה',
+}
+
+# Delay before a failed send is retried
+RETRY_DELAY = timedelta(minutes=15)
+
+
+def reminder_due_at(reminder_date: date) -> datetime:
+    """Convert a lead reminder date into the moment the reminder becomes due."""
+    return datetime.combine(reminder_date, time(hour=REMINDER_SEND_HOUR_UTC))
+
+
+def sync_lead_reminders(db: Session, lead: Lead) -> None:
+    """
+    Create, reschedule or remove the lead's reminders to match its reminder date fields.
+
+    A reminder whose date changes is rescheduled, with its failed attempts reset (and
+    re-armed if it was already sent).
+    Clearing a date or deleting the lead removes the pending reminder.
+    Does not commit - the caller's transaction owns the change.
+    """
+    existing = {
+        reminder.kind: reminder
+        for reminder in db.query(LeadReminder).filter(LeadReminder.lead_id == lead.id).all()
+    }
+
+    for kind, field in REMINDER_DATE_FIELDS.items():
+        reminder_date = getattr(lead, field, None)
+        if isinstance(reminder_date, str):
+            try:
+                reminder_date = date.fromisoformat(reminder_date[:10])
+            except ValueError:
+                reminder_date = None
+        reminder = existing.get(kind)
+
+        if reminder_date is None or lead.deleted_at is not None:
+            if reminder and reminder.status == 'pending':
+                db.delete(reminder)
+            continue
+
+        due_at = reminder_due_at(reminder_date)
+        if reminder is None:
+            db.add(LeadReminder(
+                organization_id=lead.organization_id,
+                lead_id=lead.id,
+                kind=kind,
+                due_at=due_at,
+                next_due_at=due_at,
+                status='pending',
+                attempts=0,
+            ))
+        elif reminder.status == 'pending':
+            if reminder.due_at != due_at:
+                # Date moved - drop any retry schedule meant for the old date
+                reminder.due_at = due_at
+                reminder.next_due_at = due_at
+                reminder.attempts = 0
+                reminder.last_error = None
+        elif reminder.due_at != due_at and (reminder.sent_at is None or reminder.sent_at < due_at):
+            # Date moved after the reminder was sent (or given up on) - arm it again
+            reminder.due_at = due_at
+            reminder.next_due_at = due_at
+            reminder.status = 'pending'
+            reminder.attempts = 0
+            reminder.last_error = None
+            reminder.lease_owner = None
+            reminder.lease_expires_at = None
+
+    db.flush()
+
+
+def claim_due_reminders(
+    db: Session,
+    worker_id: str,
+    now: Optional[datetime] = None,
+    batch_size: int = REMINDER_BATCH_SIZE
+) -> List[LeadReminder]:
+    """
+    Claim up to batch_size due reminders for this worker by taking a lease on them.
+
+    Uses the next_due_at index to find candidates. Reminders leased by another worker
+    are skipped until the lease expires, so a crashed run is retried but a live one is
+    never double-sent. Commits the claim so other workers see it immediately.
+    """
+    now = now or datetime.utcnow()
+    lease_token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+
+    due_ids = select(LeadReminder.id).where(
+        LeadReminder.next_due_at <= now,
+        or_(LeadReminder.lease_expires_at.is_(None), LeadReminder.lease_expires_at < now)
+    ).order_by(LeadReminder.next_due_at).limit(batch_size)
+
+    db.execute(
+        update(LeadReminder)
+        .where(LeadReminder.id.in_(due_ids.scalar_subquery()))
+        .values(lease_owner=lease_token, lease_expires_at=now + timedelta(seconds=REMINDER_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return db.query(LeadReminder).filter(
+        LeadReminder.lease_owner == lease_token
+    ).order_by(LeadReminder.next_due_at).all()
+
+
+def send_reminder(db: Session, reminder: LeadReminder) -> bool:
+    """
+    Send a reminder email to the lead's assigned user (or its creator).
+
+    Returns:
+        True if the email was sent, False otherwise
+    """
+    from app.services.email import send_email
+
+    lead = db.query(Lead).filter(Lead.id == reminder.lead_id).first()
+    if not lead or lead.deleted_at is not None:
+        return True  # Nothing to remind about anymore - treat as done
+
+    recipient_id = lead.assigned_user_id or lead.created_by_user_id
+    recipient = db.query(User).filter(User.id == recipient_id).first()
+    if not recipient or not recipient.email:
+        reminder.last_error = "No recipient for reminder"
+        return False
+
+    label = REMINDER_LABELS.get(reminder.kind, reminder.kind)
+    lead_url = f"{FRONTEND_BASE_URL.rstrip('/')}/leads/{lead.id}"
+    subject = f"תזכורת: {label} - {lead.full_name}"
+    html_body = f"""
+    <div dir="rtl" style="font-family: Arial, sans-serif;">
+        <p>שלום {recipient.full_name or ''},</p>
+        <p>הגיע מועד <strong>{label}</strong> עבור הליד <strong>{lead.full_name}</strong>.</p>
+        <p><a href="{lead_url}">לפתיחת הליד</a></p>
+    </div>
+    """
+    text_body = f"{label} - {lead.full_name}\n{lead_url}"
+
+    if not send_email(recipient.email, subject, html_body, text_body):
+        reminder.last_error = "Email sending failed"
+        return False
+    return True
+
+
+def process_due_reminders(db: Session, worker_id: str, now: Optional[datetime] = None) -> Dict[str, object]:
+    """
+    Claim and send due reminders batch by batch until none are left.
+
+    Returns:
+        Dictionary with 'processed', 'failed' and 'max_lag_seconds' (how late the
+        most overdue reminder of this run was picked up)
+    """
+    now = now or datetime.utcnow()
+    processed = 0
+    failed = 0
+    max_lag_seconds = 0.0
+    seen_ids = set()
+
+    while True:
+        batch = [r for r in claim_due_reminders(db, worker_id, now=now) if r.id not in seen_ids]
+        if not batch:
+            break
+
+        for reminder in batch:
+            seen_ids.add(reminder.id)
+            max_lag_seconds = max(max_lag_seconds, (now - reminder.next_due_at).total_seconds())
+            reminder.attempts = (reminder.attempts or 0) + 1
+            try:
+                sent = send_reminder(db, reminder)
+            except Exception as e:
+                logger.error(f"Failed to send reminder {reminder.id}: {e}", exc_info=True)
+                reminder.last_error = str(e)[:500]
+                sent = False
+
+            if sent:
+                reminder.status = 'sent'
+                reminder.sent_at = datetime.utcnow()
+                reminder.next_due_at = None
+                reminder.last_error = None
+                processed += 1
+            else:
+                failed += 1
+                if reminder.attempts >= REMINDER_MAX_ATTEMPTS:
+                    reminder.status = 'failed'
+                    reminder.next_due_at = None
+                else:
+                    reminder.next_due_at = now + RETRY_DELAY
+
+            reminder.lease_owner = None
+            reminder.lease_expires_at = None
+
+        # Release each batch as soon as it is done
+        db.commit()
+
+    return {
+        'processed': processed,
+        'failed': failed,
+        'max_lag_seconds': max_lag_seconds,
+    }
@@ -0,0 +1,184 @@
+"""
+Stage registry - process-wide, in-memory index of lead stages by id, name and order.
+
+Stages are a small global table read on nearly every lead and document request, so each
+worker keeps an immutable snapshot and resolves stages from memory.
+
+Invalidation:
+- Any ORM insert/update/delete of a LeadStage bumps the 'lead_stage_registry_version'
+  platform setting in the same transaction and drops this worker's snapshot on commit.
+- Other workers compare their snapshot's version with that setting at most every
+  STAGE_REGISTRY_CHECK_SECONDS and reload when it changed.
+Stage changes made with raw SQL (migrations) are picked up at the next startup, or
+immediately by calling bump_stage_registry_version().
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, Text, cast, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.config import STAGE_REGISTRY_CHECK_SECONDS
+from app.models.lead_stage import LeadStage
+from app.models.platform_settings import PlatformSettings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'lead_stage_registry_version'
+
+
+@dataclass(frozen=True)
+class StageInfo:
+    """Immutable snapshot of a LeadStage row (safe to share between requests and threads)."""
+    id: int
+    name: str
+    order: int
+    color: Optional[str]
+    is_default: bool
+    is_archived: bool
+
+
+class _Snapshot:
+    def __init__(self, stages: List[StageInfo], version: Optional[str]):
+        self.version = version
+        self.checked_at = time.monotonic()
+        # Sorted by (order, id) so lookups by order and the default fallback are deterministic
+        self.ordered = sorted(stages, key=lambda stage: (stage.order, stage.id))
+        self.by_id: Dict[int, StageInfo] = {stage.id: stage for stage in self.ordered}
+        self.by_name: Dict[str, StageInfo] = {stage.name: stage for stage in self.ordered}
+        self.by_order: Dict[int, StageInfo] = {}
+        for stage in self.ordered:
+            self.by_order.setdefault(stage.order, stage)
+        self.default = next((stage for stage in self.ordered if stage.is_default), None) or (
+            self.ordered[0] if self.ordered else None
+        )
+
+
+class StageRegistry:
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """(Re)load all stages from the database."""
+        version = read_registry_version(db)
+        stages = [
+            StageInfo(
+                id=stage.id,
+                name=stage.name,
+                order=stage.order,
+                color=stage.color,
+                is_default=stage.is_default,
+                is_archived=stage.is_archived,
+            )
+            for stage in db.execute(select(LeadStage)).scalars().all()
+        ]
+        with self._lock:
+            self._snapshot = _Snapshot(stages, version)
+        logger.debug(f"Stage registry loaded {len(stages)} stages (version {version})")
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next lookup reloads it."""
+        with self._lock:
+            self._snapshot = None
+
+    def snapshot(self, db: Session) -> _Snapshot:
+        """Current snapshot, reloaded if missing or changed by another worker."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.load(db)
+            return self._snapshot
+        if time.monotonic() - snapshot.checked_at >= self.check_interval:
+            if read_registry_version(db) != snapshot.version:
+                self.load(db)
+                return self._snapshot
+            snapshot.checked_at = time.monotonic()
+        return snapshot
+
+
+def read_registry_version(db: Session, key: str = VERSION_KEY) -> Optional[str]:
+    """Current value of a registry version setting (None until first bumped)."""
+    return db.execute(select(PlatformSettings.value).where(PlatformSettings.key == key)).scalar()
+
+
+stage_registry = StageRegistry(check_interval=STAGE_REGISTRY_CHECK_SECONDS)
+
+
+# ========== Lookups ==========
+
+def load_stage_registry(db: Session) -> None:
+    """Load the registry (called at startup)."""
+    stage_registry.load(db)
+
+
+def get_stage(db: Session, stage_id: Optional[int]) -> Optional[StageInfo]:
+    """Get a stage by id."""
+    if stage_id is None:
+        return None
+    return stage_registry.snapshot(db).by_id.get(stage_id)
+
+
+def get_stage_by_name(db: Session, name: str) -> Optional[StageInfo]:
+    """Get a stage by its exact name."""
+    return stage_registry.snapshot(db).by_name.get(name)
+
+
+def get_stage_by_order(db: Session, order: int) -> Optional[StageInfo]:
+    """Get the stage with the given order number (lowest id if several share it)."""
+    return stage_registry.snapshot(db).by_order.get(order)
+
+
+def find_stage_by_name(db: Session, pattern: str) -> Optional[StageInfo]:
+    """Get the first stage (by order) whose name contains the pattern."""
+    return next((stage for stage in stage_registry.snapshot(db).ordered if pattern in stage.name), None)
+
+
+def get_default_stage(db: Session) -> Optional[StageInfo]:
+    """Get the stage new leads start in (the is_default stage, else the first by order)."""
+    return stage_registry.snapshot(db).default
+
+
+def list_stages(db: Session) -> List[StageInfo]:
+    """All stages sorted by order."""
+    return list(stage_registry.snapshot(db).ordered)
+
+
+# ========== Invalidation ==========
+
+def bump_registry_version(connection, key: str) -> None:
+    """Increment a registry version setting (runs in the caller's transaction)."""
+    statement = sqlite_insert(PlatformSettings).values(key=key, value='1')
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=['key'],
+        set_={'value': cast(cast(PlatformSettings.value, Integer) + 1, Text)}
+    ))
+
+
+def bump_stage_registry_version(connection) -> None:
+    """Mark the stages as changed for every worker (runs in the caller's transaction)."""
+    bump_registry_version(connection, VERSION_KEY)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_version_on_stage_change(session, flush_context):
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, LeadStage)
+    ]
+    if changed:
+        bump_stage_registry_version(session.connection())
+        session.info['stage_registry_changed'] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop('stage_registry_changed', False):
+        stage_registry.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_stage_change(session, previous_transaction):
+    session.info.pop('stage_registry_changed', None)
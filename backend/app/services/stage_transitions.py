@@ -0,0 +1,337 @@
+"""
+Stage transitions - declarative lead stage changes triggered by document events.
+
+Rules live in stage_transition_rules (event x contract_type/document_type -> target stage).
+Each worker compiles the active rules into a dict keyed by (event, contract_type, document_type)
+and keeps it current the same way the stage registry does: ORM changes to a rule bump the
+'stage_transition_rules_version' platform setting, and other workers reload at most
+STAGE_REGISTRY_CHECK_SECONDS later.
+
+Applying a rule moves a whole batch of leads with one UPDATE statement and writes all of their
+history rows with one INSERT. Nothing here commits - the caller owns the transaction.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from app.core.config import STAGE_REGISTRY_CHECK_SECONDS
+from app.models.lead import Lead
+from app.models.lead_stage_history import LeadStageHistory
+from app.models.stage_transition_rule import StageTransitionRule
+from app.services.lead_change_log import record_lead_changes, serialize_value
+from app.services.lead_segments import refresh_lead_segments
+from app.services.pipeline_analytics import record_stage_events
+from app.services.stage_registry import (
+    bump_registry_version,
+    get_stage,
+    list_stages,
+    read_registry_version,
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'stage_transition_rules_version'
+
+# Events raised by the document workflow
+EVENT_DOCUMENT_READY = 'document_ready'  # Generated contract marked ready
+EVENT_DOCUMENT_SIGNED = 'document_signed'  # Contract fully signed
+EVENT_DOCUMENT_UPLOADED = 'document_uploaded'  # Verified document uploaded to the lead
+EVENTS = (EVENT_DOCUMENT_READY, EVENT_DOCUMENT_SIGNED, EVENT_DOCUMENT_UPLOADED)
+
+# What a rule does with the target stage
+MODE_ADVANCE = 'advance'  # Move leads forward to the target stage (never backwards)
+MODE_RECORD = 'record'  # Mark the stage complete in history without moving the lead
+MODES = (MODE_ADVANCE, MODE_RECORD)
+
+
+@dataclass(frozen=True)
+class TransitionRule:
+    """Immutable snapshot of an active StageTransitionRule row."""
+    id: int
+    event: str
+    contract_type: Optional[str]
+    document_type: Optional[str]
+    target_stage_id: int
+    mode: str
+
+
+class _CompiledRules:
+    def __init__(self, rules: List[TransitionRule], version: Optional[str]):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.by_key: Dict[Tuple[str, Optional[str], Optional[str]], TransitionRule] = {
+            (rule.event, rule.contract_type, rule.document_type): rule for rule in rules
+        }
+
+
+class TransitionRuleCache:
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._compiled: Optional[_CompiledRules] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """(Re)compile the active rules from the database."""
+        version = read_registry_version(db, VERSION_KEY)
+        rules = [
+            TransitionRule(
+                id=rule.id,
+                event=rule.event,
+                contract_type=rule.contract_type,
+                document_type=rule.document_type,
+                target_stage_id=rule.target_stage_id,
+                mode=rule.mode,
+            )
+            for rule in db.execute(
+                select(StageTransitionRule).where(StageTransitionRule.is_active.is_(True))
+            ).scalars().all()
+        ]
+        with self._lock:
+            self._compiled = _CompiledRules(rules, version)
+        logger.debug(f"Compiled {len(rules)} stage transition rules (version {version})")
+
+    def invalidate(self) -> None:
+        """Drop the compiled rules; the next lookup reloads them."""
+        with self._lock:
+            self._compiled = None
+
+    def compiled(self, db: Session) -> _CompiledRules:
+        """Current compiled rules, reloaded if missing or changed by another worker."""
+        compiled = self._compiled
+        if compiled is None:
+            self.load(db)
+            return self._compiled
+        if time.monotonic() - compiled.checked_at >= self.check_interval:
+            if read_registry_version(db, VERSION_KEY) != compiled.version:
+                self.load(db)
+                return self._compiled
+            compiled.checked_at = time.monotonic()
+        return compiled
+
+
+transition_rules = TransitionRuleCache(check_interval=STAGE_REGISTRY_CHECK_SECONDS)
+
+
+# ========== Rules ==========
+
+def resolve_transition_rule(
+    db: Session,
+    event_name: str,
+    contract_type: Optional[str] = None,
+    document_type: Optional[str] = None
+) -> Optional[TransitionRule]:
+    """
+    Find the rule for an event. The most specific rule wins; a NULL contract_type or
+    document_type on a rule matches any value.
+    """
+    by_key = transition_rules.compiled(db).by_key
+    for key in (
+        (event_name, contract_type, document_type),
+        (event_name, contract_type, None),
+        (event_name, None, document_type),
+        (event_name, None, None),
+    ):
+        rule = by_key.get(key)
+        if rule:
+            return rule
+    return None
+
+
+def list_transition_rules(db: Session) -> List[TransitionRule]:
+    """All active rules, ordered by event."""
+    rules = transition_rules.compiled(db).by_key.values()
+    return sorted(rules, key=lambda rule: (rule.event, rule.contract_type or '', rule.document_type or '', rule.id))
+
+
+# ========== Applying transitions ==========
+
+def apply_stage_transition(
+    db: Session,
+    event_name: str,
+    lead_ids: Iterable[int],
+    changed_by_user_id: int,
+    contract_type: Optional[str] = None,
+    document_type: Optional[str] = None
+) -> List[int]:
+    """
+    Apply the rule matching an event to a batch of leads.
+
+    Args:
+        db: Database session
+        event_name: One of EVENTS
+        lead_ids: Leads the event happened to
+        changed_by_user_id: User recorded on the stage history rows
+        contract_type: Document contract type ('buyer', 'seller', 'lawyer')
+        document_type: Uploaded document type ID
+
+    Returns:
+        IDs of the leads that got a new stage history row (empty if no rule matched)
+    """
+    rule = resolve_transition_rule(db, event_name, contract_type, document_type)
+    if not rule:
+        return []
+    return move_leads_to_stage(db, lead_ids, rule.target_stage_id, changed_by_user_id, mode=rule.mode)
+
+
+def move_leads_to_stage(
+    db: Session,
+    lead_ids: Iterable[int],
+    stage_id: int,
+    changed_by_user_id: int,
+    mode: str = MODE_ADVANCE
+) -> List[int]:
+    """
+    Move leads to a stage (MODE_ADVANCE) or mark the stage complete for them (MODE_RECORD).
+
+    MODE_ADVANCE only moves leads whose current stage comes before the target.
+    MODE_RECORD adds a history row only for leads that never reached the stage.
+
+    Both modes are one UPDATE (which also bumps version/updated_at, as the ORM would)
+    plus one multi-row history INSERT. Segment membership, the change log and the
+    pipeline rollup are kept in sync explicitly, since bulk statements bypass the flush hooks.
+
+    Returns:
+        IDs of the leads that got a new stage history row
+    """
+    if mode not in MODES:
+        raise ValueError(f"Invalid transition mode: {mode}. Must be one of: {', '.join(MODES)}")
+
+    lead_ids = list({lead_id for lead_id in lead_ids if lead_id is not None})
+    target_stage = get_stage(db, stage_id)
+    if not lead_ids or not target_stage:
+        return []
+
+    # Pending ORM changes must reach the database before the bulk statements read the leads
+    db.flush()
+    connection = db.connection()
+    now = datetime.utcnow()
+
+    if mode == MODE_ADVANCE:
+        earlier_stage_ids = [stage.id for stage in list_stages(db) if stage.order < target_stage.order]
+        if not earlier_stage_ids:
+            return []
+        previous = {
+            row.id: row
+            for row in connection.execute(
+                select(Lead.id, Lead.organization_id, Lead.stage_id).where(
+                    Lead.id.in_(lead_ids),
+                    Lead.stage_id.in_(earlier_stage_ids)
+                )
+            )
+        }
+        if not previous:
+            return []
+        moved_ids = connection.execute(
+            update(Lead)
+            .where(Lead.id.in_(list(previous)), Lead.stage_id.in_(earlier_stage_ids))
+            .values(stage_id=target_stage.id, version=Lead.version + 1, updated_at=now)
+            .returning(Lead.id)
+        ).scalars().all()
+        stage_events = [
+            {
+                'organization_id': previous[lead_id].organization_id,
+                'lead_id': lead_id,
+                'stage_id': target_stage.id,
+                'from_stage_id': previous[lead_id].stage_id,
+                'changed_at': now,
+            }
+            for lead_id in moved_ids
+        ]
+        record_lead_changes(db, [
+            {
+                'organization_id': previous[lead_id].organization_id,
+                'lead_id': lead_id,
+                'field_name': 'stage_id',
+                'old_value': serialize_value(previous[lead_id].stage_id),
+                'new_value': serialize_value(target_stage.id),
+                'changed_by_user_id': changed_by_user_id,
+                'changed_at': now,
+            }
+            for lead_id in moved_ids
+        ])
+    else:
+        reached_ids = set(connection.execute(
+            select(LeadStageHistory.lead_id).where(
+                LeadStageHistory.lead_id.in_(lead_ids),
+                LeadStageHistory.stage_id == target_stage.id
+            ).distinct()
+        ).scalars().all())
+        missing_ids = [lead_id for lead_id in lead_ids if lead_id not in reached_ids]
+        if not missing_ids:
+            return []
+        # Touch the leads so their version (and ETag) reflects the new history entry
+        touched = connection.execute(
+            update(Lead)
+            .where(Lead.id.in_(missing_ids))
+            .values(version=Lead.version + 1, updated_at=now)
+            .returning(Lead.id, Lead.organization_id)
+        ).all()
+        moved_ids = [row.id for row in touched]
+        stage_events = [
+            {
+                'organization_id': row.organization_id,
+                'lead_id': row.id,
+                'stage_id': target_stage.id,
+                'from_stage_id': None,  # Milestone - the lead stays where it is
+                'changed_at': now,
+            }
+            for row in touched
+        ]
+
+    if not moved_ids:
+        return []
+
+    connection.execute(insert(LeadStageHistory).values([
+        {
+            'lead_id': lead_id,
+            'stage_id': target_stage.id,
+            'changed_by_user_id': changed_by_user_id,
+            'changed_at': now,
+        }
+        for lead_id in moved_ids
+    ]))
+    record_stage_events(connection, stage_events)
+    refresh_lead_segments(connection, moved_ids)
+    _expire_loaded_leads(db, moved_ids)
+
+    logger.info(
+        f"Stage transition ({mode}) to '{target_stage.name}' applied to {len(moved_ids)} of {len(lead_ids)} leads"
+    )
+    return list(moved_ids)
+
+
+def _expire_loaded_leads(db: Session, lead_ids: List[int]) -> None:
+    """Expire leads already in the session so they reload the new stage and version."""
+    for lead_id in lead_ids:
+        lead = db.identity_map.get(identity_key(Lead, lead_id))
+        if lead is not None:
+            db.expire(lead)
+
+
+# ========== Invalidation ==========
+
+@event.listens_for(Session, "after_flush")
+def _bump_version_on_rule_change(session, flush_context):
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, StageTransitionRule)
+    ]
+    if changed:
+        bump_registry_version(session.connection(), VERSION_KEY)
+        session.info['stage_transition_rules_changed'] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop('stage_transition_rules_changed', False):
+        transition_rules.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rule_change(session, previous_transaction):
+    session.info.pop('stage_transition_rules_changed', None)
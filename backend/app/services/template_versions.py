@@ -0,0 +1,89 @@
+"""
+Template versions service - immutable snapshots of template content.
+
+Saving a template whose content or signature blocks changed records a new
+DocumentTemplateVersion pointing at the (deduplicated) HTML blob; saving it unchanged does
+not. Documents are generated from, and pinned to, the template's current version. Because
+a version never changes, its compiled merge-field template is cached by version id alone
+(see version_cache_key) and never needs invalidation.
+"""
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from app.models.document_template import DocumentTemplate
+from app.models.document_template_version import DocumentTemplateVersion
+from app.models.html_blob import HtmlBlob, point_at_html
+from app.services.document_generation import validate_merge_fields, version_cache_key
+
+
+def current_template_version(db: Session, template_id: int) -> Optional[DocumentTemplateVersion]:
+    """Latest version of a template, or None if none was recorded yet."""
+    return db.query(DocumentTemplateVersion).filter(
+        DocumentTemplateVersion.template_id == template_id
+    ).order_by(DocumentTemplateVersion.version_number.desc()).first()
+
+
+def record_template_version(db: Session, template: DocumentTemplate, created_by_user_id: int) -> DocumentTemplateVersion:
+    """
+    Snapshot a template's current content and signature blocks as a new version, unless the
+    latest version already holds exactly that. Does not commit.
+
+    Args:
+        db: Database session
+        template: Template being saved (flushed here first if it is new)
+        created_by_user_id: User saving the template
+
+    Returns:
+        The new version, or the latest one if nothing changed
+    """
+    if template.id is None:
+        db.flush()
+    latest = current_template_version(db, template.id)
+    if latest is not None and latest.content_sha256 == template.content_sha256 \
+            and latest.signature_blocks == template.signature_blocks:
+        return latest
+
+    version = DocumentTemplateVersion(
+        template_id=template.id,
+        version_number=latest.version_number + 1 if latest is not None else 1,
+        signature_blocks=template.signature_blocks,
+        field_count=template.field_count,
+        created_by_user_id=created_by_user_id,
+    )
+    point_at_html(version, template.content)  # Same blob as the template - no new copy
+    db.add(version)
+    return version
+
+
+def current_version_for_generation(db: Session, template: DocumentTemplate, created_by_user_id: int) -> DocumentTemplateVersion:
+    """
+    Version new documents are generated from and pinned to, with its merge fields validated
+    (compiled once per version and cached). Does not commit.
+
+    Raises:
+        ValueError: If the content references unknown merge fields
+    """
+    version = record_template_version(db, template, created_by_user_id)
+    if version.id is None:
+        db.flush()
+    validation = validate_merge_fields(version.content, cache_key=version_cache_key(version.id), immutable=True)
+    if not validation['valid']:
+        raise ValueError(f"Invalid merge fields: {', '.join(validation['missing_fields'])}")
+    return version
+
+
+def list_template_versions(db: Session, template_id: int) -> List[DocumentTemplateVersion]:
+    """All versions of a template, newest first, with creators and content sizes (no HTML)."""
+    return db.query(DocumentTemplateVersion).options(
+        joinedload(DocumentTemplateVersion.created_by_user),
+        joinedload(DocumentTemplateVersion.content_blob).load_only(HtmlBlob.size_bytes),
+    ).filter(
+        DocumentTemplateVersion.template_id == template_id
+    ).order_by(DocumentTemplateVersion.version_number.desc()).all()
+
+
+def get_template_version(db: Session, template_id: int, version_number: int) -> Optional[DocumentTemplateVersion]:
+    """One version of a template, or None."""
+    return db.query(DocumentTemplateVersion).filter(
+        DocumentTemplateVersion.template_id == template_id,
+        DocumentTemplateVersion.version_number == version_number
+    ).first()
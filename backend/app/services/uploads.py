@@ -0,0 +1,175 @@
+"""
+Uploads service - the content-addressed store for uploaded PDFs.
+
+Files are stored once per content at UPLOAD_STORAGE_DIR/ab/cd/<sha256> (the first two
+byte pairs of the hash shard the directories, so none grows past a few hundred entries);
+re-uploading a stored file reuses it. Documents reference the file through
+Document.pdf_sha256, counted in upload_blobs (see app/models/upload_blob.py), and a file
+is removed when its last document is deleted.
+
+Uploads are streamed to disk in UPLOAD_CHUNK_BYTES chunks instead of being read into memory:
+each chunk is hashed (SHA-256) and counted as it arrives, written to a temporary file in
+UPLOAD_STORAGE_DIR/tmp from a worker thread (so the event loop never blocks on disk I/O).
+An upload over UPLOAD_MAX_BYTES or without a PDF header is rejected as soon as that is known,
+and never leaves a partial file behind.
+
+A complete upload stays staged in the temporary file until the document pointing at it is
+committed, and is then always renamed into place (publish_upload()), even when the same
+content is already stored: a document deleted concurrently may be removing that file after
+its commit (remove_unreferenced_uploads()), and the rename puts it back.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+from fastapi import UploadFile
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import UPLOAD_STORAGE_DIR, UPLOAD_MAX_BYTES, UPLOAD_CHUNK_BYTES
+from app.core.database import engine
+from app.models.document import Document
+from app.models.upload_blob import UploadBlob
+
+logger = logging.getLogger(__name__)
+
+# PDF readers accept the header anywhere in the first 1024 bytes
+PDF_MAGIC = b'%PDF-'
+PDF_HEADER_WINDOW = 1024
+
+
+class UploadTooLarge(ValueError):
+    """Upload exceeds UPLOAD_MAX_BYTES."""
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: Path  # Where the file is stored once published
+    sha256: str
+    size_bytes: int
+    staged_path: Path  # Temporary file holding it until then
+
+
+def upload_blob_path(sha256: str) -> Path:
+    return Path(UPLOAD_STORAGE_DIR) / sha256[:2] / sha256[2:4] / sha256
+
+
+def resolve_pdf_path(document: Document) -> Optional[Path]:
+    """File of a document's PDF: the stored upload, else the rendered PDF, else None."""
+    if document.pdf_sha256 is not None:
+        return upload_blob_path(document.pdf_sha256)
+    if document.pdf_file_path:
+        return Path(document.pdf_file_path)
+    return None
+
+
+def _open_temp_file():
+    directory = Path(UPLOAD_STORAGE_DIR) / 'tmp'  # Same filesystem as the store, so the rename is atomic
+    directory.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False)
+
+
+def _discard(tmp_file) -> None:
+    tmp_file.close()
+    try:
+        os.unlink(tmp_file.name)
+    except FileNotFoundError:
+        pass
+
+
+def _stage(tmp_file) -> None:
+    tmp_file.flush()
+    os.fsync(tmp_file.fileno())
+    tmp_file.close()
+
+
+async def store_pdf_upload(file: UploadFile) -> StoredUpload:
+    """
+    Stream an uploaded PDF into the store, hashing it on the way.
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        Staged upload with its store path, SHA-256 hex digest and size. Attach it to a
+        document with point_at_upload() so it is reference-counted, then publish_upload()
+        it once the document is committed (or discard_upload() it if that fails).
+
+    Raises:
+        UploadTooLarge: If the file is larger than UPLOAD_MAX_BYTES
+        ValueError: If the file is empty or not a PDF
+    """
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(f"File is larger than {UPLOAD_MAX_BYTES / (1024 * 1024):.3g} MB")
+
+    digest = hashlib.sha256()
+    size = 0
+    header = b''
+    tmp_file = await run_in_threadpool(_open_temp_file)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > UPLOAD_MAX_BYTES:
+                raise UploadTooLarge(f"File is larger than {UPLOAD_MAX_BYTES / (1024 * 1024):.3g} MB")
+            if len(header) < PDF_HEADER_WINDOW:
+                header += chunk[:PDF_HEADER_WINDOW - len(header)]
+                if len(header) == PDF_HEADER_WINDOW and PDF_MAGIC not in header:
+                    raise ValueError("File is not a valid PDF")
+            digest.update(chunk)
+            await run_in_threadpool(tmp_file.write, chunk)
+
+        if size == 0:
+            raise ValueError("File is empty")
+        if PDF_MAGIC not in header:
+            raise ValueError("File is not a valid PDF")
+        await run_in_threadpool(_stage, tmp_file)
+    except BaseException:
+        _discard(tmp_file)  # Also on cancellation (client went away), so no await here
+        raise
+
+    sha256 = digest.hexdigest()
+    return StoredUpload(
+        path=upload_blob_path(sha256),
+        sha256=sha256,
+        size_bytes=size,
+        staged_path=Path(tmp_file.name)
+    )
+
+
+def publish_upload(upload: StoredUpload) -> None:
+    """Move a staged upload into the store (call after the document referencing it is committed)."""
+    upload.path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(upload.staged_path, upload.path)
+
+
+def discard_upload(upload: StoredUpload) -> None:
+    """Delete a staged upload that will not be published."""
+    upload.staged_path.unlink(missing_ok=True)
+
+
+def remove_unreferenced_uploads(sha256s: Iterable[str]) -> None:
+    """
+    Delete the files of uploads whose last reference was dropped (called after commit).
+
+    Files that were referenced again in the meantime (an identical upload) are kept; an
+    identical upload committed after the check re-publishes its own copy of the file.
+    """
+    sha256s = list(sha256s)
+    with engine.connect() as connection:
+        referenced = set(connection.execute(
+            select(UploadBlob.sha256).where(UploadBlob.sha256.in_(sha256s))
+        ).scalars())
+    for sha256 in sha256s:
+        if sha256 in referenced:
+            continue
+        try:
+            upload_blob_path(sha256).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove unreferenced upload {sha256}: {e}")
@@ -0,0 +1,178 @@
+"""
+Benchmark lead list and detail reads: partitioned `leads` + extension tables vs. the old
+single wide table.
+
+Builds a throwaway SQLite database (never touches the app database), fills both layouts
+with the same data and times the list page query and the detail query.
+
+Usage: python3 scripts/bench_lead_reads.py --leads 20000 --repeat 20
+"""
+import sys
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, Column, Integer, Table, MetaData, insert, select, func
+from sqlalchemy.orm import sessionmaker, joinedload, registry
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.models.lead import Lead, LEAD_FIELD_NAMES
+from app.models.lead_extensions import LEAD_EXTENSION_GROUPS, LEAD_EXTENSION_FIELDS
+
+
+def sample_value(column, i):
+    """Deterministic, realistic-looking value for a column."""
+    python_type = column.type.python_type
+    if python_type is str:
+        length = getattr(column.type, 'length', None) or 200
+        return (f"{column.name}-{i}-" + "x" * 40)[:length]
+    if python_type is bool:
+        return i % 2 == 0
+    if python_type is int:
+        return i % 1000
+    if python_type is Decimal:
+        return Decimal(i % 100000) / 100
+    if python_type is date:
+        return date(2025, 1, 1) + timedelta(days=i % 365)
+    return None
+
+
+def build_wide_table(metadata):
+    """The pre-partitioning `leads` layout: every field in one table."""
+    columns = [Column('id', Integer, primary_key=True)]
+    for model in [Lead] + list(LEAD_EXTENSION_GROUPS.values()):
+        for column in model.__table__.columns:
+            if column.name in ('id', 'lead_id'):
+                continue
+            columns.append(Column(column.name, column.type, index=column.index))
+    return Table('leads_wide', metadata, *columns)
+
+
+def timed(label, fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"  {label:<45} {elapsed_ms:8.2f} ms")
+    return elapsed_ms
+
+
+def run(lead_count: int, repeat: int):
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(engine)
+
+    wide_metadata = MetaData()
+    wide_table = build_wide_table(wide_metadata)
+    wide_metadata.create_all(engine)
+
+    class WideLead:
+        pass
+    registry().map_imperatively(WideLead, wide_table)
+
+    print(f"Populating {lead_count} leads in {db_file} ...")
+    hot_columns = [c for c in Lead.__table__.columns if c.name != 'id']
+    rows = []
+    for i in range(1, lead_count + 1):
+        row = {'id': i}
+        for column in hot_columns:
+            row[column.name] = sample_value(column, i)
+        row.update(organization_id=1, stage_id=1 + i % 9, created_by_user_id=1, deleted_at=None, version=1)
+        rows.append(row)
+    extension_rows = {group: [] for group in LEAD_EXTENSION_GROUPS}
+    for i in range(1, lead_count + 1):
+        for group, model in LEAD_EXTENSION_GROUPS.items():
+            extension_rows[group].append({
+                'lead_id': i,
+                **{c.name: sample_value(c, i) for c in model.__table__.columns if c.name != 'lead_id'}
+            })
+
+    with engine.begin() as conn:
+        conn.execute(insert(Lead.__table__), rows)
+        for group, model in LEAD_EXTENSION_GROUPS.items():
+            conn.execute(insert(model.__table__), extension_rows[group])
+        wide_rows = []
+        for i, row in enumerate(rows):
+            wide_row = dict(row)
+            for group in LEAD_EXTENSION_GROUPS:
+                wide_row.update({k: v for k, v in extension_rows[group][i].items() if k != 'lead_id'})
+            wide_rows.append(wide_row)
+        conn.execute(insert(wide_table), wide_rows)
+
+    Session = sessionmaker(bind=engine)
+    page_size = 50
+    detail_ids = [random.randint(1, lead_count) for _ in range(repeat + 1)]
+
+    def list_partitioned():
+        with Session() as db:
+            query = db.query(Lead).filter(Lead.organization_id == 1, Lead.deleted_at.is_(None))
+            query.count()
+            query.order_by(Lead.created_at.desc()).limit(page_size).all()
+
+    def list_wide():
+        with Session() as db:
+            query = db.query(WideLead).filter(wide_table.c.organization_id == 1, wide_table.c.deleted_at.is_(None))
+            query.count()
+            query.order_by(wide_table.c.created_at.desc()).limit(page_size).all()
+
+    def detail_reader(read):
+        """Each call (warm-up included) reads the next of detail_ids, so no run re-reads a cached row."""
+        ids = iter(detail_ids)
+        return lambda: read(next(ids))
+
+    def detail_partitioned_hot(lead_id):
+        with Session() as db:
+            db.query(Lead).filter(Lead.id == lead_id).first()
+
+    def detail_partitioned_all(lead_id):
+        with Session() as db:
+            lead = db.query(Lead).options(
+                *[joinedload(getattr(Lead, group)) for group in LEAD_EXTENSION_GROUPS]
+            ).filter(Lead.id == lead_id).first()
+            {field: getattr(lead, field) for field in LEAD_FIELD_NAMES}
+
+    def detail_wide(lead_id):
+        with Session() as db:
+            db.query(WideLead).filter(wide_table.c.id == lead_id).first()
+
+    def scan_partitioned():
+        with Session() as db:
+            db.execute(select(func.count()).select_from(Lead.__table__).where(Lead.stage_id == 3)).scalar()
+            db.execute(select(Lead.__table__).where(Lead.project_name.like('%-1%'))).fetchall()
+
+    def scan_wide():
+        with Session() as db:
+            db.execute(select(func.count()).select_from(wide_table).where(wide_table.c.stage_id == 3)).scalar()
+            db.execute(select(wide_table).where(wide_table.c.project_name.like('%-1%'))).fetchall()
+
+    print(f"\nHot columns: {len(hot_columns) + 1}, extension fields: {len(LEAD_EXTENSION_FIELDS)}")
+    print("\nList page (count + 50 rows, ORM):")
+    timed("wide table", list_wide, repeat)
+    timed("partitioned (hot columns only)", list_partitioned, repeat)
+    print("\nDetail read (ORM):")
+    timed("wide table", detail_reader(detail_wide), repeat)
+    timed("partitioned, hot columns only", detail_reader(detail_partitioned_hot), repeat)
+    timed("partitioned, all groups joined", detail_reader(detail_partitioned_all), repeat)
+    print("\nFull-table scan (filter on unindexed hot column):")
+    timed("wide table", scan_wide, repeat)
+    timed("partitioned", scan_partitioned, repeat)
+
+    engine.dispose()
+    Path(db_file).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark partitioned vs wide lead reads')
+    parser.add_argument('--leads', type=int, default=20000, help='Number of leads to generate')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetitions per measurement')
+
+    args = parser.parse_args()
+    run(args.leads, args.repeat)
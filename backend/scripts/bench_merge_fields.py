@@ -0,0 +1,120 @@
+"""
+Benchmark merge-field rendering: the old two-pass re.sub implementation vs. the compiled,
+cached template (app.services.document_generation.replace_merge_fields).
+
+Builds a synthetic contract of the requested size with TipTap merge-field spans and plain
+{{lead.field}} placeholders, checks that both implementations produce the same HTML and
+times repeated renders (as on the public signing page).
+
+Usage: python3 scripts/bench_merge_fields.py --kb 300 --fields 400 --repeat 50
+"""
+import sys
+import argparse
+import re
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models import *  # noqa: F401,F403 - configure all mappers
+from app.models.lead import Lead
+from app.services.document_generation import (
+    compile_merge_template,
+    escape_html,
+    get_lead_field_value,
+    replace_merge_fields,
+    template_cache,
+)
+
+FIELDS = ['full_name', 'phone', 'email', 'client_id', 'address', 'signing_date', 'transaction_amount']
+
+
+def legacy_replace_merge_fields(content, lead):
+    """The pre-compilation implementation (two re.sub passes, nested re.search per span)."""
+    tiptap_pattern = r'<span[^>]*data-merge-field=["\']true["\'][^>]*>.*?</span>'
+
+    def replace_tiptap_match(match):
+        span_html = match.group(0)
+        field_key_match = re.search(r'data-field-key=["\'](\w+)["\']', span_html)
+        if not field_key_match:
+            return span_html
+        return escape_html(get_lead_field_value(lead, field_key_match.group(1)))
+
+    rendered_content = re.sub(tiptap_pattern, replace_tiptap_match, content, flags=re.DOTALL)
+
+    def replace_plain_match(match):
+        return escape_html(get_lead_field_value(lead, match.group(1)))
+
+    return re.sub(r'\{\{lead\.(\w+)\}\}', replace_plain_match, rendered_content)
+
+
+def build_contract(size_kb, field_count):
+    """RTL contract HTML of roughly size_kb with field_count merge fields spread through it."""
+    paragraph = '<p dir="rtl">הצדדים מסכימים כי התנאים המפורטים להלן יחולו על העסקה &amp; על כל נספחיה.</p>'
+    paragraphs = max(size_kb * 1024 // len(paragraph.encode('utf-8')), field_count)
+    chunks = ['<div dir="rtl">']
+    every = max(paragraphs // max(field_count, 1), 1)
+    for i in range(paragraphs):
+        chunks.append(paragraph)
+        if i % every == 0:
+            field = FIELDS[i % len(FIELDS)]
+            if i % 2:
+                chunks.append(
+                    f'<span class="merge-field" data-field-key="{field}" data-merge-field="true" '
+                    f'contenteditable="false">{{{{lead.{field}}}}}</span>'
+                )
+            else:
+                chunks.append(f'<p>{{{{lead.{field}}}}}</p>')
+    chunks.append('</div>')
+    return ''.join(chunks)
+
+
+def timed(label, fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"  {label:<28} {elapsed:9.3f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--kb', type=int, default=300, help='Approximate contract size in KB')
+    parser.add_argument('--fields', type=int, default=400, help='Number of merge fields')
+    parser.add_argument('--repeat', type=int, default=50, help='Renders per measurement')
+    args = parser.parse_args()
+
+    lead = Lead(
+        full_name='ישראל ישראלי <script>',
+        phone='050-1234567',
+        email='israel@example.com',
+        client_id='012345678',
+        address='רחוב הרצל 1, תל אביב',
+        signing_date=date(2025, 1, 1),
+        transaction_amount=Decimal('1250000.00'),
+    )
+    content = build_contract(args.kb, args.fields)
+    print(f"Contract: {len(content.encode('utf-8')) / 1024:.0f} KB, "
+          f"{len(compile_merge_template(content).parts) // 2} merge fields, {args.repeat} renders")
+
+    expected = legacy_replace_merge_fields(content, lead)
+    if replace_merge_fields(content, lead, cache_key=('bench', 1)) != expected:
+        raise SystemExit("Compiled output differs from the legacy implementation")
+
+    legacy = timed('legacy re.sub (2 passes)', lambda: legacy_replace_merge_fields(content, lead), args.repeat)
+    compiled = compile_merge_template(content)
+    timed('compile only', lambda: compile_merge_template(content), args.repeat)
+    render_only = timed('render precompiled', lambda: compiled.render(lead), args.repeat)
+    cached = timed('cached (hash + render)', lambda: replace_merge_fields(content, lead, cache_key=('bench', 1)), args.repeat)
+
+    print(f"Speedup: {legacy / cached:.1f}x with cache lookup, {legacy / render_only:.1f}x render only")
+    print(f"Cache: {template_cache.metrics}")
+
+
+if __name__ == '__main__':
+    main()
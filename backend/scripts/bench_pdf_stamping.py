@@ -0,0 +1,123 @@
+"""
+Benchmark signature stamping (app.services.pdf_stamping.stamp_signatures) on multi-page contracts.
+
+Builds a synthetic A4 PDF with the requested number of pages and signature blocks spread
+over them, plus a handful of PNG signatures (each signer signs several blocks), then times:
+- one document with a cold signature image cache (every image decoded),
+- one document with a warm cache (as for re-stamps and repeated signers in one process),
+- throughput of many documents stamped in a process pool, as the PDF render queue does.
+
+Usage: python3 scripts/bench_pdf_stamping.py --pages 20 --blocks 60 --signers 4 --documents 40 --workers 4
+"""
+import sys
+import argparse
+import base64
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # PyMuPDF
+
+from app.services import pdf_stamping
+from app.services.pdf_stamping import (
+    EDITOR_PAGE_HEIGHT_PX,
+    get_signature_cache_metrics,
+    stamp_signatures,
+)
+
+
+def build_contract(path, pages):
+    """A4 PDF with a line of text per page."""
+    pdf = fitz.open()
+    for number in range(pages):
+        page = pdf.new_page(width=595.28, height=841.89)
+        page.insert_text((72, 72), f"Contract page {number + 1}", fontsize=12)
+    pdf.save(path)
+    pdf.close()
+
+
+def build_signature(seed):
+    """Transparent 400x160 PNG with a diagonal stroke, as a data URL."""
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 400, 160), 1)
+    pixmap.clear_with(0)
+    for x in range(400):
+        y = (x * (seed + 1) // 3) % 160
+        for dy in range(3):
+            pixmap.set_pixel(x, min(y + dy, 159), (20, 20, 120, 255))
+    return 'data:image/png;base64,' + base64.b64encode(pixmap.tobytes('png')).decode('ascii')
+
+
+def build_stamps(pages, blocks, signers):
+    signatures = [build_signature(seed) for seed in range(signers)]
+    stamps = []
+    for index in range(blocks):
+        page = index % pages
+        stamps.append({
+            'signature_id': index % signers + 1,
+            'signed_at': '2025-01-01T10:00:00',
+            'data': signatures[index % signers],
+            'x': 64 + (index % 3) * 220,
+            'y': page * EDITOR_PAGE_HEIGHT_PX + 700 + (index // pages % 3) * 100,
+            'width': 200,
+            'height': 80,
+        })
+    return stamps
+
+
+def timed(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"  {label:<34} {elapsed:9.2f} ms/document")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20, help='Pages per contract')
+    parser.add_argument('--blocks', type=int, default=60, help='Signature blocks per contract')
+    parser.add_argument('--signers', type=int, default=4, help='Distinct signature images')
+    parser.add_argument('--documents', type=int, default=40, help='Documents for the pool throughput run')
+    parser.add_argument('--workers', type=int, default=4, help='Stamping processes')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per single-document measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = str(Path(workdir) / 'contract.pdf')
+        build_contract(source, args.pages)
+        stamps = build_stamps(args.pages, args.blocks, args.signers)
+        print(f"Contract: {args.pages} pages, {args.blocks} blocks, {args.signers} signatures "
+              f"({len(stamps[0]['data']) // 1024} KB each as base64)")
+
+        def stamp_cold():
+            pdf_stamping._signature_images.clear()
+            stamp_signatures(source, str(Path(workdir) / 'cold.pdf'), stamps)
+
+        def stamp_warm():
+            stamp_signatures(source, str(Path(workdir) / 'warm.pdf'), stamps)
+
+        cold = timed('cold signature cache', stamp_cold, args.repeat)
+        stamp_warm()
+        warm = timed('warm signature cache', stamp_warm, args.repeat)
+        print(f"  cache: {get_signature_cache_metrics()}")
+
+        outputs = [str(Path(workdir) / f"out_{n}.pdf") for n in range(args.documents)]
+        with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(stamp_signatures, [source] * args.workers, outputs[:args.workers], [stamps] * args.workers))  # warm-up
+            start = time.perf_counter()
+            stamped = sum(pool.map(stamp_signatures, [source] * args.documents, outputs, [stamps] * args.documents))
+            elapsed = time.perf_counter() - start
+
+        print(f"  pool ({args.workers} workers)                  {args.documents / elapsed:9.1f} documents/s, "
+              f"{stamped / elapsed:.0f} blocks/s")
+        print(f"Serial: {1000 / warm:.1f} documents/s warm, {1000 / cold:.1f} documents/s cold")
+
+
+if __name__ == '__main__':
+    main()
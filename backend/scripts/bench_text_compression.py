@@ -0,0 +1,130 @@
+"""
+Benchmark compressed text columns: database size and read latency with plain vs. compressed
+document HTML and signature images (app.core.compression.CompressedText).
+
+Builds two throwaway SQLite databases (never touches the app database) with the same
+documents and signatures - one stored as plain text, as before compression, one compressed -
+and reports file sizes and the time to load a document and its signatures through the ORM.
+
+Usage: python3 scripts/bench_text_compression.py --documents 300 --kb 60 --signatures 20 --repeat 200
+"""
+import sys
+import argparse
+import base64
+import os
+import random
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.compression import compress_text
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 - register all tables
+from app.models.document import Document
+from bench_merge_fields import build_contract
+
+
+def build_signature_png(seed, width=400, height=160):
+    """Valid RGBA PNG with a pen stroke, base64 data URL (what the signing pad sends)."""
+    rng = random.Random(seed)
+    rows = []
+    y = height // 2
+    for row in range(height):
+        pixels = bytearray(width * 4)
+        for x in range(0, width, 2):
+            distance = abs(row - (y + int(20 * ((x / 37 + seed) % 3 - 1))))
+            if distance < 4:
+                # Anti-aliased pen stroke, as drawn by the signing pad
+                alpha = max(0, 255 - distance * 60 - rng.randint(0, 40))
+                pixels[x * 4:x * 4 + 4] = bytes((20, 20, 120, alpha))
+        rows.append(b'\x00' + bytes(pixels))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    png = (b'\x89PNG\r\n\x1a\n'
+           + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+           + chunk(b'IDAT', zlib.compress(b''.join(rows), 9))
+           + chunk(b'IEND', b''))
+    return 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+
+def build_database(path, documents, signatures, compressed):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    store = compress_text if compressed else (lambda value: value)
+    with engine.begin() as connection:
+        # Driver-level inserts bypass CompressedText, so the plain database really holds text
+        connection.exec_driver_sql(
+            "INSERT INTO documents (id, organization_id, lead_id, title, rendered_content, status, created_by_user_id) "
+            "VALUES (?, 1, 1, ?, ?, 'signed', 1)",
+            [(number + 1, f"Contract {number}", store(content)) for number, content in enumerate(documents)]
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO document_signatures (document_id, signature_block_id, signer_type, signer_name, signature_data) "
+            "VALUES (?, ?, 'client', 'Signer', ?)",
+            [
+                (number + 1, f"sig_{index}", store(signatures[(number + index) % len(signatures)]))
+                for number in range(len(documents))
+                for index in range(3)
+            ]
+        )
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    return engine
+
+
+def time_reads(engine, count, repeat):
+    Session = sessionmaker(bind=engine)
+    ids = [random.randint(1, count) for _ in range(repeat)]
+    start = time.perf_counter()
+    for document_id in ids:
+        session = Session()
+        document = session.get(Document, document_id)
+        total = len(document.rendered_content)
+        for signature in document.signatures:
+            total += len(signature.signature_data)
+        session.close()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=300, help='Documents to store')
+    parser.add_argument('--kb', type=int, default=60, help='Approximate HTML size per document in KB')
+    parser.add_argument('--signatures', type=int, default=20, help='Distinct signature images')
+    parser.add_argument('--repeat', type=int, default=200, help='Document reads per measurement')
+    args = parser.parse_args()
+
+    base = build_contract(args.kb, max(args.kb, 10))
+    documents = [base.replace('התנאים', f"התנאים ({number})", 1) for number in range(args.documents)]
+    signatures = [build_signature_png(seed) for seed in range(args.signatures)]
+    html_bytes = sum(len(content.encode('utf-8')) for content in documents)
+    print(f"{args.documents} documents, {html_bytes / 1024 / 1024:.1f} MB HTML, "
+          f"{args.documents * 3} signatures of ~{len(signatures[0]) / 1024:.0f} KB")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {}
+        for label, compressed in (('plain', False), ('compressed', True)):
+            path = os.path.join(workdir, f"{label}.db")
+            engine = build_database(path, documents, signatures, compressed)
+            time_reads(engine, args.documents, 10)  # warm-up
+            results[label] = (os.path.getsize(path), time_reads(engine, args.documents, args.repeat))
+            engine.dispose()
+            print(f"  {label:<11} file {results[label][0] / 1024 / 1024:7.2f} MB, "
+                  f"read {results[label][1]:6.2f} ms/document (with signatures)")
+
+        plain, compressed = results['plain'], results['compressed']
+        print(f"Size reduction: {(1 - compressed[0] / plain[0]) * 100:.0f}%, "
+              f"read latency {compressed[1] - plain[1]:+.2f} ms/document")
+
+
+if __name__ == '__main__':
+    main()
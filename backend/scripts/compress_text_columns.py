@@ -0,0 +1,95 @@
+"""
+Online migration: compress existing rows of the CompressedText columns (see app/core/compression.py).
+
+Rows written before compression stay readable as plain text, so this can run while the app
+is serving requests. Each batch is its own short transaction, and a row is only rewritten if
+it still holds the text that was read (a concurrent edit wins). Safe to interrupt and rerun.
+
+--decompress writes plain text back (e.g. before downgrading or switching codecs).
+--vacuum rebuilds the database file afterwards to return the freed pages to the OS
+(takes an exclusive lock - run it in a quiet period).
+
+Usage: python3 scripts/compress_text_columns.py --batch-size 200 --pause 0.05 [--decompress] [--vacuum]
+"""
+import sys
+import argparse
+import os
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.core.compression import compress_text, decompress_text
+from app.core.config import SQLITE_DB_PATH, COMPRESSION_MIN_BYTES
+from app.core.database import engine
+
+# (table, primary key, column)
+COMPRESSED_COLUMNS = [
+    ('html_blobs', 'sha256', 'content'),
+    ('documents', 'id', 'rendered_content'),
+    ('document_signatures', 'id', 'signature_data'),
+]
+
+
+def migrate_column(table, key, column, batch_size, pause, decompress):
+    """Convert one column batch by batch; returns (rows converted, bytes before, bytes after)."""
+    stored_type = 'blob' if decompress else 'text'
+    min_bytes = 0 if decompress else COMPRESSION_MIN_BYTES
+    select_batch = text(
+        f"SELECT {key}, {column} FROM {table} "
+        f"WHERE {key} > :last_key AND typeof({column}) = '{stored_type}' "
+        f"AND length(CAST({column} AS BLOB)) >= :min_bytes "
+        f"ORDER BY {key} LIMIT :limit"
+    )
+    update_row = text(
+        f"UPDATE {table} SET {column} = :new_value "
+        f"WHERE {key} = :row_key AND typeof({column}) = '{stored_type}' AND {column} = :old_value"
+    )
+
+    converted = before = after = 0
+    last_key = '' if key == 'sha256' else 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select_batch, {'last_key': last_key, 'min_bytes': min_bytes, 'limit': batch_size}
+            ).all()
+            if not rows:
+                break
+            updates = []
+            for row_key, value in rows:
+                new_value = decompress_text(value) if decompress else compress_text(value, min_bytes=0)
+                before += len(value.encode('utf-8')) if isinstance(value, str) else len(value)
+                after += len(new_value.encode('utf-8')) if isinstance(new_value, str) else len(new_value)
+                updates.append({'row_key': row_key, 'old_value': value, 'new_value': new_value})
+            converted += connection.execute(update_row, updates).rowcount
+            last_key = rows[-1][0]
+        if pause:
+            time.sleep(pause)  # Let request handlers take the write lock between batches
+    return converted, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=200, help='Rows per transaction')
+    parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+    parser.add_argument('--decompress', action='store_true', help='Store plain text again')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM the database afterwards')
+    args = parser.parse_args()
+
+    file_size = os.path.getsize(SQLITE_DB_PATH)
+    for table, key, column in COMPRESSED_COLUMNS:
+        started = time.perf_counter()
+        converted, before, after = migrate_column(table, key, column, args.batch_size, args.pause, args.decompress)
+        print(f"{table}.{column}: {converted} rows, {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    if args.vacuum:
+        with engine.connect() as connection:
+            connection.execute(text("VACUUM"))
+        print(f"Database file: {file_size / 1024:.0f} KB -> {os.path.getsize(SQLITE_DB_PATH) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
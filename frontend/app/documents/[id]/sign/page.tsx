@@ -3,7 +3,7 @@
 import { useAuth } from '@/hooks/useAuth'
 import { useRouter, useParams } from 'next/navigation'
 import { useEffect, useState, useRef } from 'react'
-import { getDocument, submitSignature, type Document, type SubmitSignatureRequest } from '@/lib/api/documents'
+import { getDocument, getDocumentContent, submitSignature, type Document, type SubmitSignatureRequest } from '@/lib/api/documents'
 import { deserializeSignatureBlocks, type SignatureBlock } from '@/lib/signatureBlocks'
 import SignatureCanvas, { type SignatureCanvasRef } from '@/components/SignatureCanvas'
 import { ArrowLeft, CheckCircle, XCircle, AlertCircle } from 'lucide-react'
@@ -41,7 +41,11 @@ export default function InternalSigningPage() {
       setLoading(true)
       setError(null)
       try {
-        const docData = await getDocument(validatedId, true, true)
+        const [metadata, html] = await Promise.all([
+          getDocument(validatedId, true, true),
+          getDocumentContent(validatedId),
+        ])
+        const docData = { ...metadata, rendered_content: html }
         setDocument(docData)
 
         // Load signature blocks from template
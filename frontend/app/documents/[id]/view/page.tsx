@@ -3,7 +3,7 @@
 import { useAuth } from '@/hooks/useAuth'
 import { useParams, useRouter } from 'next/navigation'
 import { useEffect, useState } from 'react'
-import { getDocument, type Document, type DocumentSignature } from '@/lib/api/documents'
+import { getDocument, getDocumentContent, type Document, type DocumentSignature } from '@/lib/api/documents'
 import { deserializeSignatureBlocks, type SignatureBlock } from '@/lib/signatureBlocks'
 import { FileText, Download, ArrowRight, CheckCircle } from 'lucide-react'
 import DocumentPage from '@/components/DocumentPage'
@@ -39,7 +39,11 @@ export default function DocumentViewPage() {
       setError(null)
       try {
         // Fetch document with signatures included
-        const data = await getDocument(documentId, true, false)
+        const [metadata, html] = await Promise.all([
+          getDocument(documentId, true, false),
+          getDocumentContent(documentId),
+        ])
+        const data = { ...metadata, rendered_content: html }
         setDocument(data)
         
         // Load signature blocks
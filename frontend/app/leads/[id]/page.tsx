@@ -4,7 +4,7 @@ import { useAuth } from '@/hooks/useAuth'
 import { useRouter, useParams, useSearchParams } from 'next/navigation'
 import { useEffect, useState } from 'react'
 import { getLead, deleteLead, type LeadDetail } from '@/lib/api/leads'
-import { listDocuments, deleteDocument, type Document } from '@/lib/api/documents'
+import { listDocuments, deleteDocument, type DocumentSummary } from '@/lib/api/documents'
 import { getApiUrl } from '@/lib/config'
 import { LEAD_FIELD_SECTIONS } from '@/lib/leadFields'
 import EditableField from '@/components/EditableField'
@@ -25,7 +25,7 @@ export default function LeadDetailsPage() {
   const { isLoading: authLoading, isAuthenticated } = useAuth()
   
   const [lead, setLead] = useState<LeadDetail | null>(null)
-  const [documents, setDocuments] = useState<Document[]>([])
+  const [documents, setDocuments] = useState<DocumentSummary[]>([])
   const [loadingDocuments, setLoadingDocuments] = useState(false)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
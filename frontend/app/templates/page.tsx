@@ -3,7 +3,7 @@
 import { useAuth } from '@/hooks/useAuth'
 import { useRouter } from 'next/navigation'
 import { useEffect, useState, useCallback } from 'react'
-import { fetchTemplates, deleteTemplate, duplicateTemplate, type Template } from '@/lib/api/templates'
+import { fetchTemplates, deleteTemplate, duplicateTemplate, type TemplateSummary } from '@/lib/api/templates'
 import { useOrganizationContext } from '@/contexts/OrganizationContext'
 import { Search, Plus, Edit, Copy, Trash2, FileText } from 'lucide-react'
 
@@ -12,7 +12,7 @@ export default function TemplatesPage() {
   const { isLoading: authLoading, isAuthenticated } = useAuth()
   const { currentOrganizationId } = useOrganizationContext()
   
-  const [templates, setTemplates] = useState<Template[]>([])
+  const [templates, setTemplates] = useState<TemplateSummary[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [searchQuery, setSearchQuery] = useState('')
@@ -173,6 +173,7 @@ export default function TemplatesPage() {
                 {template.updated_at && (
                   <div>עודכן לאחרונה: {new Date(template.updated_at).toLocaleDateString('he-IL')}</div>
                 )}
+                <div>שדות מיזוג: {template.field_count}</div>
               </div>
               <div className="flex gap-2 justify-end">
                 <button
@@ -2,15 +2,15 @@
 
 import { useState, useEffect } from 'react'
 import { X, FileText, Loader2 } from 'lucide-react'
-import { fetchTemplates, type Template } from '@/lib/api/templates'
-import { createDocument, type Document } from '@/lib/api/documents'
+import { fetchTemplates, type TemplateSummary } from '@/lib/api/templates'
+import { createDocument, type DocumentSummary } from '@/lib/api/documents'
 import { useOrganizationContext } from '@/contexts/OrganizationContext'
 
 interface CreateDocumentModalProps {
   isOpen: boolean
   onClose: () => void
   leadId: number
-  existingDocuments?: Document[] // Documents that already exist for this lead
+  existingDocuments?: DocumentSummary[] // Documents that already exist for this lead
   onDocumentCreated: (documentId: number) => void
 }
 
@@ -22,7 +22,7 @@ export default function CreateDocumentModal({
   onDocumentCreated,
 }: CreateDocumentModalProps) {
   const { currentOrganizationId } = useOrganizationContext()
-  const [templates, setTemplates] = useState<Template[]>([])
+  const [templates, setTemplates] = useState<TemplateSummary[]>([])
   const [loading, setLoading] = useState(false)
   const [creating, setCreating] = useState(false)
   const [error, setError] = useState<string | null>(null)
@@ -146,7 +146,11 @@ export default function CreateLeadModal({ isOpen, onClose, onSuccess }: CreateLe
         cleanData.assigned_user_id = formData.assigned_user_id
       }
       
-      await createLead(cleanData)
+      const created = await createLead(cleanData)
+      if (created.possible_duplicates?.length) {
+        const names = created.possible_duplicates.map(d => `${d.full_name} (#${d.id})`).join(', ')
+        alert(`הליד נוצר, אך ייתכן שהוא כפול של: ${names}`)
+      }
       onSuccess()
       onClose()
       // Reset form after closing
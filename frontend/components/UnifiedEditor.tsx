@@ -3,7 +3,7 @@
 import { useRouter, usePathname } from 'next/navigation'
 import { useEffect, useState, useRef } from 'react'
 import { fetchTemplate, updateTemplate, createTemplate, type Template } from '@/lib/api/templates'
-import { getDocument, updateDocument, type Document } from '@/lib/api/documents'
+import { getDocument, getDocumentContent, updateDocument, type Document } from '@/lib/api/documents'
 import { useOrganizationContext } from '@/contexts/OrganizationContext'
 import GoogleDocsEditor, { GoogleDocsEditorRef } from '@/components/GoogleDocsEditor'
 import { Save, X, Check } from 'lucide-react'
@@ -56,7 +56,11 @@ export default function UnifiedEditor({ itemId, isNew, isDocumentEdit }: Unified
       setError(null)
       try {
         if (isDocumentEdit) {
-          const data = await getDocument(validatedId, false, false)
+          const [metadata, html] = await Promise.all([
+            getDocument(validatedId, false, false),
+            getDocumentContent(validatedId),
+          ])
+          const data = { ...metadata, rendered_content: html }
           setDocument(data)
           setName(data.title)
           setContent(data.rendered_content || '<p></p>')
@@ -135,7 +139,8 @@ export default function UnifiedEditor({ itemId, isNew, isDocumentEdit }: Unified
         })
         
         console.log('Document saved successfully:', updatedDoc)
-        setDocument(updatedDoc)
+        // Compare later edits against what the editor holds (the server stores it normalized)
+        setDocument({ ...updatedDoc, rendered_content: content })
         // Content state already has the correct content (with merge fields)
         // No need to update it - merge fields stay as tags in the editor
         setIsDirty(false)
@@ -219,7 +224,7 @@ export default function UnifiedEditor({ itemId, isNew, isDocumentEdit }: Unified
       const updatedDoc = await updateDocument(parseInt(itemId), {
         status: 'ready',
       })
-      setDocument(updatedDoc)
+      setDocument({ ...updatedDoc, rendered_content: content })
       // Content state already has the correct content (with merge fields)
       // No need to update it - merge fields stay as tags in the editor
       setIsDirty(false)
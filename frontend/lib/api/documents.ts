@@ -25,6 +25,7 @@ export interface Document {
   organization_id: number
   lead_id: number
   template_id: number | null  // Nullable for uploaded documents
+  template_version_id: number | null  // Template version the document was generated from
   title: string
   rendered_content: string | null  // Nullable for uploaded PDFs
   signature_blocks: string | null  // JSON string with signature block metadata
@@ -54,6 +55,17 @@ export interface Document {
   signing_links?: SigningLink[]
 }
 
+/**
+ * Document as returned by getDocument() - the HTML comes from getDocumentContent()
+ */
+export type DocumentMetadata = Omit<Document, 'rendered_content'>
+
+/**
+ * Document list entry - the list endpoint leaves out the HTML, signature blocks,
+ * signatures and signing links; use getDocument() for those.
+ */
+export type DocumentSummary = Omit<Document, 'rendered_content' | 'signature_blocks' | 'signatures' | 'signing_links'>
+
 export interface DocumentCreateRequest {
   template_id: number
   lead_id: number
@@ -78,7 +90,7 @@ export interface CreateSigningLinkResponse {
 }
 
 export interface DocumentListResponse {
-  items: Document[]
+  items: DocumentSummary[]
   total: number
   page: number
   limit: number
@@ -116,13 +128,13 @@ export async function updateDocument(
 }
 
 /**
- * Get document details by ID
+ * Get document details by ID (without the HTML - see getDocumentContent)
  */
 export async function getDocument(
   documentId: number,
   includeSignatures = false,
   includeSigningLinks = false
-): Promise<Document> {
+): Promise<DocumentMetadata> {
   const params = new URLSearchParams()
   if (includeSignatures) {
     params.append('include_signatures', 'true')
@@ -132,12 +144,28 @@ export async function getDocument(
   }
 
   const url = `${getApiUrl()}/api/documents/${documentId}${params.toString() ? `?${params.toString()}` : ''}`
-  const response = await apiClient.get<Document>(url, {
+  const response = await apiClient.get<DocumentMetadata>(url, {
     withCredentials: true,
   })
   return response.data
 }
 
+/**
+ * Get a document's HTML (with merge fields), or null if it has none (uploaded PDFs).
+ * The response carries an ETag, so the browser revalidates its cached copy (304) instead
+ * of downloading unchanged content again.
+ */
+export async function getDocumentContent(documentId: number): Promise<string | null> {
+  const url = `${getApiUrl()}/api/documents/${documentId}/content`
+  const response = await apiClient.get<string>(url, {
+    withCredentials: true,
+    responseType: 'text',
+    transformResponse: (data) => data,
+    validateStatus: (status) => status === 200 || status === 404,
+  })
+  return response.status === 200 ? response.data : null
+}
+
 /**
  * List documents with optional filters
  */
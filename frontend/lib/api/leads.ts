@@ -66,6 +66,35 @@ export interface LeadUpdate {
   [key: string]: any
 }
 
+export interface DuplicateLead {
+  id: number
+  full_name: string
+  client_id?: string | null
+  phone?: string | null
+  email?: string | null
+  stage_id: number
+  created_at: string
+  matched_on: Array<'phone' | 'email' | 'client_id'>
+}
+
+export interface LeadCreateResult extends Lead {
+  possible_duplicates: DuplicateLead[]
+}
+
+export interface DuplicateGroup {
+  field: 'phone' | 'email' | 'client_id'
+  value: string
+  count: number
+  leads: DuplicateLead[]
+}
+
+export interface DuplicateGroupListResponse {
+  groups: DuplicateGroup[]
+  total: number
+  page: number
+  limit: number
+}
+
 export interface LeadListResponse {
   leads: Lead[]
   total: number
@@ -137,6 +166,34 @@ export async function getLeads(params: ListLeadsParams = {}): Promise<LeadListRe
   return response.data
 }
 
+/**
+ * List groups of leads sharing a phone, email or ID number
+ */
+export async function getDuplicateLeads(params: { field?: string[]; lead_id?: number; page?: number; limit?: number } = {}): Promise<DuplicateGroupListResponse> {
+  const queryParams = new URLSearchParams()
+
+  if (params.field && params.field.length > 0) {
+    params.field.forEach(f => queryParams.append('field', f))
+  }
+  if (params.lead_id) queryParams.append('lead_id', params.lead_id.toString())
+  if (params.page) queryParams.append('page', params.page.toString())
+  if (params.limit) queryParams.append('limit', params.limit.toString())
+
+  const response = await apiClient.get(`${getApiUrl()}/api/leads/duplicates?${queryParams.toString()}`, {
+    withCredentials: true,
+    validateStatus: (status) => status < 500,
+  })
+
+  if (response.status === 401) {
+    throw new Error('Unauthorized')
+  }
+  if (response.status !== 200) {
+    throw new Error(`Failed to fetch duplicate leads: ${response.statusText}`)
+  }
+
+  return response.data
+}
+
 /**
  * Get lead by ID
  */
@@ -162,7 +219,7 @@ export async function getLead(id: number): Promise<LeadDetail> {
 /**
  * Create a new lead
  */
-export async function createLead(data: LeadCreate): Promise<Lead> {
+export async function createLead(data: LeadCreate): Promise<LeadCreateResult> {
   const response = await apiClient.post(`${getApiUrl()}/api/leads`, data, {
     withCredentials: true,
     validateStatus: (status) => status < 500,
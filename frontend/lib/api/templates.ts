@@ -19,6 +19,28 @@ export interface Template {
   };
 }
 
+/**
+ * Template list entry - the list endpoint leaves out content and signature blocks;
+ * fetch the full template with fetchTemplate() when it is opened.
+ */
+export interface TemplateSummary {
+  id: number;
+  organization_id: number;
+  name: string;
+  description: string | null;
+  created_by_user_id: number;
+  created_at: string;
+  updated_at: string | null;
+  is_active: boolean;
+  created_by_user?: {
+    id: number;
+    email: string;
+    full_name: string | null;
+  };
+  field_count: number;
+  size_bytes: number;
+}
+
 export interface TemplateCreate {
   name: string;
   description?: string | null;
@@ -39,14 +61,14 @@ export interface TemplateUpdate {
 export async function fetchTemplates(
   organizationId: number,
   search?: string
-): Promise<Template[]> {
+): Promise<TemplateSummary[]> {
   const params = new URLSearchParams();
   if (search) {
     params.append("search", search);
   }
 
   const url = `${getApiUrl()}/api/organizations/${organizationId}/templates${params.toString() ? `?${params.toString()}` : ""}`;
-  const response = await apiClient.get<Template[]>(url, {
+  const response = await apiClient.get<TemplateSummary[]>(url, {
     withCredentials: true,
     validateStatus: (status) => status < 500,
   });